@@ -0,0 +1,242 @@
+import os
+import gc
+import tracemalloc
+import pandas as pd
+import streamlit as st
+import session_memory
+import precompute
+
+# Users who see the Admin page (comma-separated usernames; nobody unless set)
+ADMIN_USERS = {user.strip() for user in os.getenv("ADMIN_USERS", "").split(",") if user.strip()}
+# Frames kept per tracemalloc trace and allocators listed in the snapshot diff
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+TRACEMALLOC_TOP = 25
+
+MB = 1024 * 1024
+
+
+def is_admin(username):
+    return username is not None and username in ADMIN_USERS
+
+
+def process_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# Process-wide tracemalloc baseline (the previous snapshot the next one is compared to)
+@st.cache_resource
+def _tracemalloc_state():
+    return {"baseline": None, "taken": None}
+
+
+def _registered_caches():
+    """(kind, entries, bytes) of every st.cache_data / st.cache_resource function by its name
+    ("module.function"); bytes only for st.cache_data, whose entries are stored pickled."""
+    # Version-specific (Streamlit 1.42): the public API has no registry of cached functions or
+    # per-function entry counts, so this reads private attributes and reports nothing if they move
+    try:
+        from streamlit.runtime.caching.cache_data_api import _data_caches
+        from streamlit.runtime.caching.cache_resource_api import _resource_caches
+        data_caches = list(_data_caches._function_caches.values())
+        resource_caches = [(cache.display_name, len(cache._mem_cache))
+                           for cache in list(_resource_caches._function_caches.values())]
+    except (ImportError, AttributeError):
+        return {}
+    registered = {}
+    for cache in data_caches:
+        stats = cache.get_stats()
+        registered[cache.display_name] = ("st.cache_data", len(stats), sum(stat.byte_length for stat in stats))
+    for name, entries in resource_caches:
+        registered[name] = ("st.cache_resource", entries, None)
+    return registered
+
+
+def function_caches(caches):
+    """One row per cached function: the app's loaders, sized through the result they returned (the
+    structures report their own nbytes, see session_memory.deep_sizeof), then every other cached
+    function, e.g. auth._read_user_credentials."""
+    registered = _registered_caches()
+    rows = []
+    for name, (loader, result) in caches.items():
+        kind, entries, _ = registered.pop(f"{loader.__module__}.{loader.__qualname__}",
+                                          ("st.cache_resource", None, None))
+        rows.append({"function": name, "kind": kind, "entries": entries,
+                     "MB": round(session_memory.deep_sizeof(result) / MB, 2)})
+    for name, (kind, entries, nbytes) in sorted(registered.items()):
+        rows.append({"function": name, "kind": kind, "entries": entries,
+                     "MB": round(nbytes / MB, 2) if nbytes is not None else None})
+    return pd.DataFrame(rows)
+
+
+def _session_manager():
+    """The runtime's session manager, or None where it is not reachable."""
+    from streamlit.runtime import Runtime
+
+    # Version-specific (Streamlit 1.42): Runtime._session_mgr is private, absent under
+    # `streamlit.testing` and liable to move between releases
+    return getattr(Runtime.instance(), "_session_mgr", None) if Runtime.exists() else None
+
+
+def session_inventory():
+    """Per-session state sizes (Streamlit's estimate) and the derivations tracked by session_memory."""
+    session_mgr = _session_manager()
+    if session_mgr is None:
+        return pd.DataFrame()
+    rows = []
+    for session_info in session_mgr.list_active_sessions():
+        state = session_info.session.session_state
+        memory = state.filtered_state.get("_session_memory", {"tracked": {}, "entries": {}})
+        rows.append({
+            "session": session_info.session.id[:8],
+            "user": state.filtered_state.get("username"),
+            "keys": len(state.filtered_state),
+            "session_state_MB": round(sum(stat.byte_length for stat in state.get_stats()) / MB, 2),
+            "tracked_MB": round(sum(memory["tracked"].values()) / MB, 2),
+            "derivations": len(memory["entries"]),
+            "derivations_MB": round(sum(entry["nbytes"] for entry in memory["entries"].values()) / MB, 2),
+        })
+    return pd.DataFrame(rows)
+
+
+def column_memory(df):
+    usage = df.memory_usage(deep=True, index=True)
+    dtypes = df.dtypes.astype(str).reindex(usage.index).fillna("index")
+    return pd.DataFrame({"dtype": dtypes, "MB": (usage / MB).round(3)}).sort_values("MB", ascending=False)
+
+
+def main(caches, structures, tables, jobs_store, company_matching=None, industry_mapping=None):
+    """`caches`: name -> (cached load function, its result); `structures`: name -> shared load-time object;
+    `tables`: name -> shared DataFrame; `jobs_store`: the month-partitioned jobs table;
+    `company_matching`: match rates of postings to COMPANIES_INFO by method;
+    `industry_mapping`: industry labels and rows mapped to BLS sectors by method."""
+    st.header("Admin: Memory and Caches")
+
+    rss = process_rss_mb()
+    usage = session_memory.usage()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Process RSS", f"{rss:,.0f} MB" if rss is not None else "N/A")
+    col2.metric("This session", f"{usage['total'] / MB:.1f} MB")
+    col3.metric("tracemalloc", "tracing" if tracemalloc.is_tracing() else "off")
+    st.caption("Snapshot tables are memory-mapped: their pages count towards RSS only once touched "
+               "and are shared by every worker process.")
+
+    # -------------------------------
+    # Streamlit function caches
+    # -------------------------------
+    st.markdown("### Function Caches")
+    st.dataframe(function_caches(caches), hide_index=True, use_container_width=True)
+
+    # -------------------------------
+    # Shared load-time structures and precomputed aggregates
+    # -------------------------------
+    st.markdown("### Shared Structures")
+    rows = [{"structure": name, "MB": round(session_memory.deep_sizeof(value) / MB, 2)}
+            for name, value in structures.items()]
+    shared = precompute.stats()
+    rows.append({"structure": f"precomputed aggregates ({shared['cached']} entries, {shared['hits']} hits)",
+                 "MB": round(shared["nbytes"] / MB, 2)})
+    st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+    store = jobs_store.stats()
+    st.write(f"Jobs partitions: {store['partitions']} months; hot {', '.join(store['hot_months'])} "
+             f"({store['hot_mb']:.1f} MB); cold loaded {len(store['cold_loaded'])} "
+             f"({store['cold_mb']:.1f} of {store['budget_mb']:.0f} MB); "
+             f"{store['loads']} loads, {store['evictions']} evictions.")
+
+    # -------------------------------
+    # Company matching (entity resolution of postings to COMPANIES_INFO)
+    # -------------------------------
+    if company_matching is not None:
+        st.markdown("### Company Matching")
+        st.dataframe(company_matching, hide_index=True, use_container_width=True)
+
+    # -------------------------------
+    # Industry sectors (industry labels mapped to the BLS taxonomy)
+    # -------------------------------
+    if industry_mapping is not None:
+        st.markdown("### Industry Sector Mapping")
+        st.dataframe(industry_mapping, hide_index=True, use_container_width=True)
+
+    # -------------------------------
+    # Sessions
+    # -------------------------------
+    st.markdown("### Sessions")
+    sessions = session_inventory()
+    if sessions.empty:
+        st.write("No active sessions reported by the runtime.")
+    else:
+        st.dataframe(sessions, hide_index=True, use_container_width=True)
+
+    # -------------------------------
+    # Per-table column memory
+    # -------------------------------
+    st.markdown("### Column Memory by Table")
+    frames = dict(tables)
+    frames.update({f"jobs/{month}": jobs_store.hot[month] for month in sorted(jobs_store.hot)})
+    frames.update({f"jobs/{month} (cold)": frame for month, (frame, _) in list(jobs_store.cold.items())})
+    table_name = st.selectbox("Table", list(frames), key="admin_table")
+    st.dataframe(column_memory(frames[table_name]), use_container_width=True)
+
+    # -------------------------------
+    # tracemalloc snapshot diff
+    # -------------------------------
+    st.markdown("### Top Allocators (tracemalloc)")
+    state = _tracemalloc_state()
+    col1, col2, col3 = st.columns(3)
+    if col1.button("Start tracing", disabled=tracemalloc.is_tracing()):
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        state["baseline"] = tracemalloc.take_snapshot()
+        state["taken"] = pd.Timestamp.now()
+        st.rerun()
+    if col2.button("Snapshot and compare", disabled=not tracemalloc.is_tracing()):
+        snapshot = tracemalloc.take_snapshot()
+        diff = snapshot.compare_to(state["baseline"], "lineno") if state["baseline"] is not None else []
+        st.session_state["admin_tracemalloc_diff"] = pd.DataFrame([{
+            "location": str(stat.traceback[0]) if stat.traceback else "?",
+            "size_diff_KB": round(stat.size_diff / 1024, 1),
+            "size_KB": round(stat.size / 1024, 1),
+            "count_diff": stat.count_diff,
+        } for stat in diff[:TRACEMALLOC_TOP]])
+        st.session_state["admin_tracemalloc_since"] = state["taken"]
+        state["baseline"], state["taken"] = snapshot, pd.Timestamp.now()
+    if col3.button("Stop tracing", disabled=not tracemalloc.is_tracing()):
+        tracemalloc.stop()
+        state["baseline"] = state["taken"] = None
+        st.rerun()
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        st.caption(f"Traced: {current / MB:.1f} MB (peak {peak / MB:.1f} MB). Tracing slows the app; stop it when done.")
+    if "admin_tracemalloc_diff" in st.session_state:
+        st.write(f"Growth since {st.session_state['admin_tracemalloc_since']:%H:%M:%S}:")
+        st.dataframe(st.session_state["admin_tracemalloc_diff"], hide_index=True, use_container_width=True)
+
+    # -------------------------------
+    # Clear controls
+    # -------------------------------
+    st.markdown("### Clear Caches")
+    st.caption("Cleared load functions rebuild on the next run of any session.")
+    target = st.selectbox("Cache", ["All st.cache_data", *caches, "Precomputed aggregates",
+                                    "Cold jobs partitions", "This session's derivations"], key="admin_clear_target")
+    if st.button("Clear", key="admin_clear"):
+        if target == "All st.cache_data":
+            st.cache_data.clear()
+        elif target in caches:
+            caches[target][0].clear()
+        elif target == "Precomputed aggregates":
+            precompute.clear()
+        elif target == "Cold jobs partitions":
+            jobs_store.drop_cold()
+        else:
+            session_memory.clear()
+        before = process_rss_mb()
+        collected = gc.collect()
+        after = process_rss_mb()
+        st.success(f"Cleared {target}. gc collected {collected} objects; RSS {before:,.0f} → {after:,.0f} MB."
+                   if before is not None and after is not None else f"Cleared {target}.")
@@ -0,0 +1,218 @@
+"""Fused aggregation: a page declares its metrics and gets them all from one grouped pass.
+
+Metrics are row counts, conditional counts, non-missing counts, sums and means
+per key. The rows are grouped once by the combination of every key of the plan
+(partial sums and counts per combination, on the execution backend) and each
+metric is then rolled up to its own key from that partial table, which has at
+most as many rows as there are distinct key combinations.
+
+    python agg_planner.py --rows 1000000
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import backends
+
+# Composite group codes must fit in an int64; keys whose combined cardinality is larger
+# are grouped in separate passes
+_MAX_COMBINATIONS = 2 ** 62
+
+
+class AggPlan:
+    """Metrics of a page over one frame of rows.
+
+    Declare the keys (`key`), the row conditions (`where`) and the metrics
+    (`size`, `count`, `sum`, `mean`); `run(df)` returns one frame per key,
+    indexed by the key's values (rows with a missing key are left out, as in a
+    groupby) with one column per metric of that key.
+    """
+
+    def __init__(self):
+        self.keys = {}
+        self.conditions = {}
+        self.metrics = {}
+
+    def key(self, name, column=None, missing=(), codes=None):
+        """Group by `column` (values in `missing` count as missing), or by `codes(df)` ->
+        (integer codes, -1 for missing, and the label of each code)."""
+        self.keys[name] = (column, tuple(missing), codes)
+        return self
+
+    def where(self, name, predicate):
+        """A row condition: `predicate(df)` -> boolean mask."""
+        self.conditions[name] = predicate
+        return self
+
+    def size(self, name, by, where=None):
+        """Rows per key (satisfying `where`)."""
+        self.metrics[name] = (by, "size", None, where)
+        return self
+
+    def count(self, name, by, column, where=None):
+        """Non-missing values of `column` per key."""
+        self.metrics[name] = (by, "count", column, where)
+        return self
+
+    def sum(self, name, by, column, where=None):
+        self.metrics[name] = (by, "sum", column, where)
+        return self
+
+    def mean(self, name, by, column, where=None):
+        self.metrics[name] = (by, "mean", column, where)
+        return self
+
+    def run(self, df, metrics=None):
+        """{key name: frame of its metrics}; `metrics` limits the run to those metrics."""
+        metrics = {name: self.metrics[name] for name in (metrics or self.metrics)}
+        keys = list(dict.fromkeys(by for by, _, _, _ in metrics.values()))
+        codes, labels = {}, {}
+        for name in keys:
+            codes[name], labels[name] = self._codes(df, name)
+        conditions = {name: _mask(self.conditions[name](df))
+                      for name in dict.fromkeys(where for _, _, _, where in metrics.values()) if name is not None}
+
+        # Partial aggregates: each (column, condition) pair becomes one derived column, aggregated once
+        columns, partials = {}, {"__rows": ("__group", "size")}
+        for by, agg, column, where in metrics.values():
+            if agg == "size":
+                if where is not None:
+                    columns[f"__{where}"] = conditions[where].astype(np.int64)
+                    partials[f"__{where}"] = (f"__{where}", "sum")
+                continue
+            name = f"{column}|{where}"
+            if agg == "count":
+                # Non-missing indicator (the column need not be numeric)
+                present = df[column].notna().to_numpy(dtype=bool)
+                columns[f"{name}|count"] = (present if where is None else present & conditions[where]).astype(np.int64)
+            else:
+                values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                columns[name] = values if where is None else np.where(conditions[where], values, np.nan)
+                columns[f"{name}|count"] = (~np.isnan(columns[name])).astype(np.int64)
+                partials[f"{name}|sum"] = (name, "sum")
+            partials[f"{name}|count"] = (f"{name}|count", "sum")
+
+        results = {}
+        sizes = {name: len(labels[name]) for name in keys}
+        for batch in _batches(keys, sizes):
+            partial, key_codes = _grouped(df, batch, codes, sizes, columns, partials)
+            for name in batch:
+                totals = {partial_name: _rollup(key_codes[name], values, sizes[name])
+                          for partial_name, values in partial.items()}
+                present = np.flatnonzero(totals["__rows"] > 0)
+                frame = {}
+                for metric, (by, agg, column, where) in metrics.items():
+                    if by != name:
+                        continue
+                    if agg == "size":
+                        values = totals["__rows" if where is None else f"__{where}"][present]
+                    else:
+                        counts = totals[f"{column}|{where}|count"][present]
+                        values = counts if agg == "count" else totals[f"{column}|{where}|sum"][present]
+                        if agg == "mean":
+                            values = values / np.where(counts > 0, counts, np.nan)
+                    frame[metric] = values.round().astype(np.int64) if agg in ("size", "count") else values
+                index = pd.Index(labels[name][present], name=self._label(name))
+                results[name] = pd.DataFrame(frame, index=index)
+        return results
+
+    def _label(self, name):
+        column, _, _ = self.keys[name]
+        return column if column is not None else name
+
+    def _codes(self, df, name):
+        column, missing, codes = self.keys[name]
+        if codes is not None:
+            key_codes, labels = codes(df)
+            return np.asarray(key_codes, dtype=np.int64), np.asarray(labels, dtype=object)
+        key_codes, labels = pd.factorize(df[column], sort=True)
+        if missing:
+            dropped = np.flatnonzero(pd.Index(labels).isin(missing))
+            if len(dropped):
+                # Renumber the remaining labels and mark the dropped ones missing
+                remap = np.arange(len(labels))
+                remap[dropped] = -1
+                kept = remap >= 0
+                remap[kept] = np.arange(kept.sum())
+                key_codes = np.where(key_codes >= 0, remap[key_codes], -1)
+                labels = labels[kept]
+        return key_codes.astype(np.int64), np.asarray(labels, dtype=object)
+
+
+def _mask(values):
+    """Boolean numpy mask of a predicate result (missing values are False)."""
+    return pd.array(values, dtype="boolean").to_numpy(dtype=bool, na_value=False)
+
+
+def _batches(keys, sizes):
+    """Keys grouped together as long as their combined cardinality (with a missing slot each) fits."""
+    batches, combinations = [], None
+    for name in keys:
+        radix = sizes[name] + 1
+        if combinations is None or combinations * radix > _MAX_COMBINATIONS:
+            batches.append([name])
+            combinations = radix
+        else:
+            batches[-1].append(name)
+            combinations *= radix
+    return batches
+
+
+def _grouped(df, batch, codes, sizes, columns, partials):
+    """One grouped pass over the composite code of the `batch` keys: the partial table
+    ({partial: values per group}) and each key's code (-1: missing) in every group."""
+    composite = np.zeros(len(df), dtype=np.int64)
+    for name in batch:
+        composite = composite * (sizes[name] + 1) + (codes[name] + 1)
+    frame = pd.DataFrame({"__group": composite, **columns}, copy=False)
+    partial = backends.get_backend().group_agg(frame, "__group", partials)
+    group = partial["__group"].to_numpy(dtype=np.int64)
+    # SUM over only missing values is NULL on DuckDB (0 in pandas)
+    partial = {name: partial[name].fillna(0).to_numpy(dtype=np.float64) for name in partials}
+    key_codes = {}
+    for name in reversed(batch):
+        key_codes[name] = group % (sizes[name] + 1) - 1
+        group = group // (sizes[name] + 1)
+    return partial, key_codes
+
+
+def _rollup(codes, weights, n):
+    """Per-key totals of partial `weights`; groups whose key is missing (-1) are left out."""
+    valid = codes >= 0
+    return np.bincount(codes[valid], weights=weights[valid], minlength=n)
+
+
+# ---- Benchmark against one groupby per metric ----
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="synthetic job postings")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import data_source
+    jobs = data_source.synthetic_tables(args.rows, args.seed)["jobs"]
+    plan = (AggPlan().key("company", "COMPANY_NAME").key("state", "STATE")
+            .where("newbie", lambda df: df["MIN_YEARS_OF_EXPERIENCE"] == 0)
+            .size("job_count", "company").size("newbie_job_count", "company", where="newbie")
+            .mean("avg_salary", "company", "AVG_SALARY").count("postings", "company", "AVG_SALARY")
+            .size("state_jobs", "state").mean("state_salary", "state", "AVG_SALARY"))
+    start = time.perf_counter()
+    fused = plan.run(jobs)
+    print(f"fused plan: {time.perf_counter() - start:.3f}s")
+
+    start = time.perf_counter()
+    company = jobs.groupby("COMPANY_NAME").agg(job_count=("COMPANY_NAME", "size"),
+                                               avg_salary=("AVG_SALARY", "mean"), postings=("AVG_SALARY", "count"))
+    company["newbie_job_count"] = jobs[jobs["MIN_YEARS_OF_EXPERIENCE"] == 0].groupby("COMPANY_NAME").size()
+    state = jobs.groupby("STATE").agg(state_jobs=("STATE", "size"), state_salary=("AVG_SALARY", "mean"))
+    print(f"separate groupbys: {time.perf_counter() - start:.3f}s")
+
+    company["newbie_job_count"] = company["newbie_job_count"].fillna(0).astype(np.int64)
+    for name, expected in [("company", company), ("state", state)]:
+        pd.testing.assert_frame_equal(fused[name], expected[list(fused[name].columns)], check_dtype=False,
+                                      check_index_type=False, check_names=False)
+    print("Results match.")
+
+
+if __name__ == "__main__":
+    main()
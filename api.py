@@ -0,0 +1,223 @@
+"""Headless JSON API over the dashboard's aggregates.
+
+Serves the numbers behind the Overview, Job Map, Requirements, Company Info and
+Jobs Lookup pages from the same shared snapshot, load-time structures
+(structures.py) and pure aggregate functions, without a Streamlit session.
+Every endpoint takes the dashboard's filter parameters:
+
+    GET /job_map?state=CA&start_date=2025-03-01&end_date=2025-03-31&salary=80K%20-%20100K
+
+Responses carry an ETag derived from the snapshot version and the filter
+signature; a request with a matching If-None-Match is answered with 304 without
+filtering or aggregating anything.
+
+    python api.py --port 8600
+"""
+import os
+import json
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import pandas as pd
+import shared_data
+import structures
+import data_source
+import dedup
+import backends
+import geo
+from filters import filter_signature, is_unfiltered, parse_salary_range
+import overview, job_map, requirements, company_info
+
+# Bind address
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8600"))
+# Serialized responses kept in memory, least recently used dropped first
+API_CACHE_ENTRIES = int(os.getenv("API_CACHE_ENTRIES", "256"))
+
+# Filter parameters and their defaults (the dates default to the full range of the data;
+# collapse_duplicates=1 counts near-duplicate reposts once, as the dashboard toggle does;
+# near_city=New%20York%2C%20NY&radius_miles=25 keeps postings within that radius)
+FILTER_DEFAULTS = {"state": "All", "workplace": "All", "seniority": "All", "job_title": "All",
+                   "job_func": "All", "salary": "All"}
+# Load-time structures the filters and endpoints use (built as the dashboard builds them, see structures.py)
+API_STRUCTURES = ["skill_matrix", "dup_clusters", "city_index", "company_dim", "industry_sectors"]
+
+
+# ---- Shared tables of the current snapshot version ----
+_lock = threading.Lock()
+_dataset = {"version": None}
+_responses = OrderedDict()
+
+
+def dataset(version):
+    """Tables and load-time structures of a snapshot version (only the latest is kept)."""
+    with _lock:
+        if _dataset["version"] != version:
+            data = structures.build(version, API_STRUCTURES)
+            _dataset.clear()
+            _dataset.update(data, version=version)
+            _responses.clear()
+        return dict(_dataset)
+
+
+def parse_filters(params, jobs, city_index):
+    """The dashboard's filter dict from query parameters; ValueError on an invalid value."""
+    filters = {
+        "start_date": str(pd.to_datetime(params.get("start_date", jobs.min_date)).date()),
+        "end_date": str(pd.to_datetime(params.get("end_date", jobs.max_date)).date()),
+    }
+    for name, default in FILTER_DEFAULTS.items():
+        filters[name] = params.get(name, default)
+    if filters["salary"] != "All":
+        parse_salary_range(filters["salary"])
+    filters["collapse_duplicates"] = params.get("collapse_duplicates", "0").lower() in ("1", "true", "yes")
+    filters["near_city"] = params.get("near_city", "All")
+    filters["radius_miles"] = None
+    if filters["near_city"] != "All":
+        if filters["near_city"] not in city_index.cities:
+            raise ValueError(f"unknown city {filters['near_city']!r}")
+        filters["radius_miles"] = int(params.get("radius_miles", geo.DEFAULT_RADIUS_MILES))
+        if filters["radius_miles"] <= 0:
+            raise ValueError("radius_miles must be positive")
+    return filters
+
+
+def to_json(value):
+    """JSON-ready form of an aggregate: frames and count series as lists of records."""
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, pd.Series):
+        value = value.reset_index()
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient="records", date_format="iso"))
+    return value
+
+
+# ---- Endpoints: (dataset, filtered jobs, whole-dataset totals when unfiltered) -> aggregates ----
+def overview_endpoint(data, df, totals):
+    return {"total_jobs": len(df), **overview.aggregate(df, sectors=data["industry_sectors"],
+                                                        companies=data["company_dim"])}
+
+
+def job_map_endpoint(data, df, totals):
+    state_agg, city_agg = job_map.process_data(df, data["states"], data["cities"], totals)
+    return {"states": state_agg, "cities": city_agg}
+
+
+def requirements_endpoint(data, df, totals):
+    return requirements.aggregate(df, data["skill_matrix"], totals=totals)
+
+
+def company_info_endpoint(data, df, totals):
+    return company_info.aggregate(df, totals, data["company_dim"], data["industry_sectors"])
+
+
+def risk_endpoint(data, df, totals):
+    # Postings per company of the company dimension (COMPANY_ID -1: not in COMPANIES_INFO)
+    companies = data["company_dim"]
+    postings = companies.count(companies.keys[df.index.to_numpy()])
+    keys = np.flatnonzero(postings)
+    keys = keys[np.argsort(-postings[keys], kind="stable")]
+    risks = companies.attributes(keys, ["COMPANY_NAME", "COMPANY_ID", "RISK_LEVEL", "RISK_EXPLANATION"])
+    risks.insert(2, "postings", postings[keys])
+    return {"companies": risks}
+
+
+ENDPOINTS = {
+    "overview": overview_endpoint,
+    "job_map": job_map_endpoint,
+    "requirements": requirements_endpoint,
+    "company_info": company_info_endpoint,
+    "risk": risk_endpoint,
+}
+
+
+def respond(endpoint, params, if_none_match=None):
+    """(status, body bytes, etag) for an endpoint and its query parameters."""
+    version = shared_data.ensure_snapshot(data_source.fetch_tables)
+    data = dataset(version)
+    try:
+        filters = parse_filters(params, data["jobs"], data["city_index"])
+    except (ValueError, TypeError) as exc:
+        return 400, json.dumps({"error": f"invalid filter: {exc}"}).encode("utf-8"), None
+
+    # Same signature as the dashboard's filter_key, so it changes with the snapshot version
+    signature = filter_signature({**filters, "data_version": version})
+    etag = f'"{endpoint}-{signature}"'
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return 304, b"", etag
+
+    with _lock:
+        body = _responses.get(etag)
+        if body is not None:
+            _responses.move_to_end(etag)
+    if body is None:
+        df = data["jobs"].select(filters["start_date"], filters["end_date"],
+                                 lambda partition: backends.get_backend().filter(partition, filters))
+        if filters["near_city"] != "All":
+            df = data["city_index"].filter(df, filters["near_city"], filters["radius_miles"])
+        if filters["collapse_duplicates"]:
+            df = dedup.collapse(df, data["dup_clusters"])
+        totals = data["derived"] if is_unfiltered(filters, data["jobs"].min_date, data["jobs"].max_date) else None
+        result = to_json(ENDPOINTS[endpoint](data, df, totals))
+        body = json.dumps({"data_version": version, "signature": signature, "filters": filters,
+                           "result": result}).encode("utf-8")
+        with _lock:
+            _responses[etag] = body
+            while len(_responses) > API_CACHE_ENTRIES:
+                _responses.popitem(last=False)
+    return 200, body, etag
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "JobDashboardAPI"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint == "health":
+            return self._send(200, b'{"status": "ok"}')
+        if endpoint not in ENDPOINTS:
+            return self._send(404, json.dumps({"error": "unknown endpoint",
+                                               "endpoints": sorted(ENDPOINTS)}).encode("utf-8"))
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            status, body, etag = respond(endpoint, params, self.headers.get("If-None-Match"))
+        except Exception as exc:
+            self.log_error("%s failed: %r", self.path, exc)
+            return self._send(500, json.dumps({"error": "internal error"}).encode("utf-8"))
+        self._send(status, body, etag)
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving {', '.join(f'/{name}' for name in ENDPOINTS)} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
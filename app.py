@@ -1,62 +1,21 @@
 import streamlit as st
 import pandas as pd
-import ast
-import os
-import bcrypt
-from sqlalchemy import create_engine
 from dotenv import load_dotenv
+from filters import FILTER_KEYS, filter_signature, is_unfiltered
+import shared_data
+import structures
+import data_source
+import session_memory
+import auth
+import precompute
+import admin
+import dedup
+import geo
+import backends
 
 
-# Load user credentials from file
-@st.cache_data
-def load_user_credentials(filepath="users.csv"):
-    users_df = pd.read_csv(filepath)
-    user_dict = dict(zip(users_df["username"], users_df["password_hash"]))
-    return user_dict
-
-# Authentication function
-def authenticate(username, password, user_credentials):
-    if username in user_credentials:
-        stored_hash = user_credentials[username].encode("utf-8")
-        if bcrypt.checkpw(password.encode("utf-8"), stored_hash):
-            return True
-    return False
-
-def read_sql_uppercase(query, engine):
-    df = pd.read_sql(query, engine)
-    df.columns = [col.upper() for col in df.columns]
-    return df
-
-# # Load users
-# user_credentials = load_user_credentials("users.csv")
-
-# # Check session state
-# if "authenticated" not in st.session_state:
-#     st.session_state["authenticated"] = False
-#     # st.session_state["authenticated"] = True
-
-# if not st.session_state["authenticated"]:
-#     st.title("🔐 Secure Login")
-
-#     username = st.text_input("Username")
-#     password = st.text_input("Password", type="password")
-
-#     if st.button("Login"):
-#         if authenticate(username, password, user_credentials):
-#             st.session_state["authenticated"] = True
-#             st.success("✅ Login successful!")
-#             st.rerun()
-#         else:
-#             st.error("❌ Invalid username or password")
-
-#     st.stop()
-
 load_dotenv()
 
-snowflake_username = os.getenv('SNOWFLAKE_USERNAME')
-snowflake_password = os.getenv('SNOWFLAKE_PASSWORD')
-snowflake_account = os.getenv('SNOWFLAKE_ACCOUNT')
-
 # Set the page layout to wide
 st.set_page_config(layout="wide")
 
@@ -78,97 +37,128 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# ---- Login gate ----
+# bcrypt runs once per login on a bounded worker pool; later reruns only check the signed session token.
+user_credentials = auth.load_user_credentials("users.csv")
+current_user = auth.validate_token(st.session_state.get("auth_token"), user_credentials)
+st.session_state["authenticated"] = auth.AUTH_DISABLED or current_user is not None
+
+if not st.session_state["authenticated"]:
+    st.title("🔐 Secure Login")
+
+    with st.form(key="login_form"):
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+        login_button = st.form_submit_button("Login")
+
+    if login_button:
+        wait_seconds = auth.lockout_remaining(username)
+        if wait_seconds:
+            st.error(f"❌ Too many failed attempts. Try again in {wait_seconds} seconds.")
+        else:
+            try:
+                if auth.authenticate(username, password, user_credentials):
+                    st.session_state["auth_token"] = auth.issue_token(username)
+                    st.success("✅ Login successful!")
+                    st.rerun()
+                else:
+                    st.error("❌ Invalid username or password")
+            except auth.AuthBusyError:
+                st.error("❌ The login service is busy, please try again in a moment.")
+
+    st.stop()
+
+st.session_state["username"] = current_user
+
 # ---- File Paths ----
 path = 'D:/Learn/projects/data/job_data/mine/'
 
-@st.cache_data
-def load_data():
-    conn_str = (
-    f"snowflake://{snowflake_username}:{snowflake_password}@{snowflake_account}/"
-    f"LINKEDIN_JOBS/PUBLIC?warehouse=COMPUTE_WH&role=ACCOUNTADMIN"
-    )
-    engine = create_engine(conn_str)
-
-    query_jobs = """
-    SELECT 
-        AI.JOB_ID,
-        AI.JOB_TITLE,
-        R.WORKPLACE,
-        R.JOB_URL,
-        R.SENIORITY_LEVEL,
-        R.EMPLOYMENT_TYPE,
-        R.JOB_FUNCTION,
-        R.INDUSTRIES,
-        R.COMPANY_NAME,
-        R.COMPANY_URL,
-        R.SALARY,
-        TO_DATE(AI.POSTED_DATE, 'MM/DD/YYYY') AS POSTED_DATE,
-        AI.AVG_SALARY,
-        AI.SKILLS_MATCHED,
-        AI.DEGREE,
-        AI.MIN_YEARS_OF_EXPERIENCE,
-        AI.PRIMARY_TITLE,
-        AI.SUB_TITLE,
-        AI.JOB_FUNCTION_LIST,
-        AI.LOCATION_ST AS LOCATION,
-        AI.STATE
-    FROM LINKEDIN_FIN_ACC_AI AI
-    LEFT JOIN LINKEDIN_FIN_ACC_RAW R 
-      ON R.JOB_ID = AI.JOB_ID
-    WHERE AI.POSTED_DATE > '02/22/2025'
-          AND (AI.AVG_SALARY > 20000 AND AI.AVG_SALARY < 500000
-           OR AI.AVG_SALARY IS NULL)
-    ORDER BY AI.POSTED_DATE DESC;
-    """
-
-    merged_df = read_sql_uppercase(query_jobs, engine)
-    merged_df['POSTED_DATE'] = pd.to_datetime(merged_df['POSTED_DATE'], errors='coerce')
-
-    query_companies = """SELECT 
-                                CLEAN_URL,
-                                COMPANY_NAME,
-                                COMPANY_SIZE,
-                                FOLLOWERS,
-                                FOUNDED,
-                                HEADQUARTERS,
-                                INDUSTRY,
-                                MEMBERS,
-                                POSTS,
-                                SPECIALTIES,
-                                VERIFIED_PAGE,
-                                WEBSITE,
-                                WHAT_THEY_ARE_SKILLED_AT,
-                                WHAT_THEY_DO,
-                                WHAT_THEY_STUDIED,
-                                WHERE_THEY_LIVE,
-                                WHERE_THEY_STUDIED
-                         FROM COMPANIES_INFO
-                      """
-    companies_info = read_sql_uppercase(query_companies, engine)
-
-    query_state_coordinates = "SELECT * FROM COORDINATES_STATE"
-    state_df = read_sql_uppercase(query_state_coordinates, engine)
-
-    query_city_coordinates = "SELECT * FROM COORDINATES_CITY"
-    city_df = read_sql_uppercase(query_city_coordinates, engine)
-
-    query_job_titles = "SELECT PRIMARY_TITLE FROM job_title_counts ORDER BY count DESC;"
-    job_title_options = read_sql_uppercase(query_job_titles, engine)['PRIMARY_TITLE'].tolist()
-
-    query_job_functions = "SELECT job_function FROM job_function_counts ORDER BY count DESC;"
-    job_func_options = read_sql_uppercase(query_job_functions, engine)['JOB_FUNCTION'].tolist()
-
-    # conn.close()
-    return merged_df, companies_info, state_df, city_df, job_title_options, job_func_options
-
-df, company_df, state_df, city_df, job_title_options, job_func_options = load_data()
+# The tables are written once to a shared Arrow snapshot and memory-mapped by every
+# worker process; cache_resource hands the same read-only frames to all sessions.
+# Jobs are partitioned by posting month: recent months stay resident, older ones load on demand.
+@st.cache_resource(max_entries=1)
+def load_data(data_version):
+    tables = structures.open_tables(data_version)
+    return (tables["jobs"], tables["companies"], tables["states"], tables["cities"],
+            tables["job_titles"], tables["job_functions"], tables["derived"])
+
+# DATA_BACKEND=local serves a local directory or synthetic data instead (development, load tests)
+data_version = shared_data.ensure_snapshot(data_source.fetch_tables)
+jobs_store, company_df, state_df, city_df, job_title_options, job_func_options, derived = load_data(data_version)
+
+# Load-time structures (built as in structures.py, shared with api.py), once per process for all sessions
+@st.cache_resource(max_entries=1)
+def load_search_index(data_version, _jobs_store):
+    return structures.search_index(_jobs_store)
+
+job_search_index = load_search_index(data_version, jobs_store)
+
+@st.cache_resource(max_entries=1)
+def load_similarity_index(data_version, _jobs_store):
+    return structures.similarity_index(_jobs_store)
+
+similarity_index = load_similarity_index(data_version, jobs_store)
+
+@st.cache_resource(max_entries=1)
+def load_skill_matrix(data_version, _jobs_store):
+    return structures.skill_matrix(_jobs_store)
+
+skill_matrix = load_skill_matrix(data_version, jobs_store)
+
+@st.cache_resource(max_entries=1)
+def load_dup_clusters(data_version, _jobs_store, _skill_matrix):
+    return structures.dup_clusters(_jobs_store, _skill_matrix)
+
+dup_clusters = load_dup_clusters(data_version, jobs_store, skill_matrix)
+
+@st.cache_resource(max_entries=1)
+def load_city_index(data_version, _jobs_store, _city_df):
+    return structures.city_index(_jobs_store, _city_df)
+
+city_index = load_city_index(data_version, jobs_store, city_df)
+
+@st.cache_resource(max_entries=1)
+def load_company_resolution(data_version, _jobs_store, _company_df):
+    return structures.company_resolution(_jobs_store, _company_df)
+
+company_resolution = load_company_resolution(data_version, jobs_store, company_df)
+
+@st.cache_resource(max_entries=1)
+def load_risk_table(data_version, _company_df):
+    return structures.risk_table(_company_df)
+
+risk_table = load_risk_table(data_version, company_df)
+
+@st.cache_resource(max_entries=1)
+def load_company_dimension(data_version, _jobs_store, _company_resolution, _company_df, _risk_table):
+    return structures.company_dimension(_jobs_store, _company_resolution, _company_df, _risk_table)
+
+company_dim = load_company_dimension(data_version, jobs_store, company_resolution, company_df, risk_table)
+
+@st.cache_resource(max_entries=1)
+def load_industry_sectors(data_version, _jobs_store, _company_dim):
+    return structures.industry_sectors(_jobs_store, _company_dim)
+
+industry_sectors = load_industry_sectors(data_version, jobs_store, company_dim)
+
+@st.cache_resource(max_entries=1)
+def load_company_profiles(data_version, _company_df):
+    return structures.company_profiles(_company_df)
+
+company_profiles = load_company_profiles(data_version, company_df)
+
+@st.cache_resource(max_entries=1)
+def load_salary_cube(data_version, _jobs_store):
+    return structures.salary_cube(_jobs_store)
+
+salary_cube = load_salary_cube(data_version, jobs_store)
 
 # Remove double quotes
 job_title_options = [title.replace('"', '') for title in job_title_options]
 job_func_options = [func.replace('"', '') for func in job_func_options]
 
-min_date = df['POSTED_DATE'].min()
-max_date = df['POSTED_DATE'].max()
+min_date = jobs_store.min_date
+max_date = jobs_store.max_date
 
 state_options = sorted(state_df['STATE'].unique().tolist())
 workplace_options = ['onsite', 'hybrid', 'remote']
@@ -185,20 +175,30 @@ salary_ranges = [
 if "active_page" not in st.session_state:
     st.session_state["active_page"] = "Overview"
 
-# Sidebar navigation linked to session state
+# Sidebar navigation linked to session state (the Admin page only for ADMIN_USERS)
+pages = ["Overview", "Job Map", "Requirements", "Company Info", "Jobs Lookup", "Other Resources"]
+if admin.is_admin(current_user):
+    pages.append("Admin")
+if st.session_state["active_page"] not in pages:
+    st.session_state["active_page"] = "Overview"
 st.sidebar.title("Navigation")
 page = st.sidebar.radio(
     "Go to",
-    ["Overview", "Job Map", "Requirements", "Company Info", "Jobs Lookup", "Other Resources"],
-    index=["Overview", "Job Map", "Requirements", "Company Info", "Jobs Lookup", "Other Resources"].index(st.session_state["active_page"]),
+    pages,
+    index=pages.index(st.session_state["active_page"]),
     key="active_page"
 )
 
+if current_user is not None and st.sidebar.button("Log out"):
+    del st.session_state["auth_token"]
+    st.rerun()
+
 st.title("Job Data Dashboard")
 
 with st.form(key="filters_form"):
     row1 = st.columns(4)
     row2 = st.columns(4)
+    row3 = st.columns(4)
 
     with row1[0]:
         date_range = st.date_input(
@@ -221,6 +221,19 @@ with st.form(key="filters_form"):
         selected_job_func = st.selectbox("Job Function", options=["All"] + job_func_options, key="selected_job_func")
     with row2[2]:
         selected_salary = st.selectbox("Salary Range", options=salary_ranges, key="selected_salary")
+    with row2[3]:
+        collapse_duplicates = st.checkbox("Collapse duplicate postings", key="collapse_duplicates",
+                                          help="Count reposts of the same role (same company, title, "
+                                               "location and skills) once")
+
+    # Radius search across state lines (e.g. New York, NY also matches Jersey City, NJ)
+    with row3[0]:
+        selected_near_city = st.selectbox("Near City", options=["All"] + city_index.options(), key="selected_near_city")
+    with row3[1]:
+        selected_radius = st.selectbox("Within (miles)", options=geo.RADIUS_OPTIONS,
+                                       index=geo.RADIUS_OPTIONS.index(geo.DEFAULT_RADIUS_MILES)
+                                       if geo.DEFAULT_RADIUS_MILES in geo.RADIUS_OPTIONS else 0,
+                                       key="selected_radius")
 
     cols = st.columns(6)
     with cols[0]:
@@ -229,52 +242,104 @@ with st.form(key="filters_form"):
         reset_button = st.form_submit_button(label="Reset Filters")
 
 if reset_button:
-    for key in ["date_range", "selected_state", "selected_workplace", "selected_seniority", "selected_job_title", "selected_job_func", "selected_salary"]:
+    for key in FILTER_KEYS:
         if key in st.session_state:
             del st.session_state[key]
     st.rerun()
 
-start_date = pd.to_datetime(date_range[0])
-end_date = pd.to_datetime(date_range[1])
-
-filtered_df = df[(df['POSTED_DATE'] >= start_date) & (df['POSTED_DATE'] <= end_date)]
-
-if selected_state != "All":
-    filtered_df = filtered_df[filtered_df['STATE'] == selected_state]
-if selected_workplace != "All":
-    filtered_df = filtered_df[filtered_df['WORKPLACE'] == selected_workplace]
-if selected_seniority != "All":
-    filtered_df = filtered_df[filtered_df['SENIORITY_LEVEL'] == selected_seniority]
-if selected_job_title != "All":
-    filtered_df = filtered_df[filtered_df['PRIMARY_TITLE'] == selected_job_title]
-if selected_job_func != "All":
-    filtered_df = filtered_df[filtered_df['JOB_FUNCTION_LIST'].apply(
-        lambda x: selected_job_func in ast.literal_eval(x) if isinstance(x, str) else False
-    )]
-if selected_salary != "All":
-    salary_min, salary_max = selected_salary.replace("K", "").split(" - ")
-    salary_min = int(salary_min) * 1000
-    salary_max = int(salary_max) * 1000 if salary_max != "+" else float('inf')
-    filtered_df = filtered_df[
-        (filtered_df['AVG_SALARY'] >= salary_min) & (filtered_df['AVG_SALARY'] <= salary_max)
-    ]
+filters = {
+    "start_date": str(pd.to_datetime(date_range[0]).date()),
+    "end_date": str(pd.to_datetime(date_range[1]).date()),
+    "state": selected_state,
+    "workplace": selected_workplace,
+    "seniority": selected_seniority,
+    "job_title": selected_job_title,
+    "job_func": selected_job_func,
+    "salary": selected_salary,
+    "collapse_duplicates": collapse_duplicates,
+    "near_city": selected_near_city,
+    # The radius only matters (and only splits the cache) when a city is chosen
+    "radius_miles": selected_radius if selected_near_city != "All" else None,
+}
+# Includes the snapshot version so derivations cached under it go stale on a data refresh
+filter_key = filter_signature({**filters, "data_version": data_version})
+
+# Only the month partitions overlapping the date range are touched (filtered by EXECUTION_BACKEND)
+backend = backends.get_backend()
+filtered_df = jobs_store.select(filters["start_date"], filters["end_date"],
+                                lambda partition: backend.filter(partition, filters))
+if filters["near_city"] != "All":
+    filtered_df = city_index.filter(filtered_df, filters["near_city"], filters["radius_miles"])
+if filters["collapse_duplicates"]:
+    n_postings = len(filtered_df)
+    filtered_df = dedup.collapse(filtered_df, dup_clusters)
+    st.caption(f"{n_postings - len(filtered_df):,} duplicate postings collapsed into {len(filtered_df):,} unique roles.")
+# Unfiltered views are answered from the whole-dataset totals maintained across refreshes
+totals = derived if is_unfiltered(filters, min_date, max_date) else None
+# select() concatenates the months into a frame owned by this session, so it counts even when unfiltered
+session_memory.track("filtered_df", filtered_df)
+
+# Speculatively compute the other pages' aggregates for these filters in the background,
+# so switching pages right after a filter change finds them ready
+import overview, job_map, requirements, company_info
+page_aggregates = {
+    "Overview": lambda: overview.aggregate(filtered_df, sectors=industry_sectors, companies=company_dim),
+    "Job Map": lambda: job_map.process_data(filtered_df, state_df, city_df, totals),
+    "Requirements": lambda: requirements.aggregate(filtered_df, skill_matrix, totals=totals),
+    "Company Info": lambda: company_info.aggregate(filtered_df, totals, company_dim, industry_sectors),
+}
+precompute.schedule(filter_key, {name: compute for name, compute in page_aggregates.items()
+                                 if name != st.session_state["active_page"]})
 
 # ✅ Route to the selected page (which stays remembered)
 if st.session_state["active_page"] == "Overview":
     import overview
-    overview.main(filtered_df)
+    overview.main(filtered_df, filter_key=filter_key, sectors=industry_sectors, companies=company_dim)
 elif st.session_state["active_page"] == "Job Map":
     import job_map
-    job_map.main(filtered_df, state_df, city_df)
+    job_map.main(filtered_df, state_df, city_df, salary_cube=salary_cube, filters=filters, filter_key=filter_key,
+                 totals=totals, city_index=city_index)
 elif st.session_state["active_page"] == "Requirements":
     import requirements
-    requirements.main(filtered_df)
+    requirements.main(filtered_df, skill_matrix=skill_matrix, filter_key=filter_key, totals=totals)
 elif st.session_state["active_page"] == "Company Info":
     import company_info
-    company_info.main(filtered_df, company_df)
+    company_info.main(filtered_df, company_df, salary_cube=salary_cube, filters=filters, filter_key=filter_key,
+                      totals=totals, profiles=company_profiles, companies=company_dim,
+                      sectors=industry_sectors)
 elif st.session_state["active_page"] == "Jobs Lookup":
     import jobs_lookup
-    jobs_lookup.main(filtered_df, company_df)
+    jobs_lookup.main(filtered_df, company_dim, search_index=job_search_index, jobs=jobs_store,
+                     similar_index=similarity_index)
 elif st.session_state["active_page"] == "Other Resources":
     import other_res
-    other_res.main()
\ No newline at end of file
+    other_res.main()
+elif st.session_state["active_page"] == "Admin":
+    admin.main(
+        caches={"load_data": (load_data, (jobs_store, company_df, state_df, city_df, job_title_options,
+                                          job_func_options, derived)),
+                "load_search_index": (load_search_index, job_search_index),
+                "load_skill_matrix": (load_skill_matrix, skill_matrix),
+                "load_dup_clusters": (load_dup_clusters, dup_clusters),
+                "load_risk_table": (load_risk_table, risk_table),
+                "load_salary_cube": (load_salary_cube, salary_cube),
+                "load_company_profiles": (load_company_profiles, company_profiles),
+                "load_city_index": (load_city_index, city_index),
+                "load_company_resolution": (load_company_resolution, company_resolution),
+                "load_similarity_index": (load_similarity_index, similarity_index),
+                "load_company_dimension": (load_company_dimension, company_dim),
+                "load_industry_sectors": (load_industry_sectors, industry_sectors)},
+        structures={"jobs partitions": jobs_store, "search index": job_search_index, "skill matrix": skill_matrix,
+                    "duplicate clusters": dup_clusters, "risk table": risk_table, "salary cube": salary_cube,
+                    "derived aggregates": derived, "company profiles": company_profiles,
+                    "city index": city_index, "company resolution": company_resolution,
+                    "similarity index": similarity_index, "company dimension": company_dim,
+                    "industry sectors": industry_sectors},
+        tables={"companies": company_df, "states": state_df, "cities": city_df, "filtered jobs": filtered_df},
+        jobs_store=jobs_store,
+        company_matching=company_resolution.stats(),
+        industry_mapping=industry_sectors.stats(),
+    )
+
+# Per-session memory figures (after the page, so its derivations are included)
+session_memory.render_debug()
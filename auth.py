@@ -0,0 +1,138 @@
+import os
+import time
+import hmac
+import base64
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import bcrypt
+import pandas as pd
+import streamlit as st
+
+# Authentication settings (overridable through the environment)
+AUTH_DISABLED = os.getenv("AUTH_DISABLED", "0") == "1"        # local development / load tests only
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "4"))            # concurrent bcrypt checks per process
+AUTH_MAX_PENDING = int(os.getenv("AUTH_MAX_PENDING", "32"))   # queued + running checks before rejecting
+AUTH_TIMEOUT = float(os.getenv("AUTH_TIMEOUT", "10"))
+MAX_FAILED_ATTEMPTS = int(os.getenv("MAX_FAILED_ATTEMPTS", "5"))
+LOCKOUT_SECONDS = int(os.getenv("LOCKOUT_SECONDS", "300"))
+# Usernames with recent failures kept in the attempt log (guessed names would otherwise grow it without limit)
+MAX_TRACKED_USERNAMES = int(os.getenv("MAX_TRACKED_USERNAMES", "10000"))
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", "43200"))
+# Must be shared by all worker processes for tokens to validate everywhere
+SESSION_SECRET = (os.getenv("SESSION_SECRET") or secrets.token_hex(32)).encode("utf-8")
+
+
+class AuthBusyError(RuntimeError):
+    """Raised when too many password checks are already in flight."""
+
+
+# Load user credentials from file (re-read only when the file changes)
+@st.cache_data(max_entries=1)
+def _read_user_credentials(filepath, mtime_ns):
+    users_df = pd.read_csv(filepath)
+    return dict(zip(users_df["username"], users_df["password_hash"]))
+
+def load_user_credentials(filepath="users.csv"):
+    return _read_user_credentials(filepath, os.stat(filepath).st_mtime_ns)
+
+
+# Shared worker pool, in-flight limit and failed-attempt log (one per process)
+@st.cache_resource
+def _auth_state():
+    return {
+        "executor": ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt"),
+        "slots": threading.BoundedSemaphore(AUTH_MAX_PENDING),
+        "lock": threading.Lock(),
+        "failures": {},
+        # Checked for unknown users so their response time matches known ones
+        "dummy_hash": bcrypt.hashpw(secrets.token_bytes(16), bcrypt.gensalt()),
+    }
+
+
+def lockout_remaining(username):
+    """Seconds until `username` may try again (0 when not throttled)."""
+    state = _auth_state()
+    now = time.time()
+    with state["lock"]:
+        recent = [t for t in state["failures"].get(username, []) if now - t < LOCKOUT_SECONDS]
+        # Only usernames with recent failures are kept, so probing arbitrary names adds no entries
+        if recent:
+            state["failures"][username] = recent
+        else:
+            state["failures"].pop(username, None)
+        if len(recent) < MAX_FAILED_ATTEMPTS:
+            return 0
+        return int(LOCKOUT_SECONDS - (now - recent[0])) + 1
+
+
+def _record_attempt(username, success):
+    state = _auth_state()
+    now = time.time()
+    with state["lock"]:
+        failures = state["failures"]
+        if success:
+            failures.pop(username, None)
+            return
+        # Re-inserted so the log stays ordered by each name's latest failure
+        failures[username] = failures.pop(username, []) + [now]
+        if len(failures) > MAX_TRACKED_USERNAMES:
+            # Expired entries go first, then the names that failed least recently
+            for name in [name for name, times in failures.items() if now - times[-1] >= LOCKOUT_SECONDS]:
+                del failures[name]
+            while len(failures) > MAX_TRACKED_USERNAMES:
+                del failures[next(iter(failures))]
+
+
+def _checkpw(password, stored_hash, slots):
+    try:
+        return bcrypt.checkpw(password, stored_hash)
+    finally:
+        slots.release()
+
+
+# Authentication function. bcrypt runs on the bounded worker pool, so at most AUTH_WORKERS hashes
+# compete for CPU; the pool bounds CPU use, not latency: the calling script thread still blocks on
+# the result, for at most AUTH_TIMEOUT seconds.
+def authenticate(username, password, user_credentials):
+    state = _auth_state()
+    if not state["slots"].acquire(blocking=False):
+        raise AuthBusyError("Too many logins in progress.")
+    known = username in user_credentials
+    stored_hash = user_credentials[username].encode("utf-8") if known else state["dummy_hash"]
+    future = state["executor"].submit(_checkpw, password.encode("utf-8"), stored_hash, state["slots"])
+    try:
+        success = future.result(timeout=AUTH_TIMEOUT) and known
+    except TimeoutError:
+        # A check that never started gives its slot back here (a running one releases it when done)
+        if future.cancel():
+            state["slots"].release()
+        raise AuthBusyError("The password check timed out.")
+    _record_attempt(username, success)
+    return success
+
+
+# Signed session tokens: "<base64 username|expiry>.<hmac-sha256>"
+def issue_token(username):
+    payload = f"{username}|{int(time.time()) + SESSION_TOKEN_TTL}".encode("utf-8")
+    signature = hmac.new(SESSION_SECRET, payload, hashlib.sha256).hexdigest()
+    return f"{base64.urlsafe_b64encode(payload).decode('ascii')}.{signature}"
+
+
+def validate_token(token, user_credentials):
+    """Return the token's username if it is authentic, unexpired and the user still exists."""
+    if not token:
+        return None
+    try:
+        encoded, signature = token.rsplit(".", 1)
+        payload = base64.urlsafe_b64decode(encoded.encode("ascii"))
+        expected = hmac.new(SESSION_SECRET, payload, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            return None
+        username, expiry = payload.decode("utf-8").rsplit("|", 1)
+    except ValueError:
+        return None
+    if int(expiry) < time.time() or username not in user_credentials:
+        return None
+    return username
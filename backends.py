@@ -0,0 +1,207 @@
+"""Execution backends for the filter and group-by operations behind the pages.
+
+EXECUTION_BACKEND=pandas (default) runs them in pandas; EXECUTION_BACKEND=duckdb
+runs them on in-process DuckDB over the same Arrow-backed columns, using
+EXECUTION_THREADS cores. Both return the same frames, which can be checked with
+
+    python backends.py --check --rows 200000
+"""
+import os
+import time
+import argparse
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from filters import apply_filters, parse_salary_range
+
+try:
+    import duckdb
+except ImportError:  # only needed for EXECUTION_BACKEND=duckdb
+    duckdb = None
+
+EXECUTION_BACKEND = os.getenv("EXECUTION_BACKEND", "pandas")
+EXECUTION_THREADS = int(os.getenv("EXECUTION_THREADS", str(os.cpu_count() or 1)))
+
+# Filter key -> column compared for equality
+_EQUALITY_FILTERS = {"state": "STATE", "workplace": "WORKPLACE", "seniority": "SENIORITY_LEVEL",
+                     "job_title": "PRIMARY_TITLE"}
+_SQL_AGGREGATES = {"count": 'COUNT("{}")', "mean": 'AVG("{}")', "sum": 'SUM("{}")', "size": "COUNT(*)"}
+
+
+class PandasBackend:
+    name = "pandas"
+
+    def filter(self, df, filters):
+        """Rows of `df` matching the global dashboard filters."""
+        return apply_filters(df, filters)
+
+    def group_agg(self, df, by, aggs):
+        """Named aggregations {output: (column, "count" | "mean" | "sum" | "size")} per non-missing
+        value of column `by`, as a frame sorted by `by`."""
+        return df.groupby(by).agg(**aggs).reset_index()
+
+    def value_counts(self, series):
+        """Counts of the non-missing values, most frequent first."""
+        return series.value_counts()
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, threads=EXECUTION_THREADS):
+        self._db = duckdb.connect()
+        self._db.execute(f"SET threads TO {int(threads)}")
+        self._local = threading.local()
+
+    def _query(self, sql, params, **tables):
+        """Run `sql` over Arrow tables registered under the given names (one cursor per thread)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = self._local.con = self._db.cursor()
+        for name, table in tables.items():
+            con.register(name, table)
+        try:
+            return con.execute(sql, params).to_arrow_table()
+        finally:
+            for name in tables:
+                con.unregister(name)
+
+    def filter(self, df, filters):
+        conditions = ['"POSTED_DATE" >= ?', '"POSTED_DATE" <= ?']
+        params = [pd.to_datetime(filters["start_date"]), pd.to_datetime(filters["end_date"])]
+        columns = ["POSTED_DATE"]
+        for key, column in _EQUALITY_FILTERS.items():
+            if filters[key] != "All":
+                conditions.append(f'"{column}" = ?')
+                params.append(filters[key])
+                columns.append(column)
+        if filters["job_func"] != "All":
+            # Membership in the stringified list, as ast.literal_eval would parse it
+            conditions.append('(contains("JOB_FUNCTION_LIST", ?) OR contains("JOB_FUNCTION_LIST", ?))')
+            params += [f"'{filters['job_func']}'", f'"{filters["job_func"]}"']
+            columns.append("JOB_FUNCTION_LIST")
+        if filters["salary"] != "All":
+            salary_min, salary_max = parse_salary_range(filters["salary"])
+            conditions.append('"AVG_SALARY" >= ?')
+            params.append(salary_min)
+            if salary_max != float("inf"):
+                conditions.append('"AVG_SALARY" <= ?')
+                params.append(salary_max)
+            columns.append("AVG_SALARY")
+
+        table = pa.Table.from_pandas(df[columns], preserve_index=False)
+        table = table.append_column("__pos", pa.array(np.arange(len(df), dtype=np.int64)))
+        positions = self._query(f'SELECT "__pos" FROM t WHERE {" AND ".join(conditions)}', params, t=table)
+        return df.iloc[np.sort(positions.column("__pos").to_numpy())]
+
+    def group_agg(self, df, by, aggs):
+        columns = list(dict.fromkeys([by] + [column for column, _ in aggs.values()]))
+        table = pa.Table.from_pandas(df[columns], preserve_index=False)
+        selects = ", ".join(f'{_SQL_AGGREGATES[func].format(column)} AS "{name}"' for name, (column, func) in aggs.items())
+        result = self._query(f'SELECT "{by}", {selects} FROM t WHERE "{by}" IS NOT NULL '
+                             f'GROUP BY "{by}" ORDER BY "{by}"', [], t=table).to_pandas()
+        # COUNT(*) / COUNT(x) come back as int64 already; AVG/SUM as float64 like pandas
+        return result.astype({name: np.int64 for name, (_, func) in aggs.items() if func in ("count", "size")})
+
+    def value_counts(self, series):
+        name = series.name if series.name is not None else "value"
+        table = pa.table({name: pa.Array.from_pandas(series)})
+        result = self._query(f'SELECT "{name}", COUNT(*) AS "count" FROM t WHERE "{name}" IS NOT NULL '
+                             f'GROUP BY "{name}" ORDER BY "count" DESC, "{name}"', [], t=table).to_pandas()
+        return result.set_index(name)["count"].rename_axis(series.name)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """The configured (or named) backend, created once per process."""
+    name = name or EXECUTION_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            if name == "pandas":
+                _backends[name] = PandasBackend()
+            elif name == "duckdb":
+                if duckdb is None:
+                    raise RuntimeError("EXECUTION_BACKEND=duckdb needs the duckdb package (pip install duckdb)")
+                _backends[name] = DuckDBBackend()
+            else:
+                raise ValueError(f"Unknown EXECUTION_BACKEND {name!r} (expected 'pandas' or 'duckdb')")
+        return _backends[name]
+
+
+# ---- Equivalence check between backends ----
+def _same(left, right):
+    """Frames/Series equal up to dtype (object vs Arrow strings) and row order among ties."""
+    if isinstance(left, pd.Series):
+        left, right = left.reset_index(), right.reset_index()
+    keys = list(left.columns)
+    left = left.astype(object).sort_values(keys, kind="stable").reset_index(drop=True)
+    right = right.astype(object).sort_values(keys, kind="stable").reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(left, right, check_dtype=False, check_exact=False, rtol=1e-9)
+    except AssertionError:
+        return False
+    return True
+
+
+def check(rows=50000, seed=0, candidate="duckdb"):
+    """Run every operation on both backends over synthetic data; returns a list of mismatches."""
+    import data_source
+
+    jobs = data_source.synthetic_tables(rows, seed)["jobs"]
+    jobs = jobs.astype({col: pd.StringDtype("pyarrow") for col in jobs.columns if jobs[col].dtype == object})
+    reference, other = get_backend("pandas"), get_backend(candidate)
+    all_filters = {"start_date": str(jobs["POSTED_DATE"].min().date()), "end_date": str(jobs["POSTED_DATE"].max().date()),
+                   "state": "All", "workplace": "All", "seniority": "All", "job_title": "All", "job_func": "All",
+                   "salary": "All"}
+    cases = [all_filters,
+             {**all_filters, "state": "CA", "workplace": "remote"},
+             {**all_filters, "start_date": "2025-04-01", "end_date": "2025-06-30", "seniority": "Entry level"},
+             {**all_filters, "job_func": "Finance", "salary": "80K - 100K"},
+             {**all_filters, "job_title": "Accountant", "salary": "200K+"}]
+
+    mismatches, timings = [], {reference.name: 0.0, other.name: 0.0}
+    for i, filters in enumerate(cases):
+        results = {}
+        for backend in (reference, other):
+            start = time.perf_counter()
+            df = backend.filter(jobs, filters)
+            results[backend.name] = {
+                "rows": pd.Series(df.index.to_numpy()),
+                "by_state": backend.group_agg(df, "STATE", {"JOB_COUNT": ("JOB_ID", "count"),
+                                                            "AVG_SALARY": ("AVG_SALARY", "mean")}),
+                "by_company": backend.group_agg(df, "COMPANY_NAME", {"avg_salary": ("AVG_SALARY", "mean"),
+                                                                     "postings": ("AVG_SALARY", "count"),
+                                                                     "jobs": ("COMPANY_NAME", "size")}),
+                "seniority": backend.value_counts(df["SENIORITY_LEVEL"]),
+                "degree": backend.value_counts(df["DEGREE"]),
+            }
+            timings[backend.name] += time.perf_counter() - start
+        for op, expected in results[reference.name].items():
+            if not _same(expected, results[other.name][op]):
+                mismatches.append(f"case {i} {op}")
+    return mismatches, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="compare a backend against pandas")
+    parser.add_argument("--backend", default="duckdb", help="backend compared against pandas")
+    parser.add_argument("--rows", type=int, default=50000, help="synthetic job postings")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.check:
+        parser.error("nothing to do (use --check)")
+    mismatches, timings = check(args.rows, args.seed, args.backend)
+    print(", ".join(f"{name}: {seconds:.2f}s" for name, seconds in timings.items()))
+    if mismatches:
+        print("MISMATCH: " + "; ".join(mismatches))
+        raise SystemExit(1)
+    print("All results match.")
+
+
+if __name__ == "__main__":
+    main()
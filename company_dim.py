@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from entity_resolution import company_ids
+
+# COMPANIES_INFO attributes carried on the dimension (those present in the table)
+DIMENSION_COLUMNS = ["COMPANY_NAME", "INDUSTRY", "HEADQUARTERS", "WEBSITE", "FOUNDED", "VERIFIED_PAGE", "MEMBERS",
+                     "POSTS"]
+NOT_IN_DATABASE = ("Not in Database", "Company information is not available in our records.")
+
+
+class CompanyDimension:
+    """Company dimension of the jobs (fact) table, with integer surrogate keys.
+
+    `table` has one row per company, indexed by key 0..n-1: the COMPANIES_INFO
+    companies (one per company_id) with their attributes and risk level, then
+    one row per distinct company name of the postings that matched none of
+    them. `keys[row]` is the key of each posting by ROW_ID (-1 without a
+    company name), so company-level work is an integer bincount or a gather.
+    """
+
+    def __init__(self, table, keys, name_keys):
+        self.table = table
+        self.keys = keys
+        self.name_keys = name_keys
+        self.n_companies = int((table["COMPANY_ID"] >= 0).sum())
+        # COMPANIES_INFO name -> key (first company holding it), for lookups by name
+        names = table["COMPANY_NAME"].iloc[:self.n_companies]
+        self.company_keys = pd.Series(names.index, index=names.to_numpy())[lambda s: ~s.index.duplicated()]
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def nbytes(self):
+        return int(self.keys.nbytes + self.table.memory_usage(deep=True).sum()
+                   + self.name_keys.memory_usage(deep=True) + self.company_keys.memory_usage(deep=True))
+
+    def names(self):
+        """COMPANIES_INFO company names (the company search candidates)."""
+        return self.company_keys.index
+
+    def lookup(self, name):
+        """The dimension row of a COMPANIES_INFO company name."""
+        return self.table.iloc[self.company_keys[name]]
+
+    def attributes(self, keys, columns):
+        """Gather `columns` for each key (missing values for -1)."""
+        return self.table[columns].reindex(keys)
+
+    def count(self, keys, weights=None):
+        """Postings (or summed `weights`) per key; `keys` of -1 are left out."""
+        named = keys >= 0
+        return np.bincount(keys[named], weights=None if weights is None else weights[named], minlength=len(self))
+
+    def by_name(self, values):
+        """Re-key a Series indexed by posting company name onto dimension keys (summed per key)."""
+        keys = self.name_keys.reindex(values.index).to_numpy()
+        known = ~np.isnan(keys)
+        return self.count(keys[known].astype(np.int64), values.to_numpy(dtype=np.float64)[known])
+
+
+def build_company_dimension(job_names, resolution, companies, risk_table):
+    """Company dimension from the postings' COMPANY_NAME (by ROW_ID), their entity resolution
+    (entity_resolution.CompanyResolution), COMPANIES_INFO and the risk table (by COMPANY_ID)."""
+    ids = company_ids(companies)
+    first = ~pd.Series(ids).duplicated().to_numpy()
+    table = companies.loc[first, [col for col in DIMENSION_COLUMNS if col in companies.columns]].reset_index(drop=True)
+    table.insert(0, "COMPANY_ID", ids[first])
+    risk = risk_table.set_index("COMPANY_ID").reindex(table["COMPANY_ID"])
+    table["RISK_LEVEL"] = risk["RISK_LEVEL"].fillna(NOT_IN_DATABASE[0]).to_numpy()
+    table["RISK_EXPLANATION"] = risk["RISK_EXPLANATION"].fillna(NOT_IN_DATABASE[1]).to_numpy()
+
+    # Matched postings: companies row -> key; unmatched ones: one key per distinct posting name
+    row_keys = pd.Index(table["COMPANY_ID"]).get_indexer(ids)
+    matched = resolution.company_rows >= 0
+    keys = np.full(len(resolution.company_rows), -1, dtype=np.int32)
+    keys[matched] = row_keys[resolution.company_rows[matched]]
+    names = pd.Series(job_names).to_numpy(dtype=object)
+    unmatched = np.flatnonzero(~matched & pd.notna(names))
+    codes, unmatched_names = pd.factorize(names[unmatched])
+    keys[unmatched] = len(table) + codes
+    # Extend the columns in place (missing attributes keep each column's dtype, unlike a concat)
+    n_matched = len(table)
+    table_ids = np.concatenate([table["COMPANY_ID"].to_numpy(), np.full(len(unmatched_names), -1, dtype=np.int64)])
+    table = table.reindex(pd.RangeIndex(n_matched + len(unmatched_names)))
+    table["COMPANY_ID"] = table_ids
+    table.loc[n_matched:, "COMPANY_NAME"] = unmatched_names
+    table.loc[n_matched:, ["RISK_LEVEL", "RISK_EXPLANATION"]] = NOT_IN_DATABASE
+
+    # Posting name -> key (first posting holding it), for tables still keyed by name
+    postings = pd.DataFrame({"name": names, "key": keys})
+    postings = postings[postings["key"] >= 0].drop_duplicates("name")
+    name_keys = pd.Series(postings["key"].to_numpy(), index=postings["name"].to_numpy())
+    # Companies without a name are shown by the name they were posted under
+    unnamed = table["COMPANY_NAME"].isna()
+    if unnamed.any():
+        table.loc[unnamed, "COMPANY_NAME"] = pd.Series(name_keys.index, index=name_keys.to_numpy()) \
+            .groupby(level=0).first().reindex(table.index[unnamed]).to_numpy()
+    return CompanyDimension(table, keys, name_keys)
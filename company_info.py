@@ -1,22 +1,100 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import datetime
-import ast
-import re
-
-# Helper function to parse entries like '1,712 University of Washington'
-def parse_entry(entry):
-    entry = entry.strip()
-    m = re.match(r'([\d,]+)\s+(.+)', entry)
-    if m:
-        num_str, name = m.groups()
-        num = int(num_str.replace(",", ""))
-        return name.strip(), num
-    return None, 0
-
-def main(df, companies_info):
+import sketches
+import precompute
+from agg_planner import AggPlan
+import sections
+import industry_sectors
+from list_parse import parse_lists
+
+# Employee-profile columns of COMPANIES_INFO: lists of entries like '1,712 University of Washington'
+PROFILE_COLUMNS = ["WHERE_THEY_STUDIED", "WHAT_THEY_ARE_SKILLED_AT", "WHAT_THEY_DO", "WHAT_THEY_STUDIED",
+                   "WHERE_THEY_LIVE"]
+
+# Per-company metrics, declared once and computed in one grouped pass (agg_planner); with the company
+# dimension (company_dim.CompanyDimension) companies are grouped by their integer keys
+def company_plan(columns, companies=None):
+    plan = AggPlan()
+    if companies is not None:
+        plan.key("COMPANY_NAME", codes=lambda df: (companies.keys[df.index.to_numpy()],
+                                                   companies.table["COMPANY_NAME"]))
+    else:
+        plan.key("COMPANY_NAME", "COMPANY_NAME")
+    plan.size("job_count", "COMPANY_NAME")
+    if "AVG_SALARY" in columns:
+        plan.mean("avg_salary", "COMPANY_NAME", "AVG_SALARY").count("postings", "COMPANY_NAME", "AVG_SALARY")
+    if "MIN_YEARS_OF_EXPERIENCE" in columns:
+        plan.where("newbie", lambda df: df["MIN_YEARS_OF_EXPERIENCE"] == 0)
+        plan.size("newbie_job_count", "COMPANY_NAME", where="newbie")
+    if "SENIORITY_LEVEL" in columns:
+        plan.where("internship", lambda df: df["SENIORITY_LEVEL"].str.lower().isin(["internship", "entry level"]))
+        plan.size("internship_job_count", "COMPANY_NAME", where="internship")
+    return plan
+
+# Per-company aggregates of the filtered postings (pure, so they can also be computed in the background);
+# `totals` (incremental.DerivedAggregates) answers them when `df` is the unfiltered data
+def aggregate(df, totals=None, companies=None, sectors=None):
+    if "COMPANY_NAME" not in df.columns:
+        return {"company_stats": None, "job_count_company": None, "newbie_counts": None, "internship_counts": None,
+                "sectors": None}
+    if totals is not None:
+        aggs = aggregate_totals(totals, companies)
+    else:
+        aggs = top_companies(company_plan(df.columns, companies).run(df)["COMPANY_NAME"].reset_index())
+    aggs["sectors"] = sector_rollup(df, companies, sectors)
+    return aggs
+
+# Postings, salaries and risk mix per industry sector of the employer, with the companies of each sector
+def sector_rollup(df, companies, sectors):
+    if companies is None or sectors is None:
+        return None
+    table = industry_sectors.rollup(df, sectors, companies, by="employer")
+    table["COMPANIES"] = sectors.company_counts(companies).reindex(table.index, fill_value=0)
+    return table
+
+# Top 20 tables from one row of metrics per company
+def top_companies(metrics):
+    aggs = {"company_stats": None, "job_count_company": None, "newbie_counts": None, "internship_counts": None}
+    if "avg_salary" in metrics.columns:
+        # Exclude companies with less than 10 postings.
+        company_stats = metrics.loc[metrics["postings"] >= 10, ["COMPANY_NAME", "avg_salary", "postings"]]
+        aggs["company_stats"] = company_stats.sort_values("avg_salary", ascending=False, kind="stable").head(20)
+    for name, column in [("job_count_company", "job_count"), ("newbie_counts", "newbie_job_count"),
+                         ("internship_counts", "internship_job_count")]:
+        if column in metrics.columns:
+            counts = metrics.loc[metrics[column] > 0, ["COMPANY_NAME", column]]
+            aggs[name] = counts.sort_values(column, ascending=False, kind="stable").head(20)
+    return aggs
+
+def aggregate_totals(totals, companies=None):
+    company_stats = totals.company_salary()
+    if companies is not None:
+        # Tables keyed by posting company name, re-keyed onto the company dimension
+        company_stats = company_stats.set_index("COMPANY_NAME")
+        postings = companies.by_name(company_stats["postings"])
+        return top_companies(pd.DataFrame({
+            "COMPANY_NAME": companies.table["COMPANY_NAME"],
+            "avg_salary": companies.by_name(company_stats["avg_salary"] * company_stats["postings"])
+                          / np.where(postings > 0, postings, np.nan),
+            "postings": postings.round().astype(np.int64),
+            **{column: companies.by_name(totals.counts(table)).round().astype(np.int64)
+               for table, column in [("company_jobs", "job_count"), ("company_newbie_jobs", "newbie_job_count"),
+                                     ("company_internship_jobs", "internship_job_count")]},
+        }))
+    company_stats = company_stats[company_stats["postings"] >= 10]
+    aggs = {"company_stats": company_stats.sort_values("avg_salary", ascending=False).head(20)}
+    for name, table, column in [("job_count_company", "company_jobs", "job_count"),
+                                ("newbie_counts", "company_newbie_jobs", "newbie_job_count"),
+                                ("internship_counts", "company_internship_jobs", "internship_job_count")]:
+        aggs[name] = totals.counts(table).head(20).rename_axis("COMPANY_NAME").reset_index(name=column)
+    return aggs
+
+def main(df, companies_info, salary_cube=None, filters=None, filter_key=None, totals=None, profiles=None,
+         companies=None, sectors=None):
     st.header("Company Overview")
     
     # -------------------------------
@@ -29,200 +107,258 @@ def main(df, companies_info):
       <div style="font-size: 48px;">{total_companies}</div>
     </div>
     """, unsafe_allow_html=True)
-    
+
+    # -------------------------------
+    # Tiles: Salary Percentiles and Distinct Employers (merged sketches for the current filters)
+    # -------------------------------
+    overall = sketches.salary_summary(salary_cube, df, filters).iloc[0]
+    tile_cols = st.columns(3)
+    for col, label, value in zip(tile_cols,
+                                 ["Median Salary", "90th Percentile Salary", "Distinct Employers"],
+                                 [overall["P50"], overall["P90"], overall["DISTINCT_COMPANIES"]]):
+        display = "N/A" if pd.isna(value) else (f"${value:,.0f}" if "Salary" in label else f"~{value:,.0f}")
+        with col:
+            st.markdown(f"""
+            <div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; text-align: center; margin-bottom: 20px;">
+              <div style="font-size: 20px; font-weight: bold;">{label}</div>
+              <div style="font-size: 36px;">{display}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
     # -------------------------------
-    # Pie Chart: Industries Distribution
+    # Sections: each aggregates and builds its charts only once opened
     # -------------------------------
+    def aggs():
+        return precompute.page_aggregates("Company Info", filter_key,
+                                          lambda: aggregate(df, totals, companies, sectors))
+
+    sections.render("Company Info", {
+        "Salary by Job Title": (lambda: title_salary_figure(df, salary_cube, filters), show_title_salary),
+        "Industries": (lambda: industry_figure(companies_info), show_industries),
+        "Industry Sectors": (lambda: sector_figures(aggs()), show_sectors),
+        "Top Companies": (lambda: top_company_figures(aggs()), show_top_companies),
+        "Schools & Skills": (lambda: profile_figures(profiles if profiles is not None else
+                                                     profile_totals(companies_info)), show_profiles),
+        "Entry-Level Hiring": (lambda: entry_level_figures(aggs()), show_entry_level),
+        "Founded Over Time": (lambda: founded_figure(companies_info), show_founded),
+    }, filter_key)
+
+# Horizontal bar chart of a top-N table, tallest first
+def ranked_bar(data, x, y, title, labels):
+    fig = px.bar(data, x=x, y=y, orientation="h", title=title, labels=labels)
+    fig.update_yaxes(categoryorder="total ascending")
+    fig.update_layout(height=max(300, len(data)*30))
+    return fig
+
+# -------------------------------
+# Salary Percentiles by Job Title
+# -------------------------------
+def title_salary_figure(df, salary_cube, filters):
+    title_sketch = sketches.salary_summary(salary_cube, df, filters, by="PRIMARY_TITLE")
+    title_sketch = title_sketch[title_sketch["SALARY_POSTINGS"] >= 10].sort_values("P50", ascending=False).head(20)
+    if title_sketch.empty:
+        return None
+    title_sketch = title_sketch.reset_index()
+    fig_title_salary = px.bar(title_sketch, x=["P25", "P50", "P75", "P90"], y="PRIMARY_TITLE", orientation="h",
+                              barmode="group",
+                              title="Salary Percentiles by Job Title (titles with 10+ salaried postings)",
+                              labels={"PRIMARY_TITLE": "Job Title", "value": "Salary", "variable": "Percentile"})
+    fig_title_salary.update_yaxes(categoryorder="max ascending")
+    fig_title_salary.update_layout(height=max(300, len(title_sketch)*40))
+    return fig_title_salary
+
+def show_title_salary(fig_title_salary):
+    if fig_title_salary is not None:
+        st.plotly_chart(fig_title_salary, use_container_width=True, key="title_salary_percentiles")
+    else:
+        st.write("No job titles with 10 or more salaried postings.")
+
+# -------------------------------
+# Pie Chart: Industries Distribution
+# -------------------------------
+def industry_figure(companies_info):
+    if "INDUSTRY" not in companies_info.columns:
+        return None
+    industry_counts = companies_info["INDUSTRY"].value_counts().head(10).reset_index()
+    industry_counts.columns = ["INDUSTRY", "Count"]
+    fig_pie = px.pie(industry_counts, values="Count", names="INDUSTRY",
+                     title="Industries Distribution",
+                     color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig_pie.update_traces(textposition='outside', textinfo='label+percent', textfont=dict(size=12))
+    fig_pie.update_layout(showlegend=False)
+    return fig_pie
+
+def show_industries(fig_pie):
     st.markdown("### Industries Distribution")
-    if "INDUSTRY" in companies_info.columns:
-        industry_counts = companies_info["INDUSTRY"].value_counts().head(10).reset_index()
-        industry_counts.columns = ["INDUSTRY", "Count"]
-        fig_pie = px.pie(industry_counts, values="Count", names="INDUSTRY",
-                         title="Industries Distribution",
-                         color_discrete_sequence=px.colors.qualitative.Pastel)
-        fig_pie.update_traces(textposition='outside', textinfo='label+percent', textfont=dict(size=12))
-        fig_pie.update_layout(showlegend=False)
+    if fig_pie is not None:
         st.plotly_chart(fig_pie, use_container_width=True, key="company_industry_pie")
     else:
         st.write("Industry column not found in companies data.")
 
-    st.markdown("### Company Performance and Education/Skills Analysis (Based on Employee Profile)")
+# ------------------------
+# Industry Sectors (BLS sectors of the employers): companies and risk mix of the postings
+# ------------------------
+def sector_figures(aggs):
+    sectors = aggs["sectors"]
+    if sectors is None or sectors.empty:
+        return None, None, None
+    risk_levels = [column for column in sectors.columns
+                   if column not in ("JOBS", "AVG_SALARY", "SALARIED", "FUZZY_SHARE", "HIRING_COMPANIES", "COMPANIES")]
+    sectors = sectors.reset_index()
+    fig_sector_companies = px.bar(sectors, x=["HIRING_COMPANIES", "COMPANIES"], y="SECTOR", orientation="h",
+                                  barmode="group", title="Companies by Industry Sector",
+                                  labels={"SECTOR": "Sector", "value": "Companies", "variable": ""})
+    fig_sector_companies.for_each_trace(lambda trace: trace.update(name={
+        "HIRING_COMPANIES": "Hiring (current filters)", "COMPANIES": "In company database"}[trace.name]))
+    fig_sector_companies.update_yaxes(categoryorder="max ascending")
+    risk_mix = sectors.melt(id_vars="SECTOR", value_vars=risk_levels, var_name="RISK_LEVEL", value_name="POSTINGS")
+    risk_mix["SHARE"] = risk_mix["POSTINGS"] / risk_mix["SECTOR"].map(sectors.set_index("SECTOR")["JOBS"])
+    fig_sector_risk = px.bar(risk_mix, x="SHARE", y="SECTOR", color="RISK_LEVEL", orientation="h",
+                             title="Risk Mix of Postings by Industry Sector",
+                             labels={"SECTOR": "Sector", "SHARE": "Share of Postings", "RISK_LEVEL": "Risk"},
+                             color_discrete_map={"Potential Scam": "red", "High": "orange", "Medium": "gold",
+                                                 "Low": "green", "Not in Database": "gray"})
+    fig_sector_risk.update_layout(xaxis_tickformat=".0%")
+    return fig_sector_companies, fig_sector_risk, industry_sectors.fuzzy_shares(sectors)
 
-    
-    # ------------------------
-    # Chart 1: Top Companies by Average Salary (exclude companies with <10 postings)
-    # ------------------------
-    if "COMPANY_NAME" in df.columns and "AVG_SALARY" in df.columns:
-        company_stats = df[df["AVG_SALARY"].notnull()].groupby("COMPANY_NAME").agg(
-            avg_salary=("AVG_SALARY", "mean"),
-            postings=("COMPANY_NAME", "count")
-        ).reset_index()
-        # Exclude companies with less than 10 postings.
-        company_stats = company_stats[company_stats["postings"] >= 10]
-        company_stats = company_stats.sort_values("avg_salary", ascending=False).head(20)
-        height1 = max(300, len(company_stats)*30)
-        fig_company_salary = px.bar(company_stats, x="avg_salary", y="COMPANY_NAME", orientation="h",
-                                    title="Top Companies by Average Salary",
-                                    labels={"COMPANY_NAME": "Company", "AVG_SALARY": "Average Salary"})
-        fig_company_salary.update_yaxes(categoryorder="total ascending")
-        fig_company_salary.update_layout(height=height1)
-    else:
-        fig_company_salary = None
-
-    # ------------------------
-    # Chart 2: Top Companies by Job Count
-    # ------------------------
-    if "COMPANY_NAME" in df.columns:
-        job_count_company = df.groupby("COMPANY_NAME").size().reset_index(name="job_count")
-        job_count_company = job_count_company.sort_values("job_count", ascending=False).head(20)
-        height2 = max(300, len(job_count_company)*30)
-        fig_company_job = px.bar(job_count_company, x="job_count", y="COMPANY_NAME", orientation="h",
-                                 title="Top Companies by Job Count",
-                                 labels={"COMPANY_NAME": "Company", "job_count": "Job Count"})
-        fig_company_job.update_yaxes(categoryorder="total ascending")
-        fig_company_job.update_layout(height=height2)
-    else:
-        fig_company_job = None
-
-    # ------------------------
-    # Chart 3: Top 20 Schools from "Where they studied"
-    # ------------------------
-    school_counts = {}
-    if "WHERE_THEY_STUDIED" in companies_info.columns:
-        for entry in companies_info["WHERE_THEY_STUDIED"].dropna():
-            try:
-                school_list = ast.literal_eval(entry)
-                if isinstance(school_list, list):
-                    for item in school_list:
-                        school, count = parse_entry(item)
-                        if school:
-                            school_counts[school] = school_counts.get(school, 0) + count
-            except Exception:
-                continue
-        if school_counts:
-            school_df = pd.DataFrame(list(school_counts.items()), columns=["School", "Count"])
-            school_df = school_df.sort_values("Count", ascending=False).head(20)
-            height3 = max(300, len(school_df)*30)
-            fig_schools = px.bar(school_df, x="Count", y="School", orientation="h",
-                                 title="Top 20 Schools",
-                                 labels={"School": "School", "Count": "Head Count"})
-            fig_schools.update_yaxes(categoryorder="total ascending")
-            fig_schools.update_layout(height=height3)
-        else:
-            fig_schools = None
-    else:
-        fig_schools = None
-
-    # ------------------------
-    # Chart 4: Top 20 Skills from "What they are skilled at"
-    # ------------------------
-    skill_counts = {}
-    if "WHAT_THEY_ARE_SKILLED_AT" in companies_info.columns:
-        for entry in companies_info["WHAT_THEY_ARE_SKILLED_AT"].dropna():
-            try:
-                skill_list = ast.literal_eval(entry)
-                if isinstance(skill_list, list):
-                    for item in skill_list:
-                        skill, count = parse_entry(item)
-                        if skill:
-                            skill_counts[skill] = skill_counts.get(skill, 0) + count
-            except Exception:
-                continue
-        if skill_counts:
-            skill_df = pd.DataFrame(list(skill_counts.items()), columns=["Skill", "Count"])
-            skill_df = skill_df.sort_values("Count", ascending=False).head(20)
-            height4 = max(300, len(skill_df)*30)
-            fig_skills = px.bar(skill_df, x="Count", y="Skill", orientation="h",
-                                title="Top 20 Skills",
-                                labels={"Skill": "Skill", "Count": "Head Count"})
-            fig_skills.update_yaxes(categoryorder="total ascending")
-            fig_skills.update_layout(height=height4)
-        else:
-            fig_skills = None
-    else:
-        fig_skills = None
+def show_sectors(figures):
+    fig_sector_companies, fig_sector_risk, fuzzy = figures
+    st.markdown("### Industry Sectors")
+    if fig_sector_companies is None:
+        st.write("Industry sector data not available.")
+        return
+    col_left, col_right = st.columns(2)
+    with col_left:
+        st.plotly_chart(fig_sector_companies, use_container_width=True, key="sector_companies_chart")
+    with col_right:
+        st.plotly_chart(fig_sector_risk, use_container_width=True, key="sector_risk_chart")
+    # How much of each sector rests on labels matched by name similarity only
+    st.caption("Share of each sector's postings whose employer's INDUSTRY was fuzzy-matched to the taxonomy:")
+    st.dataframe(fuzzy, hide_index=True, use_container_width=True,
+                 column_config={"FUZZY_%": st.column_config.NumberColumn(format="%.1f%%")})
+
+# ------------------------
+# Top Companies by Average Salary (exclude companies with <10 postings) and by Job Count
+# ------------------------
+def top_company_figures(aggs):
+    fig_company_salary = fig_company_job = None
+    if aggs["company_stats"] is not None:
+        fig_company_salary = ranked_bar(aggs["company_stats"], "avg_salary", "COMPANY_NAME",
+                                        "Top Companies by Average Salary",
+                                        {"COMPANY_NAME": "Company", "AVG_SALARY": "Average Salary"})
+    if aggs["job_count_company"] is not None:
+        fig_company_job = ranked_bar(aggs["job_count_company"], "job_count", "COMPANY_NAME",
+                                     "Top Companies by Job Count",
+                                     {"COMPANY_NAME": "Company", "job_count": "Job Count"})
+    return fig_company_salary, fig_company_job
 
-    # ------------------------
-    # Arrange the four charts in a 2x2 matrix.
-    # Left column: Chart 1 (salary) and Chart 3 (schools);
-    # Right column: Chart 2 (job count) and Chart 4 (skills).
+def show_top_companies(figures):
+    fig_company_salary, fig_company_job = figures
+    st.markdown("### Company Performance")
     col_left, col_right = st.columns(2)
     with col_left:
         if fig_company_salary is not None:
             st.plotly_chart(fig_company_salary, use_container_width=True, key="company_salary_chart")
         else:
             st.write("Company average salary data not available.")
-        if fig_schools is not None:
-            st.plotly_chart(fig_schools, use_container_width=True, key="schools_chart")
-        else:
-            st.write("School data not available.")
     with col_right:
         if fig_company_job is not None:
             st.plotly_chart(fig_company_job, use_container_width=True, key="company_job_chart")
         else:
             st.write("Company job count data not available.")
+
+# ------------------------
+# Top 20 Schools from "Where they studied" and Skills from "What they are skilled at"
+# ------------------------
+def profile_totals(companies_info):
+    """Head counts summed per name for each profile column, e.g. per school for WHERE_THEY_STUDIED."""
+    return {column: parse_lists(companies_info[column], counted=True).totals()
+            for column in PROFILE_COLUMNS if column in companies_info.columns}
+
+def profile_figures(profiles):
+    figures = []
+    for column, label, title in [("WHERE_THEY_STUDIED", "School", "Top 20 Schools"),
+                                 ("WHAT_THEY_ARE_SKILLED_AT", "Skill", "Top 20 Skills")]:
+        counts = profiles.get(column)
+        if counts is not None and len(counts):
+            top = counts.head(20).rename_axis(label).reset_index(name="Count")
+            figures.append(ranked_bar(top, "Count", label, title, {label: label, "Count": "Head Count"}))
+        else:
+            figures.append(None)
+    return figures
+
+def show_profiles(figures):
+    fig_schools, fig_skills = figures
+    st.markdown("### Education/Skills Analysis (Based on Employee Profile)")
+    col_left, col_right = st.columns(2)
+    with col_left:
+        if fig_schools is not None:
+            st.plotly_chart(fig_schools, use_container_width=True, key="schools_chart")
+        else:
+            st.write("School data not available.")
+    with col_right:
         if fig_skills is not None:
             st.plotly_chart(fig_skills, use_container_width=True, key="skills_chart")
         else:
             st.write("Skill data not available.")
-    
-    st.markdown("### Entry-Level & Newbie-Friendly Companies")
-
-    col_newbie, col_internship = st.columns(2)
 
-    # ------------------------
-    # Left: Most Newbie-Friendly Companies (MIN_YEARS_OF_EXPERIENCE == 0)
-    # ------------------------
-    with col_newbie:
-        if "COMPANY_NAME" in df.columns and "MIN_YEARS_OF_EXPERIENCE" in df.columns:
-            newbie_df = df[df["MIN_YEARS_OF_EXPERIENCE"] == 0]
-            if not newbie_df.empty:
-                newbie_counts = newbie_df.groupby("COMPANY_NAME").size().reset_index(name="newbie_job_count")
-                newbie_counts = newbie_counts.sort_values("newbie_job_count", ascending=False).head(20)
-                height_newbie = max(300, len(newbie_counts)*30)
-                fig_newbie = px.bar(newbie_counts, x="newbie_job_count", y="COMPANY_NAME", orientation="h",
-                                    title="Top Companies Hiring Inexperienced Graduates",
-                                    labels={"COMPANY_NAME": "Company", "newbie_job_count": "Job Count"})
-                fig_newbie.update_yaxes(categoryorder="total ascending")
-                fig_newbie.update_layout(height=height_newbie)
-                st.plotly_chart(fig_newbie, use_container_width=True, key="newbie_chart")
-            else:
-                st.write("No data available for companies hiring inexperienced graduates.")
+# ------------------------
+# Most Newbie-Friendly Companies (MIN_YEARS_OF_EXPERIENCE == 0) and
+# Companies Hiring Internships & Entry Level (SENIORITY_LEVEL)
+# ------------------------
+def entry_level_figures(aggs):
+    figures = {}
+    for name, column, title in [("newbie_counts", "newbie_job_count", "Top Companies Hiring Inexperienced Graduates"),
+                                ("internship_counts", "internship_job_count",
+                                 "Top Companies Hiring Internship & Entry Level")]:
+        counts = aggs[name]
+        if counts is None or counts.empty:
+            figures[name] = counts  # None: column missing; empty: no matching postings
         else:
-            st.write("MIN_YEARS_OF_EXPERIENCE or COMPANY_NAME column not found in the job data.")
-
-    # ------------------------
-    # Right: Companies Hiring Internships & Entry Level (SENIORITY_LEVEL)
-    # ------------------------
-    with col_internship:
-        if "COMPANY_NAME" in df.columns and "SENIORITY_LEVEL" in df.columns:
-            internship_df = df[df["SENIORITY_LEVEL"].str.lower().isin(["internship", "entry level"])]
-            if not internship_df.empty:
-                internship_counts = internship_df.groupby("COMPANY_NAME").size().reset_index(name="internship_job_count")
-                internship_counts = internship_counts.sort_values("internship_job_count", ascending=False).head(20)
-                height_intern = max(300, len(internship_counts)*30)
-                fig_internship = px.bar(internship_counts, x="internship_job_count", y="COMPANY_NAME", orientation="h",
-                                        title="Top Companies Hiring Internship & Entry Level",
-                                        labels={"COMPANY_NAME": "Company", "internship_job_count": "Job Count"})
-                fig_internship.update_yaxes(categoryorder="total ascending")
-                fig_internship.update_layout(height=height_intern)
-                st.plotly_chart(fig_internship, use_container_width=True, key="internship_chart")
+            figures[name] = ranked_bar(counts, column, "COMPANY_NAME", title,
+                                       {"COMPANY_NAME": "Company", column: "Job Count"})
+    return figures
+
+def show_entry_level(figures):
+    st.markdown("### Entry-Level & Newbie-Friendly Companies")
+    col_newbie, col_internship = st.columns(2)
+    for col, name, chart_key, empty_message, missing_message in [
+        (col_newbie, "newbie_counts", "newbie_chart",
+         "No data available for companies hiring inexperienced graduates.",
+         "MIN_YEARS_OF_EXPERIENCE or COMPANY_NAME column not found in the job data."),
+        (col_internship, "internship_counts", "internship_chart",
+         "No data available for Internship or Entry level positions.",
+         "SENIORITY_LEVEL or COMPANY_NAME column not found in the job data."),
+    ]:
+        with col:
+            fig = figures[name]
+            if fig is None:
+                st.write(missing_message)
+            elif isinstance(fig, pd.DataFrame):
+                st.write(empty_message)
             else:
-                st.write("No data available for Internship or Entry level positions.")
-        else:
-            st.write("SENIORITY_LEVEL or COMPANY_NAME column not found in the job data.")
+                st.plotly_chart(fig, use_container_width=True, key=chart_key)
+
+# ------------------------
+# Companies founded Over Time
+# ------------------------
+def founded_figure(companies_info):
+    if "FOUNDED" not in companies_info.columns:
+        return None
+    # companies_info is shared across sessions, so convert a copy of the column only
+    founded_data = companies_info[["FOUNDED"]].assign(FOUNDED=pd.to_numeric(companies_info["FOUNDED"], errors="coerce"))
+    founded_data = founded_data.dropna(subset=["FOUNDED"])
+    current_year = datetime.date.today().year
+    founded_data = founded_data[(founded_data["FOUNDED"] >= 1900) & (founded_data["FOUNDED"] <= current_year)]
+    founded_counts = founded_data.groupby("FOUNDED").size().reset_index(name="Count")
+    founded_counts = founded_counts.sort_values("FOUNDED")
+    return px.line(founded_counts, x="FOUNDED", y="Count",
+                   title="Companies founded Over Time (1900-Present)",
+                   markers=True)
 
+def show_founded(fig_line):
     st.markdown("### Companies founded Over Time")
-    if "FOUNDED" in companies_info.columns:
-        companies_info["FOUNDED"] = pd.to_numeric(companies_info["FOUNDED"], errors="coerce")
-        founded_data = companies_info.dropna(subset=["FOUNDED"])
-        current_year = datetime.date.today().year
-        founded_data = founded_data[(founded_data["FOUNDED"] >= 1900) & (founded_data["FOUNDED"] <= current_year)]
-        founded_counts = founded_data.groupby("FOUNDED").size().reset_index(name="Count")
-        founded_counts = founded_counts.sort_values("FOUNDED")
-        fig_line = px.line(founded_counts, x="FOUNDED", y="Count",
-                           title="Companies founded Over Time (1900-Present)",
-                           markers=True)
+    if fig_line is not None:
         st.plotly_chart(fig_line, use_container_width=True, key="company_founded_line")
     else:
         st.write("founded column not found in companies data.")
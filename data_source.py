@@ -0,0 +1,242 @@
+import os
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where the dashboard tables come from: "snowflake" (production) or "local"
+DATA_BACKEND = os.getenv("DATA_BACKEND", "snowflake")
+# Local backend: a directory of <table>.parquet / <table>.csv files, or synthetic data when unset
+LOCAL_DATA_DIR = os.getenv("LOCAL_DATA_DIR", "")
+LOCAL_DATA_ROWS = int(os.getenv("LOCAL_DATA_ROWS", "50000"))
+LOCAL_DATA_SEED = int(os.getenv("LOCAL_DATA_SEED", "0"))
+
+TABLES = ["jobs", "companies", "states", "cities", "job_titles", "job_functions"]
+
+snowflake_username = os.getenv('SNOWFLAKE_USERNAME')
+snowflake_password = os.getenv('SNOWFLAKE_PASSWORD')
+snowflake_account = os.getenv('SNOWFLAKE_ACCOUNT')
+
+
+def fetch_tables():
+    """Every dashboard table from the configured DATA_BACKEND."""
+    return fetch_local() if DATA_BACKEND == "local" else fetch_snowflake()
+
+
+def read_sql_uppercase(query, engine):
+    df = pd.read_sql(query, engine)
+    df.columns = [col.upper() for col in df.columns]
+    return df
+
+
+# Query Snowflake for every table the dashboard needs
+def fetch_snowflake():
+    conn_str = (
+    f"snowflake://{snowflake_username}:{snowflake_password}@{snowflake_account}/"
+    f"LINKEDIN_JOBS/PUBLIC?warehouse=COMPUTE_WH&role=ACCOUNTADMIN"
+    )
+    engine = create_engine(conn_str)
+
+    query_jobs = """
+    SELECT 
+        AI.JOB_ID,
+        AI.JOB_TITLE,
+        R.WORKPLACE,
+        R.JOB_URL,
+        R.SENIORITY_LEVEL,
+        R.EMPLOYMENT_TYPE,
+        R.JOB_FUNCTION,
+        R.INDUSTRIES,
+        R.COMPANY_NAME,
+        R.COMPANY_URL,
+        R.SALARY,
+        TO_DATE(AI.POSTED_DATE, 'MM/DD/YYYY') AS POSTED_DATE,
+        AI.AVG_SALARY,
+        AI.SKILLS_MATCHED,
+        AI.DEGREE,
+        AI.MIN_YEARS_OF_EXPERIENCE,
+        AI.PRIMARY_TITLE,
+        AI.SUB_TITLE,
+        AI.JOB_FUNCTION_LIST,
+        AI.LOCATION_ST AS LOCATION,
+        AI.STATE
+    FROM LINKEDIN_FIN_ACC_AI AI
+    LEFT JOIN LINKEDIN_FIN_ACC_RAW R 
+      ON R.JOB_ID = AI.JOB_ID
+    WHERE AI.POSTED_DATE > '02/22/2025'
+          AND (AI.AVG_SALARY > 20000 AND AI.AVG_SALARY < 500000
+           OR AI.AVG_SALARY IS NULL)
+    ORDER BY AI.POSTED_DATE DESC;
+    """
+
+    merged_df = read_sql_uppercase(query_jobs, engine)
+    merged_df['POSTED_DATE'] = pd.to_datetime(merged_df['POSTED_DATE'], errors='coerce')
+
+    query_companies = """SELECT 
+                                CLEAN_URL,
+                                COMPANY_NAME,
+                                COMPANY_SIZE,
+                                FOLLOWERS,
+                                FOUNDED,
+                                HEADQUARTERS,
+                                INDUSTRY,
+                                MEMBERS,
+                                POSTS,
+                                SPECIALTIES,
+                                VERIFIED_PAGE,
+                                WEBSITE,
+                                WHAT_THEY_ARE_SKILLED_AT,
+                                WHAT_THEY_DO,
+                                WHAT_THEY_STUDIED,
+                                WHERE_THEY_LIVE,
+                                WHERE_THEY_STUDIED
+                         FROM COMPANIES_INFO
+                      """
+    companies_info = read_sql_uppercase(query_companies, engine)
+
+    query_state_coordinates = "SELECT * FROM COORDINATES_STATE"
+    state_df = read_sql_uppercase(query_state_coordinates, engine)
+
+    query_city_coordinates = "SELECT * FROM COORDINATES_CITY"
+    city_df = read_sql_uppercase(query_city_coordinates, engine)
+
+    query_job_titles = "SELECT PRIMARY_TITLE FROM job_title_counts ORDER BY count DESC;"
+    job_title_options = read_sql_uppercase(query_job_titles, engine)['PRIMARY_TITLE'].tolist()
+
+    query_job_functions = "SELECT job_function FROM job_function_counts ORDER BY count DESC;"
+    job_func_options = read_sql_uppercase(query_job_functions, engine)['JOB_FUNCTION'].tolist()
+
+    # conn.close()
+    return {
+        "jobs": merged_df,
+        "companies": companies_info,
+        "states": state_df,
+        "cities": city_df,
+        "job_titles": pd.DataFrame({"PRIMARY_TITLE": job_title_options}),
+        "job_functions": pd.DataFrame({"JOB_FUNCTION": job_func_options}),
+    }
+
+
+def fetch_local():
+    """The dashboard tables from LOCAL_DATA_DIR, or a synthetic data set (fixed seed) when it is unset."""
+    if not LOCAL_DATA_DIR:
+        return synthetic_tables(LOCAL_DATA_ROWS, LOCAL_DATA_SEED)
+    tables = {}
+    for name in TABLES:
+        parquet_path = os.path.join(LOCAL_DATA_DIR, f"{name}.parquet")
+        if os.path.exists(parquet_path):
+            tables[name] = pd.read_parquet(parquet_path)
+        else:
+            tables[name] = pd.read_csv(os.path.join(LOCAL_DATA_DIR, f"{name}.csv"))
+        tables[name].columns = [col.upper() for col in tables[name].columns]
+    tables["jobs"]["POSTED_DATE"] = pd.to_datetime(tables["jobs"]["POSTED_DATE"], errors="coerce")
+    return tables
+
+
+# ---- Synthetic stand-in with the shape of the Snowflake tables ----
+_STATES = {
+    "CA": (36.7, -119.4, 39.0e6, 140, ["San Francisco, CA", "Los Angeles, CA", "San Diego, CA", "San Jose, CA"]),
+    "NY": (42.9, -75.5, 19.6e6, 125, ["New York, NY", "Buffalo, NY", "Albany, NY"]),
+    "TX": (31.9, -99.9, 30.5e6, 92, ["Austin, TX", "Dallas, TX", "Houston, TX"]),
+    "WA": (47.7, -120.7, 7.8e6, 115, ["Seattle, WA", "Bellevue, WA"]),
+    "NJ": (40.1, -74.4, 9.3e6, 114, ["Jersey City, NJ", "Newark, NJ"]),
+    "IL": (40.0, -89.2, 12.5e6, 94, ["Chicago, IL"]),
+    "MA": (42.3, -71.8, 7.0e6, 135, ["Boston, MA", "Cambridge, MA"]),
+    "FL": (27.8, -81.7, 22.6e6, 102, ["Miami, FL", "Tampa, FL", "Orlando, FL"]),
+    "GA": (32.7, -83.4, 11.0e6, 93, ["Atlanta, GA"]),
+    "CO": (39.0, -105.5, 5.9e6, 105, ["Denver, CO", "Boulder, CO"]),
+}
+_CITY_COORDS = {
+    "San Francisco, CA": (37.77, -122.42), "Los Angeles, CA": (34.05, -118.24), "San Diego, CA": (32.72, -117.16),
+    "San Jose, CA": (37.34, -121.89), "New York, NY": (40.71, -74.01), "Buffalo, NY": (42.89, -78.88),
+    "Albany, NY": (42.65, -73.76), "Austin, TX": (30.27, -97.74), "Dallas, TX": (32.78, -96.80),
+    "Houston, TX": (29.76, -95.37), "Seattle, WA": (47.61, -122.33), "Bellevue, WA": (47.61, -122.20),
+    "Jersey City, NJ": (40.73, -74.08), "Newark, NJ": (40.74, -74.17), "Chicago, IL": (41.88, -87.63),
+    "Boston, MA": (42.36, -71.06), "Cambridge, MA": (42.37, -71.11), "Miami, FL": (25.76, -80.19),
+    "Tampa, FL": (27.95, -82.46), "Orlando, FL": (28.54, -81.38), "Atlanta, GA": (33.75, -84.39),
+    "Denver, CO": (39.74, -104.99), "Boulder, CO": (40.01, -105.27),
+}
+_TITLES = ["Accountant", "Financial Analyst", "Auditor", "Tax Manager", "Controller", "Bookkeeper",
+           "Payroll Specialist", "Financial Planner", "Credit Analyst", "Treasury Analyst"]
+_FUNCTIONS = ["Finance", "Accounting/Auditing", "Business Development", "Consulting", "Analyst", "Management"]
+_SKILLS = ["Excel", "SQL", "Python", "Tax", "Audit", "CPA", "GAAP", "SAP", "Power BI", "Tableau",
+           "Forecasting", "Budgeting", "Reconciliation", "QuickBooks", "IFRS", "Financial Modeling"]
+_INDUSTRIES = ["Accounting", "Financial Services", "Banking", "IT Services and IT Consulting",
+               "Hospitals and Health Care", "Insurance", "Real Estate", "Manufacturing"]
+
+
+def synthetic_tables(n_jobs, seed=0, n_companies=500):
+    """Deterministic synthetic tables (same seed, same data) for local runs and load tests."""
+    rng = np.random.default_rng(seed)
+    companies = [f"Company {i:04d}" for i in range(n_companies)]
+    states = rng.choice(list(_STATES), n_jobs)
+    titles = rng.choice(_TITLES, n_jobs)
+    salary = rng.lognormal(11.3, 0.4, n_jobs).clip(20001, 499999)
+    salary[rng.random(n_jobs) < 0.3] = np.nan
+    company = rng.choice(companies, n_jobs, p=np.sort(rng.dirichlet(np.ones(n_companies) * 0.3))[::-1])
+
+    jobs = pd.DataFrame({
+        "JOB_ID": np.arange(n_jobs).astype(str),
+        "JOB_TITLE": [f"{title} {level}" for title, level in zip(titles, rng.choice(["I", "II", "Senior"], n_jobs))],
+        "WORKPLACE": rng.choice(["onsite", "hybrid", "remote"], n_jobs, p=[0.6, 0.25, 0.15]),
+        "JOB_URL": [f"https://www.linkedin.com/jobs/view/{i}" for i in range(n_jobs)],
+        "SENIORITY_LEVEL": rng.choice(["Internship", "Entry level", "Associate", "Mid-Senior level", "Director"], n_jobs),
+        "EMPLOYMENT_TYPE": rng.choice(["Full-time", "Contract", "Internship", "Part-time"], n_jobs, p=[0.8, 0.1, 0.05, 0.05]),
+        "JOB_FUNCTION": rng.choice(_FUNCTIONS, n_jobs),
+        "INDUSTRIES": rng.choice(_INDUSTRIES, n_jobs),
+        "COMPANY_NAME": company,
+        "COMPANY_URL": [f"https://www.linkedin.com/company/{name.lower().replace(' ', '-')}" for name in company],
+        "SALARY": None,
+        "POSTED_DATE": pd.Timestamp("2025-02-23") + pd.to_timedelta(rng.integers(0, 240, n_jobs), unit="D"),
+        "AVG_SALARY": salary,
+        "SKILLS_MATCHED": [str([str(s) for s in rng.choice(_SKILLS, rng.integers(1, 6), replace=False)])
+                           for _ in range(n_jobs)],
+        "DEGREE": rng.choice(["Bachelor", "Master", "PhD", None], n_jobs, p=[0.55, 0.2, 0.05, 0.2]),
+        "MIN_YEARS_OF_EXPERIENCE": rng.choice([0, 1, 2, 3, 5, 8, 10, np.nan], n_jobs),
+        "PRIMARY_TITLE": titles,
+        "SUB_TITLE": None,
+        "JOB_FUNCTION_LIST": [str([str(f) for f in rng.choice(_FUNCTIONS, rng.integers(1, 3), replace=False)])
+                              for _ in range(n_jobs)],
+        "LOCATION": [rng.choice(_STATES[state][4]) for state in states],
+        "STATE": states,
+    }).sort_values("POSTED_DATE", ascending=False).reset_index(drop=True)
+
+    company_info = pd.DataFrame({
+        "CLEAN_URL": [name.lower().replace(" ", "-") for name in companies],
+        "COMPANY_NAME": companies,
+        "COMPANY_SIZE": rng.choice(["1-10", "11-50", "51-200", "201-500", "1,001-5,000", "10,001+"], n_companies),
+        "FOLLOWERS": rng.integers(0, 1_000_000, n_companies),
+        "FOUNDED": np.where(rng.random(n_companies) < 0.1, np.nan, rng.integers(1850, 2024, n_companies)),
+        "HEADQUARTERS": rng.choice([city for state in _STATES.values() for city in state[4]], n_companies),
+        "INDUSTRY": rng.choice(_INDUSTRIES, n_companies),
+        "MEMBERS": rng.integers(1, 100_000, n_companies),
+        "POSTS": rng.integers(0, 50, n_companies),
+        "SPECIALTIES": None,
+        "VERIFIED_PAGE": rng.choice(["Yes", "No", None], n_companies),
+        "WEBSITE": [None if rng.random() < 0.1 else f"{name.lower().replace(' ', '')}.com" for name in companies],
+        "WHAT_THEY_ARE_SKILLED_AT": [str([f"{rng.integers(10, 5000):,} {skill}" for skill in
+                                          rng.choice(_SKILLS, 3, replace=False)]) for _ in range(n_companies)],
+        "WHAT_THEY_DO": None,
+        "WHAT_THEY_STUDIED": None,
+        "WHERE_THEY_LIVE": None,
+        "WHERE_THEY_STUDIED": [str([f"{rng.integers(10, 5000):,} University {chr(65 + i)}" for i in
+                                    rng.choice(26, 3, replace=False)]) for _ in range(n_companies)],
+    })
+
+    state_df = pd.DataFrame([
+        {"STATE": state, "STATE_LATITUDE": lat, "STATE_LONGITUDE": lon, "POPULATION": population, "COST_INDEX": cost}
+        for state, (lat, lon, population, cost, _) in _STATES.items()
+    ])
+    city_df = pd.DataFrame([
+        {"LOCATION": city, "LATITUDE": lat, "LONGITUDE": lon} for city, (lat, lon) in _CITY_COORDS.items()
+    ])
+    return {
+        "jobs": jobs,
+        "companies": company_info,
+        "states": state_df,
+        "cities": city_df,
+        "job_titles": jobs["PRIMARY_TITLE"].value_counts().rename_axis("PRIMARY_TITLE").reset_index()[["PRIMARY_TITLE"]],
+        "job_functions": pd.DataFrame({"JOB_FUNCTION": _FUNCTIONS}),
+    }
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+# MinHash / LSH settings: NUM_PERM hash functions split into BANDS bands. Two postings become
+# candidates when all rows of any band agree, and are merged when their token sets' Jaccard
+# similarity is at least DEDUP_THRESHOLD.
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "8"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_CHUNK_ROWS = int(os.getenv("DEDUP_CHUNK_ROWS", "10000"))  # rows hashed at a time (bounds memory)
+DEDUP_SEED = 7
+
+DEDUP_COLUMNS = ["JOB_TITLE", "COMPANY_NAME", "LOCATION"]
+
+_PRIME = (1 << 31) - 1
+
+
+def _field_tokens(series):
+    """(row ids, token codes, vocabulary size) with a single token per non-missing value."""
+    codes, vocab = pd.factorize(series.str.strip().str.lower())
+    rows = np.flatnonzero(codes >= 0)
+    return rows, codes[rows], len(vocab)
+
+
+def _word_tokens(series):
+    words = series.str.lower().str.split().explode().dropna()
+    codes, vocab = pd.factorize(words)
+    return words.index.to_numpy(dtype=np.int64), codes, len(vocab)
+
+
+def token_matrix(df, skill_matrix):
+    """Sparse rows x tokens indicator matrix.
+
+    Tokens are the words of the title, the whole title, the company, the location and
+    each matched skill (from the load-time skill matrix), so a repost with the same
+    title at the same company and place is nearly identical while "Accountant I" and
+    "Accountant II" are not.
+    """
+    df = df.reset_index(drop=True)
+    fields = [_word_tokens(df["JOB_TITLE"]), _field_tokens(df["JOB_TITLE"]),
+              _field_tokens(df["COMPANY_NAME"]), _field_tokens(df["LOCATION"])]
+    skills = skill_matrix.matrix.tocoo()
+    fields.append((skills.row.astype(np.int64), skills.col.astype(np.int64), skill_matrix.matrix.shape[1]))
+
+    rows, cols, offset = [], [], 0
+    for field_rows, field_codes, size in fields:
+        rows.append(field_rows)
+        cols.append(np.asarray(field_codes, dtype=np.int64) + offset)
+        offset += size
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(df), max(offset, 1)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def band_keys(matrix, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS, chunk_rows=DEDUP_CHUNK_ROWS, seed=DEDUP_SEED):
+    """One 64-bit bucket key per (row, band) from the rows' MinHash signatures."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+    rows_per_band = num_perm // bands
+    mixers = rng.integers(1, 1 << 63, rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+    n_rows = matrix.shape[0]
+    keys = np.zeros((n_rows, bands), dtype=np.uint64)
+    lengths = np.diff(matrix.indptr)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        tokens = matrix.indices[matrix.indptr[start]:matrix.indptr[stop]].astype(np.uint64)
+        nonempty = np.flatnonzero(lengths[start:stop])
+        if not len(nonempty):
+            continue
+        # (tokens x num_perm) universal hashes, reduced to the per-row minimum
+        hashes = (tokens[:, None] * a + b) % np.uint64(_PRIME)
+        offsets = matrix.indptr[start:stop][nonempty] - matrix.indptr[start]
+        signatures = np.minimum.reduceat(hashes, offsets, axis=0)
+        signatures = signatures[:, :rows_per_band * bands].reshape(len(nonempty), bands, rows_per_band)
+        keys[start + nonempty] = (signatures * mixers).sum(axis=2)  # wraps modulo 2**64
+    return keys
+
+
+def candidate_pairs(keys, has_tokens):
+    """Pairs of rows sharing a bucket in any band (each row linked to its bucket's first row)."""
+    rows = np.flatnonzero(has_tokens)
+    pairs = []
+    for band in range(keys.shape[1]):
+        order = rows[np.argsort(keys[rows, band], kind="stable")]
+        sorted_keys = keys[order, band]
+        starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        first = order[np.flatnonzero(starts)][np.cumsum(starts) - 1]
+        linked = first != order
+        pairs.append(np.column_stack([first[linked], order[linked]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def jaccard(matrix, pairs):
+    """Exact Jaccard similarity of the token sets of each row pair."""
+    left, right = matrix[pairs[:, 0]], matrix[pairs[:, 1]]
+    shared = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+    lengths = np.diff(matrix.indptr)
+    return shared / np.maximum(lengths[pairs[:, 0]] + lengths[pairs[:, 1]] - shared, 1)
+
+
+def build_dup_clusters(df, skill_matrix, threshold=DEDUP_THRESHOLD):
+    """Cluster id per row (the smallest row id of its near-duplicate group), in near-linear time.
+
+    Row i is the i-th row of `df`, which matches the ROW_ID of the jobs store.
+    """
+    matrix = token_matrix(df, skill_matrix)
+    n_rows = matrix.shape[0]
+    # Bucket within a company only: the same role at two employers is not a repost. Postings without a
+    # company name could be from any employer, so they are never candidates.
+    company = pd.factorize(df["COMPANY_NAME"].str.strip().str.lower())[0]
+    keys = band_keys(matrix) + (company + 1).astype(np.uint64)[:, None] * np.uint64(0x9E3779B97F4A7C15)
+    pairs = candidate_pairs(keys, (np.diff(matrix.indptr) > 0) & (company >= 0))
+    pairs = pairs[jaccard(matrix, pairs) >= threshold] if len(pairs) else pairs
+    graph = sp.csr_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n_rows, n_rows))
+    _, labels = connected_components(graph, directed=False)
+    representative = np.full(labels.max() + 1 if n_rows else 0, n_rows, dtype=np.int64)
+    np.minimum.at(representative, labels, np.arange(n_rows))
+    return representative[labels]
+
+
+def collapse(df, clusters):
+    """Keep the first posting of each duplicate cluster in the (filtered) frame."""
+    _, first = np.unique(clusters[df.index.to_numpy()], return_index=True)
+    return df.iloc[np.sort(first)]
+
+
+def duplicate_count(clusters):
+    """Postings that are near-duplicates of another one."""
+    return int(len(clusters) - len(np.unique(clusters)))
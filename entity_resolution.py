@@ -0,0 +1,212 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Fuzzy name matches need this character-trigram Jaccard similarity; blocking keys (name tokens and
+# the first ENTITY_PREFIX_CHARS letters without spaces) shared by more than ENTITY_MAX_BLOCK
+# companies ("group", "services", ...) are not used
+ENTITY_MATCH_THRESHOLD = float(os.getenv("ENTITY_MATCH_THRESHOLD", "0.7"))
+ENTITY_MAX_BLOCK = int(os.getenv("ENTITY_MAX_BLOCK", "200"))
+ENTITY_PREFIX_CHARS = 6
+
+# How a posting was linked to its COMPANIES_INFO row
+MATCH_METHODS = ["unmatched", "url", "name", "fuzzy name"]
+UNMATCHED, URL, NAME, FUZZY = range(len(MATCH_METHODS))
+
+_LEGAL_SUFFIXES = ["and", "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co",
+                   "company", "plc", "pllc", "pc", "gmbh", "ag", "sa", "bv", "nv"]
+_SUFFIX_RE = rf"(?:\s+(?:{'|'.join(_LEGAL_SUFFIXES)}))+$"
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_url(urls):
+    """LinkedIn company slug (or bare host for other sites) of each URL, e.g.
+    'https://www.linkedin.com/company/deloitte/?trk=x' -> 'deloitte'."""
+    urls = pd.Series(urls).astype("string").str.strip().str.lower()
+    urls = urls.str.replace(r"^[a-z][a-z0-9+.-]*://", "", regex=True).str.replace(r"^www\.", "", regex=True)
+    urls = urls.str.split(r"[?#]", n=1, regex=True).str[0]
+    urls = urls.str.replace(r"^(?:[a-z]{2,3}\.)?linkedin\.com/(?:company|school|showcase)/", "", regex=True)
+    urls = urls.str.strip("/").str.split("/").str[0]
+    return urls.mask(urls == "")
+
+
+def normalize_name(names):
+    """Lower-case name without punctuation or legal suffixes: 'Deloitte LLP' -> 'deloitte'."""
+    names = pd.Series(names).astype("string").str.lower().str.replace("&", " and ", regex=False)
+    names = names.str.replace(r"[^\w\s]", " ", regex=True).str.replace(r"\s+", " ", regex=True).str.strip()
+    names = names.str.replace(r"^the\s+", "", regex=True).str.replace(_SUFFIX_RE, "", regex=True).str.strip()
+    return names.mask(names == "")
+
+
+def stable_ids(keys):
+    """Non-negative 63-bit ids that depend only on the key, so they survive data refreshes."""
+    hashed = pd.util.hash_array(np.asarray(keys, dtype=object))
+    return (hashed >> np.uint64(1)).astype(np.int64)
+
+
+def company_ids(companies):
+    """company_id of every COMPANIES_INFO row: from its normalized CLEAN_URL, else its normalized name."""
+    url = normalize_url(companies["CLEAN_URL"]) if "CLEAN_URL" in companies.columns else \
+        pd.Series(pd.NA, index=companies.index, dtype="string")
+    name = normalize_name(companies["COMPANY_NAME"])
+    keys = ("url:" + url).fillna("name:" + name).fillna("row:" + pd.Series(np.arange(len(companies)),
+                                                                           index=companies.index).astype(str))
+    return stable_ids(keys.to_numpy(dtype=object))
+
+
+def _first_rows(keys):
+    """key -> first row position holding it (missing keys left out)."""
+    keys = pd.Series(np.asarray(keys, dtype=object))
+    keys = keys[keys.notna()]
+    return keys[~keys.duplicated()].reset_index().set_index(0)["index"]
+
+
+def _block_keys(names):
+    """(name position, blocking key) pairs: each token, plus the start of the name without spaces
+    (so 'pricewaterhouse coopers' meets 'pricewaterhousecoopers')."""
+    tokens = names.str.split().explode().dropna()
+    prefixes = "^" + names.str.replace(" ", "", regex=False).str[:ENTITY_PREFIX_CHARS]
+    keys = pd.concat([tokens, prefixes.dropna()]).reset_index().drop_duplicates()
+    keys.columns = ["position", "key"]
+    return keys
+
+
+def trigram_matrix(names):
+    """Rows x character-trigram indicator matrix of (padded) names."""
+    grams = [[name[i:i + 3] for i in range(len(name) - 2)] for name in (f" {name} " for name in names)]
+    lengths = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+    codes, _ = pd.factorize(pd.Series([gram for g in grams for gram in g], dtype=object))
+    matrix = sp.csr_matrix((np.ones(len(codes), dtype=np.int32), codes, np.concatenate([[0], np.cumsum(lengths)])),
+                           shape=(len(grams), codes.max() + 1 if len(codes) else 1))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def fuzzy_match(names, candidates, threshold=ENTITY_MATCH_THRESHOLD, max_block=ENTITY_MAX_BLOCK):
+    """Position in `candidates` of the best fuzzy match of each normalized name (-1 when none).
+
+    Only names sharing a blocking key held by at most `max_block` candidates are
+    compared, so the work grows with the block sizes, not with
+    len(names) * len(candidates).
+    """
+    names = pd.Series(np.asarray(names, dtype=object))
+    candidates = pd.Series(np.asarray(candidates, dtype=object))
+    best = np.full(len(names), -1, dtype=np.int64)
+    if not len(names) or not len(candidates):
+        return best
+    candidate_keys = _block_keys(candidates).rename(columns={"position": "candidate"})
+    block_sizes = candidate_keys["key"].value_counts()
+    candidate_keys = candidate_keys[candidate_keys["key"].map(block_sizes) <= max_block]
+    name_keys = _block_keys(names).rename(columns={"position": "name"})
+    pairs = name_keys.merge(candidate_keys, on="key")[["name", "candidate"]].drop_duplicates()
+    if pairs.empty:
+        return best
+
+    # Exact trigram Jaccard of every candidate pair (sparse, vectorized)
+    used_names, name_pos = np.unique(pairs["name"].to_numpy(), return_inverse=True)
+    used_candidates, candidate_pos = np.unique(pairs["candidate"].to_numpy(), return_inverse=True)
+    matrix = trigram_matrix(np.concatenate([names.to_numpy()[used_names], candidates.to_numpy()[used_candidates]]))
+    left, right = matrix[name_pos], matrix[len(used_names) + candidate_pos]
+    shared = np.asarray(left.multiply(right).sum(axis=1)).ravel()
+    lengths = np.diff(matrix.indptr)
+    union = lengths[name_pos] + lengths[len(used_names) + candidate_pos] - shared
+    pairs = pairs.assign(score=shared / np.maximum(union, 1))
+    pairs = pairs[pairs["score"] >= threshold]
+    # Best score per name; ties go to the first candidate
+    pairs = pairs.sort_values(["name", "score", "candidate"], ascending=[True, False, True], kind="stable")
+    pairs = pairs.drop_duplicates("name")
+    best[pairs["name"].to_numpy()] = pairs["candidate"].to_numpy()
+    return best
+
+
+class CompanyResolution:
+    """Links every posting (by ROW_ID) to a COMPANIES_INFO row.
+
+    `company_ids[row]` is the posting's stable company_id (-1 when unmatched),
+    `company_rows[row]` the position of its row in the companies table and
+    `methods[row]` how it was matched (see MATCH_METHODS).
+    """
+
+    def __init__(self, company_ids, company_rows, methods, distinct_names):
+        self.company_ids = company_ids
+        self.company_rows = company_rows
+        self.methods = methods
+        self.distinct_names = distinct_names
+
+    @property
+    def nbytes(self):
+        return int(self.company_ids.nbytes + self.company_rows.nbytes + self.methods.nbytes
+                   + self.distinct_names.nbytes)
+
+    def stats(self):
+        """Postings and distinct posting company names matched by each method, with their shares."""
+        rows = np.bincount(self.methods, minlength=len(MATCH_METHODS))
+        names = np.bincount(self.distinct_names, minlength=len(MATCH_METHODS))
+        return pd.DataFrame({
+            "method": MATCH_METHODS,
+            "postings": rows,
+            "postings_%": (100 * rows / max(rows.sum(), 1)).round(2),
+            "company_names": names,
+            "company_names_%": (100 * names / max(names.sum(), 1)).round(2),
+        })
+
+    def match_rate(self):
+        return float((self.methods != UNMATCHED).mean()) if len(self.methods) else 0.0
+
+
+def resolve_companies(jobs, companies):
+    """Match postings (COMPANY_URL, COMPANY_NAME) to COMPANIES_INFO (CLEAN_URL, COMPANY_NAME).
+
+    Stages, each only for what the previous left unmatched: normalized URL slug,
+    exact normalized name, then blocked fuzzy name matching. Work is done once per
+    distinct (url, name) pair, not per posting.
+    """
+    job_urls = normalize_url(jobs["COMPANY_URL"]) if "COMPANY_URL" in jobs.columns else \
+        pd.Series(pd.NA, index=jobs.index, dtype="string")
+    job_names = jobs["COMPANY_NAME"].astype("string")
+    pair_codes, _ = pd.factorize((job_urls.fillna("") + "\x1f" + job_names.fillna("")).to_numpy(dtype=object))
+    first = np.unique(pair_codes, return_index=True)[1]  # codes are numbered in order of appearance
+    pair_urls = pd.Series(job_urls.to_numpy(dtype=object)[first], dtype=object)
+    pair_raw_names = job_names.to_numpy(dtype=object)[first]
+    pair_names = normalize_name(pd.Series(pair_raw_names, dtype=object)).to_numpy(dtype=object)
+
+    match = np.full(len(first), -1, dtype=np.int64)
+    method = np.full(len(first), UNMATCHED, dtype=np.int8)
+
+    if "CLEAN_URL" in companies.columns:
+        by_url = _first_rows(normalize_url(companies["CLEAN_URL"]).to_numpy(dtype=object))
+        found = pair_urls.map(by_url).to_numpy(dtype=np.float64)
+        hit = ~np.isnan(found)
+        match[hit], method[hit] = found[hit].astype(np.int64), URL
+
+    company_names = normalize_name(companies["COMPANY_NAME"]).to_numpy(dtype=object)
+    by_name = _first_rows(company_names)
+    open_pairs = np.flatnonzero((match < 0) & pd.notna(pair_names))
+    found = pd.Series(pair_names[open_pairs]).map(by_name).to_numpy(dtype=np.float64)
+    hit = ~np.isnan(found)
+    match[open_pairs[hit]], method[open_pairs[hit]] = found[hit].astype(np.int64), NAME
+
+    # Fuzzy stage on distinct unmatched names against distinct company names
+    open_pairs = np.flatnonzero((match < 0) & pd.notna(pair_names))
+    open_names, name_codes = np.unique(pair_names[open_pairs].astype(str), return_inverse=True)
+    best = fuzzy_match(open_names, by_name.index.to_numpy())
+    found = best[name_codes]
+    hit = found >= 0
+    match[open_pairs[hit]] = by_name.to_numpy()[found[hit]]
+    method[open_pairs[hit]] = FUZZY
+
+    ids = company_ids(companies)
+    pair_ids = np.where(match >= 0, ids[np.maximum(match, 0)], -1)
+    # Method per distinct posting company name (its best-matched URL/name pair)
+    names = pd.DataFrame({"name": pair_raw_names, "method": method})
+    names["rank"] = names["method"].replace(UNMATCHED, len(MATCH_METHODS))
+    distinct_names = names.sort_values("rank").drop_duplicates("name")["method"].to_numpy(dtype=np.int8)
+
+    resolution = CompanyResolution(pair_ids[pair_codes], match[pair_codes], method[pair_codes], distinct_names)
+    logger.info("Matched %.1f%% of postings to COMPANIES_INFO: %s", 100 * resolution.match_rate(),
+                resolution.stats().set_index("method")["postings"].to_dict())
+    return resolution
@@ -0,0 +1,141 @@
+import os
+import glob
+import time
+import tempfile
+import pandas as pd
+
+# Export settings (overridable through the environment)
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "500000"))
+EXPORT_MAX_MB = int(os.getenv("EXPORT_MAX_MB", "200"))
+EXPORT_DIR = os.getenv("EXPORT_DIR", tempfile.gettempdir())
+# Export files older than this are deleted (sessions that never replaced or downloaded theirs)
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", "3600"))
+
+EXPORT_COLUMNS = ["JOB_ID", "JOB_TITLE", "PRIMARY_TITLE", "COMPANY_NAME", "COMPANY_URL", "JOB_URL",
+                  "LOCATION", "STATE", "POSTED_DATE", "WORKPLACE", "SENIORITY_LEVEL", "EMPLOYMENT_TYPE",
+                  "JOB_FUNCTION", "INDUSTRIES", "AVG_SALARY", "MIN_YEARS_OF_EXPERIENCE", "DEGREE",
+                  "SKILLS_MATCHED"]
+
+# Room left under EXPORT_MAX_MB for the Parquet footer, written only when the file is closed
+_PARQUET_FOOTER_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {"CSV": ("csv", "text/csv"), "Parquet": ("parquet", "application/vnd.apache.parquet")}
+
+
+def iter_export_chunks(jobs, rows, companies, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the selected job rows in chunks, joined with the company risk columns.
+
+    `rows` are ROW_IDs in `jobs` (the shared PartitionStore), so only one chunk
+    of the export is materialized at a time; the company dimension
+    (company_dim.CompanyDimension) gives each posting's company_id (-1 when
+    unmatched) and risk level.
+    """
+    for start in range(0, len(rows), chunk_rows):
+        selected = rows[start:start + chunk_rows]
+        chunk = jobs.take_rows(selected, EXPORT_COLUMNS)
+        company = companies.attributes(companies.keys[selected], ["COMPANY_ID", "RISK_LEVEL", "RISK_EXPLANATION"])
+        ids = company["COMPANY_ID"].fillna(-1).to_numpy(dtype="int64")
+        chunk.insert(chunk.columns.get_loc("COMPANY_NAME") + 1, "COMPANY_ID", pd.arrays.IntegerArray(ids, ids < 0))
+        chunk["RISK_LEVEL"] = company["RISK_LEVEL"].fillna("Not in Database").to_numpy()
+        chunk["RISK_EXPLANATION"] = company["RISK_EXPLANATION"].fillna(
+            "Company information is not available in our records.").to_numpy()
+        yield chunk
+
+
+def sweep_exports(ttl=EXPORT_TTL_SECONDS):
+    """Delete export files older than `ttl` seconds; returns how many were removed."""
+    removed = 0
+    cutoff = time.time() - ttl
+    for path in glob.glob(os.path.join(EXPORT_DIR, "jobs_export_*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # removed by another worker
+    return removed
+
+
+def _csv_bytes(chunk, header, max_bytes):
+    """CSV bytes of the longest prefix of `chunk` that fits in `max_bytes` (binary search on rows)."""
+    data = chunk.to_csv(header=header, index=False).encode("utf-8")
+    if len(data) <= max_bytes:
+        return data, len(chunk)
+    low, high, fitting = 0, len(chunk) - 1, b""
+    while low < high:
+        mid = (low + high + 1) // 2
+        candidate = chunk.iloc[:mid].to_csv(header=header, index=False).encode("utf-8")
+        if len(candidate) <= max_bytes:
+            low, fitting = mid, candidate
+        else:
+            high = mid - 1
+    return fitting, low
+
+
+def write_export(chunks, fmt, max_bytes=EXPORT_MAX_MB * 1024 * 1024):
+    """Write chunks to a temporary file; returns (path, rows written, truncated).
+
+    Each chunk's size is projected before it is written and only the rows that
+    fit under `max_bytes` are kept (Parquet sizes are projected from the
+    compression ratio of the row groups written so far).
+    """
+    sweep_exports()
+    extension, _ = EXPORT_FORMATS[fmt]
+    handle, path = tempfile.mkstemp(prefix="jobs_export_", suffix=f".{extension}", dir=EXPORT_DIR)
+    rows_written = 0
+    truncated = False
+    with os.fdopen(handle, "wb") as raw:
+        if fmt == "CSV":
+            for chunk in chunks:
+                data, rows = _csv_bytes(chunk, rows_written == 0, max_bytes - raw.tell())
+                raw.write(data)
+                rows_written += rows
+                if rows < len(chunk):
+                    truncated = True
+                    break
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = None
+            # Bytes on disk per in-memory Arrow byte, from the row groups written so far (1 until then)
+            ratio, arrow_bytes = 1.0, 0
+            try:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        # All-null columns in the first chunk would pin the schema to the null type
+                        schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                            for field in table.schema])
+                        writer = pq.ParquetWriter(raw, schema, compression="snappy")
+                    # A chunk that does not fit is written in the part that does, re-projected with
+                    # the ratio learned from that part, until no further row fits
+                    while len(table):
+                        projected = table.nbytes * ratio
+                        remaining = max_bytes - _PARQUET_FOOTER_BYTES - raw.tell()
+                        rows = len(table) if projected <= remaining else \
+                            max(int(len(table) * remaining / projected), 0)
+                        if rows == 0:
+                            truncated = True
+                            break
+                        part = table.slice(0, rows)
+                        writer.write_table(part.cast(writer.schema))
+                        rows_written += rows
+                        arrow_bytes += part.nbytes
+                        ratio = max(raw.tell(), 1) / max(arrow_bytes, 1)
+                        table = table.slice(rows)
+                    if truncated:
+                        break
+            finally:
+                if writer is not None:
+                    writer.close()
+    return path, rows_written, truncated
+
+
+def export_filtered(jobs, rows, companies, fmt, max_rows=EXPORT_MAX_ROWS):
+    """Stream the filtered rows (capped at `max_rows`) into an export file."""
+    truncated = len(rows) > max_rows
+    chunks = iter_export_chunks(jobs, rows[:max_rows], companies)
+    path, rows_written, size_capped = write_export(chunks, fmt)
+    return path, rows_written, truncated or size_capped
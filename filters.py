@@ -0,0 +1,59 @@
+import hashlib
+import json
+import pandas as pd
+from list_parse import parse_list
+
+# Session-state keys of the global filter widgets
+FILTER_KEYS = ["date_range", "selected_state", "selected_workplace", "selected_seniority",
+               "selected_job_title", "selected_job_func", "selected_salary", "collapse_duplicates",
+               "selected_near_city", "selected_radius"]
+
+
+# Parse a salary range label like "40K - 60K" or "200K+" into (min, max)
+def parse_salary_range(label):
+    if label.endswith("+"):
+        return int(label[:-2]) * 1000, float('inf')
+    salary_min, salary_max = label.replace("K", "").split(" - ")
+    return int(salary_min) * 1000, int(salary_max) * 1000
+
+
+def apply_filters(df, filters):
+    """Apply the global dashboard filters to the jobs frame."""
+    start_date = pd.to_datetime(filters["start_date"])
+    end_date = pd.to_datetime(filters["end_date"])
+
+    filtered_df = df[(df['POSTED_DATE'] >= start_date) & (df['POSTED_DATE'] <= end_date)]
+
+    if filters["state"] != "All":
+        filtered_df = filtered_df[filtered_df['STATE'] == filters["state"]]
+    if filters["workplace"] != "All":
+        filtered_df = filtered_df[filtered_df['WORKPLACE'] == filters["workplace"]]
+    if filters["seniority"] != "All":
+        filtered_df = filtered_df[filtered_df['SENIORITY_LEVEL'] == filters["seniority"]]
+    if filters["job_title"] != "All":
+        filtered_df = filtered_df[filtered_df['PRIMARY_TITLE'] == filters["job_title"]]
+    if filters["job_func"] != "All":
+        job_func = filters["job_func"]
+        # astype(bool): on an empty frame apply returns an object Series, which would select columns
+        filtered_df = filtered_df[filtered_df['JOB_FUNCTION_LIST'].apply(
+            lambda x: job_func in parse_list(x)
+        ).astype(bool)]
+    if filters["salary"] != "All":
+        salary_min, salary_max = parse_salary_range(filters["salary"])
+        filtered_df = filtered_df[
+            (filtered_df['AVG_SALARY'] >= salary_min) & (filtered_df['AVG_SALARY'] <= salary_max)
+        ]
+    return filtered_df
+
+
+def is_unfiltered(filters, min_date, max_date):
+    """Whether the filters keep every dated posting (so whole-dataset totals answer them)."""
+    return (pd.to_datetime(filters["start_date"]) <= min_date and pd.to_datetime(filters["end_date"]) >= max_date
+            and all(filters[key] == "All" for key in ["state", "workplace", "seniority", "job_title", "job_func", "salary"])
+            and not filters.get("collapse_duplicates", False) and filters.get("near_city", "All") == "All")
+
+
+def filter_signature(filters):
+    """Stable short hash identifying a filter combination."""
+    payload = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
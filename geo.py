@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+# Radius choices for the "near city" filter, and the default one
+RADIUS_OPTIONS = [10, 25, 50, 100, 200]
+DEFAULT_RADIUS_MILES = int(os.getenv("DEFAULT_RADIUS_MILES", "25"))
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def to_unit_xyz(lat, lon):
+    """Points on the unit sphere, where straight-line (chord) distance grows with great-circle distance."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CityIndex:
+    """k-d tree over the COORDINATES_CITY locations, with the job rows posted in each city.
+
+    A radius query finds candidate cities in the tree (chord distance on the unit
+    sphere), keeps those within the radius by haversine distance and returns
+    their postings. Row ids are ROW_IDs of the jobs store.
+    """
+
+    def __init__(self, cities, job_locations):
+        cities = cities.dropna(subset=["LATITUDE", "LONGITUDE"]).drop_duplicates("LOCATION")
+        self.cities = pd.Index(cities["LOCATION"])
+        self.lat = cities["LATITUDE"].to_numpy(dtype=np.float64)
+        self.lon = cities["LONGITUDE"].to_numpy(dtype=np.float64)
+        self.tree = cKDTree(to_unit_xyz(self.lat, self.lon))
+        # Job rows grouped by city (CSR layout); postings in unknown cities are left out
+        codes = self.cities.get_indexer(pd.Series(job_locations).astype(object))
+        located = np.flatnonzero(codes >= 0)
+        order = np.argsort(codes[located], kind="stable")
+        self.rows = located[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[located], minlength=len(self.cities)))])
+        self.n_rows = len(codes)
+
+    @property
+    def nbytes(self):
+        return int(self.rows.nbytes + self.offsets.nbytes + self.lat.nbytes + self.lon.nbytes
+                   + self.tree.data.nbytes + self.cities.memory_usage(deep=True))
+
+    def options(self):
+        """Cities with at least one posting, alphabetically."""
+        return sorted(self.cities[np.diff(self.offsets) > 0])
+
+    def location(self, city):
+        i = self.cities.get_loc(city)
+        return self.lat[i], self.lon[i]
+
+    def cities_within(self, city, miles):
+        """Cities within `miles` of `city` and their distances, nearest first."""
+        lat, lon = self.location(city)
+        chord = 2 * np.sin(min(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+        candidates = np.array(self.tree.query_ball_point(to_unit_xyz([lat], [lon])[0], chord * (1 + 1e-9)),
+                              dtype=np.int64)
+        distances = haversine_miles(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = distances <= miles
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return pd.Series(distances[order], index=self.cities[candidates[order]], name="MILES")
+
+    def rows_within(self, city, miles):
+        """ROW_IDs (sorted) of the postings in cities within `miles` of `city`."""
+        codes = self.cities.get_indexer(self.cities_within(city, miles).index)
+        if not len(codes):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self.rows[self.offsets[c]:self.offsets[c + 1]] for c in codes]))
+
+    def filter(self, df, city, miles):
+        """Rows of `df` (indexed by ROW_ID) posted within `miles` of `city`."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.rows_within(city, miles)] = True
+        return df[mask[df.index.to_numpy()]]
+
+
+def build_city_index(job_locations, cities):
+    return CityIndex(cities, job_locations)
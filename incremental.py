@@ -0,0 +1,216 @@
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from list_parse import parse_lists
+from partitions import PartitionStore
+
+# Derived aggregates are carried from one snapshot to the next by applying the inserted and
+# removed postings; every DERIVED_FULL_REBUILD_EVERY refreshes they are rebuilt from all rows
+# and compared with the incremental result (drift above DERIVED_DRIFT_TOLERANCE is logged).
+DERIVED_FULL_REBUILD_EVERY = int(os.getenv("DERIVED_FULL_REBUILD_EVERY", "7"))
+DERIVED_DRIFT_TOLERANCE = 1e-6
+
+DERIVED_FILE = "derived.arrow"
+ROW_HASHES_FILE = "row_hashes.npy"
+DERIVED_COLUMNS = ["JOB_ID", "POSTED_DATE", "STATE", "LOCATION", "AVG_SALARY", "COMPANY_NAME", "PRIMARY_TITLE",
+                   "SENIORITY_LEVEL", "MIN_YEARS_OF_EXPERIENCE", "JOB_FUNCTION_LIST", "SKILLS_MATCHED"]
+
+# Placeholder strings the Job Map treats as a missing state/location
+_MISSING = ['', 'nan', 'None', 'NA', 'N/A']
+
+logger = logging.getLogger(__name__)
+
+
+def row_hashes(jobs):
+    """One 64-bit hash per posting over the columns the aggregates read (changed rows hash differently)."""
+    return pd.util.hash_pandas_object(jobs[DERIVED_COLUMNS], index=False).to_numpy()
+
+
+def surplus_rows(hashes, other):
+    """Positions in `hashes` left over after matching each one with an equal hash of `other`.
+
+    A multiset difference: of three identical postings against two, one is left over, so
+    deleting one of several identical rows (or adding another) is carried as a delta.
+    """
+    order = np.argsort(hashes, kind="stable")
+    ordered = hashes[order]
+    # Occurrence number of each hash among its equals, against how many `other` holds
+    occurrence = np.arange(len(ordered)) - np.searchsorted(ordered, ordered, side="left")
+    other = np.sort(other)
+    available = np.searchsorted(other, ordered, side="right") - np.searchsorted(other, ordered, side="left")
+    return np.sort(order[occurrence >= available])
+
+
+def _exploded_counts(series):
+    """Item counts of a column of stringified lists (an item counts once per row)."""
+    return parse_lists(series).item_counts()
+
+
+def contributions(jobs):
+    """Additive per-key totals of a set of postings: counts and salary sums.
+
+    Undated postings are left out, as the date-range filter leaves them out of every page.
+    """
+    jobs = jobs[jobs["POSTED_DATE"].notnull()]
+    states = jobs["STATE"].mask(jobs["STATE"].isin(_MISSING))
+    locations = jobs["LOCATION"].mask(jobs["LOCATION"].isin(_MISSING))
+    salaried = jobs["AVG_SALARY"].notnull()
+    newbie = jobs["MIN_YEARS_OF_EXPERIENCE"] == 0
+    internship = jobs["SENIORITY_LEVEL"].str.lower().isin(["internship", "entry level"]).fillna(False).astype(bool)
+    company = jobs["COMPANY_NAME"]
+    return {
+        "state_jobs": jobs["JOB_ID"].notnull().groupby(states).sum(),
+        "state_salary_sum": jobs["AVG_SALARY"].groupby(states).sum(),
+        "state_salary_count": salaried.groupby(states).sum(),
+        "city_jobs": jobs["JOB_ID"].notnull().groupby(locations).sum(),
+        "company_jobs": company.value_counts(),
+        "company_salary_sum": jobs["AVG_SALARY"].groupby(company).sum(),
+        "company_salary_count": salaried.groupby(company).sum(),
+        "company_newbie_jobs": company[newbie].value_counts(),
+        "company_internship_jobs": company[internship].value_counts(),
+        "titles": jobs["PRIMARY_TITLE"].value_counts(),
+        "job_functions": _exploded_counts(jobs["JOB_FUNCTION_LIST"]),
+        "skills": _exploded_counts(jobs["SKILLS_MATCHED"]),
+    }
+
+
+def _prune(table):
+    """Drop keys whose postings are all gone (they leave the vocabulary)."""
+    return table[table.abs() > DERIVED_DRIFT_TOLERANCE]
+
+
+class DerivedAggregates:
+    """Whole-dataset totals behind the unfiltered pages and the filter options.
+
+    Every table is a Series of counts or sums keyed by state, city, company, title,
+    job function or skill, so a delta of postings is applied by adding the inserted
+    rows' totals and subtracting the removed rows' ones.
+    """
+
+    def __init__(self, tables, meta=None):
+        self.tables = tables
+        self.meta = meta or {"incremental_updates": 0, "drift": None}
+
+    @classmethod
+    def build(cls, jobs):
+        return cls({name: _prune(table.astype(np.float64)) for name, table in contributions(jobs).items()})
+
+    def copy(self):
+        return DerivedAggregates({name: table.copy() for name, table in self.tables.items()}, dict(self.meta))
+
+    def apply(self, inserted, removed):
+        """Update in place with newly inserted and removed postings."""
+        added, subtracted = contributions(inserted), contributions(removed)
+        for name, table in self.tables.items():
+            self.tables[name] = _prune(table.add(added[name], fill_value=0).sub(subtracted[name], fill_value=0))
+        self.meta["incremental_updates"] += 1
+        return self
+
+    def drift(self, other):
+        """Largest relative difference per table against another build (0 when identical)."""
+        drift = {}
+        for name, table in self.tables.items():
+            expected = other.tables[name]
+            difference = table.sub(expected, fill_value=0).abs()
+            scale = expected.abs().reindex(difference.index).fillna(0).clip(lower=1)
+            difference = difference / scale
+            drift[name] = float(difference.max()) if len(difference) else 0.0
+        return drift
+
+    @property
+    def nbytes(self):
+        return int(sum(table.memory_usage(deep=True) for table in self.tables.values()))
+
+    # ---- Views used by the pages ----
+    def options(self, name):
+        """Keys of a count table, most frequent first (the filter drop-down order)."""
+        table = self.tables[name]
+        return table.index[np.lexsort((table.index.astype(str), -table.to_numpy()))].tolist()
+
+    def counts(self, name):
+        return self.tables[name].round().astype(np.int64).sort_values(ascending=False)
+
+    def state_agg(self):
+        jobs = self.tables["state_jobs"]
+        salary = self.tables["state_salary_sum"] / self.tables["state_salary_count"].where(lambda c: c > 0)
+        return pd.DataFrame({"STATE": jobs.index, "JOB_COUNT": jobs.round().astype(np.int64).to_numpy(),
+                             "AVG_SALARY": salary.reindex(jobs.index).to_numpy()})
+
+    def city_agg(self):
+        jobs = self.tables["city_jobs"]
+        return pd.DataFrame({"LOCATION": jobs.index, "JOB_COUNT": jobs.round().astype(np.int64).to_numpy()})
+
+    def company_salary(self):
+        postings = self.tables["company_salary_count"]
+        postings = postings[postings > 0]
+        return pd.DataFrame({"COMPANY_NAME": postings.index,
+                             "avg_salary": (self.tables["company_salary_sum"].reindex(postings.index) / postings).to_numpy(),
+                             "postings": postings.round().astype(np.int64).to_numpy()})
+
+
+# ---- Carried across snapshot versions (see shared_data.publish_snapshot) ----
+def save(derived, directory):
+    """Write the tables as one Arrow file of (key, value) rows, table by table; the table
+    layout and the meta go in the schema metadata."""
+    layout = {name: [len(table), table.index.name, table.name] for name, table in derived.tables.items()}
+    tables = list(derived.tables.values())
+    keys = np.concatenate([table.index.astype(str).to_numpy(dtype=object) for table in tables]) if tables else []
+    values = np.concatenate([table.to_numpy(dtype=np.float64) for table in tables]) if tables else []
+    table = pa.table({"KEY": pa.array(keys, pa.large_string()), "VALUE": pa.array(values, pa.float64())})
+    table = table.replace_schema_metadata({"tables": json.dumps(layout), "meta": json.dumps(derived.meta)})
+    with pa.OSFile(os.path.join(directory, DERIVED_FILE), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def load(directory):
+    path = os.path.join(directory, DERIVED_FILE)
+    if not os.path.exists(path):
+        return None
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    keys = table.column("KEY").to_numpy()
+    values = table.column("VALUE").to_numpy()
+    tables, start = {}, 0
+    for name, (size, index_name, series_name) in json.loads(table.schema.metadata[b"tables"]).items():
+        tables[name] = pd.Series(values[start:start + size], index=pd.Index(keys[start:start + size], name=index_name),
+                                 name=series_name)
+        start += size
+    return DerivedAggregates(tables, json.loads(table.schema.metadata[b"meta"]))
+
+
+def publish(jobs, directory, previous_directory=None, read_table=None):
+    """Write the derived aggregates of a new snapshot, updated from the previous one where possible.
+
+    `jobs` is the new jobs table in ROW_ID order; the previous snapshot's jobs are read
+    (only the removed rows) through `read_table` from its partitions.
+    """
+    hashes = row_hashes(jobs)
+    previous = load(previous_directory) if previous_directory else None
+    incremental = None
+    if previous is not None and os.path.exists(os.path.join(previous_directory, ROW_HASHES_FILE)):
+        previous_hashes = np.load(os.path.join(previous_directory, ROW_HASHES_FILE))
+        inserted = jobs.iloc[surplus_rows(hashes, previous_hashes)]
+        removed_rows = surplus_rows(previous_hashes, hashes)
+        store = PartitionStore(os.path.join(previous_directory, "jobs"), read_table, hot_months=0)
+        removed = store.take_rows(removed_rows, DERIVED_COLUMNS)
+        incremental = previous.copy().apply(inserted, removed)
+        incremental.meta["delta"] = {"inserted": len(inserted), "removed": len(removed)}
+
+    if incremental is not None and incremental.meta["incremental_updates"] < DERIVED_FULL_REBUILD_EVERY:
+        derived = incremental
+    else:
+        # Periodic full rebuild, checked against what the incremental path would have produced
+        derived = DerivedAggregates.build(jobs)
+        if incremental is not None:
+            drift = incremental.drift(derived)
+            derived.meta["drift"] = drift
+            if max(drift.values(), default=0.0) > DERIVED_DRIFT_TOLERANCE:
+                logger.warning("Derived aggregates drifted from a full rebuild: %s",
+                               {name: value for name, value in drift.items() if value > DERIVED_DRIFT_TOLERANCE})
+
+    np.save(os.path.join(directory, ROW_HASHES_FILE), hashes)
+    save(derived, directory)
+    return derived
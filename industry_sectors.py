@@ -0,0 +1,462 @@
+"""Industry sectors: the BLS taxonomy in industry.xlsx compiled into a columnar lookup.
+
+LinkedIn industry labels (postings' INDUSTRIES, COMPANIES_INFO's INDUSTRY) are
+mapped onto the major sectors of Table 2.1: each label is matched to a term of
+the compiled taxonomy (sector names, the National Employment Matrix industry
+titles of Table 2.11 and curated LinkedIn aliases), whose NEM code gives its
+sector. Compiling reads the workbook once; the result is cached as an Arrow
+file and rebuilt only when the workbook changes.
+
+    python industry_sectors.py --compile
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from agg_planner import AggPlan
+from company_dim import NOT_IN_DATABASE
+from entity_resolution import trigram_matrix
+
+# The BLS workbook and where its compiled taxonomy is cached (shared by every worker on the host)
+INDUSTRY_XLSX = os.getenv("INDUSTRY_XLSX", "industry.xlsx")
+INDUSTRY_TAXONOMY_CACHE = os.getenv("INDUSTRY_TAXONOMY_CACHE",
+                                    os.path.join(tempfile.gettempdir(), "industry_taxonomy.arrow"))
+# Labels with no exact term need this character-trigram TF-IDF cosine to their best term (below 0.7,
+# e.g. "Consumer Goods" -> consumer services, the nearest term is too often another industry)
+INDUSTRY_MATCH_THRESHOLD = float(os.getenv("INDUSTRY_MATCH_THRESHOLD", "0.7"))
+
+UNCLASSIFIED = "Unclassified"
+
+# How a label was mapped to its sector
+MATCH_METHODS = ["unclassified", "exact", "segment", "fuzzy"]
+UNMATCHED, EXACT, SEGMENT, FUZZY = range(len(MATCH_METHODS))
+
+# Table 2.1 lists no NAICS codes for government; postal service and the NEM government
+# lines are assigned here. NEM codes with a state/local/"Y" part (public schools and
+# hospitals) also count as state and local government, as in the BLS sector totals.
+_GOVERNMENT_PREFIXES = {"Federal government": ["491", "91", "9991"],
+                        "State and local government": ["92", "9992", "9993"]}
+_PUBLIC_CODE_RE = r"^\d+[SLY]"
+
+# Common LinkedIn industry labels -> NEM code of the closest Table 2.11 industry
+_LINKEDIN_ALIASES = {
+    "IT Services and IT Consulting": "541500", "Information Technology & Services": "541500",
+    "Computer and Network Security": "541500", "Software Development": "513200", "Computer Software": "513200",
+    "Technology, Information and Internet": "519000", "Internet Publishing": "519000", "Internet": "519000",
+    "Information Services": "519000", "Data Infrastructure and Analytics": "518000",
+    "Telecommunications": "517000", "Wireless Services": "517000",
+    "Computer Hardware Manufacturing": "334100", "Computer Networking Products": "334200",
+    "Semiconductor Manufacturing": "334400", "Semiconductors": "334400",
+    "Staffing and Recruiting": "561300", "Human Resources Services": "561300",
+    "Business Consulting and Services": "541600", "Management Consulting": "541600",
+    "Outsourcing and Offshoring Consulting": "561400", "Accounting": "541200",
+    "Legal Services": "541100", "Law Practice": "541100",
+    "Advertising Services": "541800", "Marketing Services": "541800", "Marketing and Advertising": "541800",
+    "Public Relations and Communications Services": "541800", "Research Services": "541700",
+    "Biotechnology Research": "541710", "Biotechnology": "541710", "Think Tanks": "541720",
+    "Engineering Services": "541330", "Civil Engineering": "541330", "Architecture and Planning": "541300",
+    "Design Services": "541400", "Translation and Localization": "541900", "Veterinary Services": "541940",
+    "Professional Services": "540000", "Holding Companies": "551000",
+    "Administrative and Support Services": "561000", "Facilities Services": "561200",
+    "Security and Investigations": "561600", "Travel Arrangements": "561500", "Events Services": "561900",
+    "Environmental Services": "562000",
+    "Financial Services": "520000", "Banking": "522000", "Investment Banking": "523000",
+    "Investment Management": "523000", "Capital Markets": "523000",
+    "Venture Capital and Private Equity Principals": "523000", "Insurance": "524000",
+    "Real Estate": "531000", "Leasing Non-residential Real Estate": "531000",
+    "Hospitals and Health Care": "620000", "Hospital & Health Care": "620000", "Medical Practices": "621100",
+    "Mental Health Care": "621330", "Individual and Family Services": "624100",
+    "Wellness and Fitness Services": "713940", "Health, Wellness and Fitness": "713940",
+    "Medical Equipment Manufacturing": "339100", "Medical Devices": "339100",
+    "Pharmaceutical Manufacturing": "325400", "Pharmaceuticals": "325400",
+    "Chemical Manufacturing": "325000", "Chemicals": "325000", "Plastics Manufacturing": "326100",
+    "Non-profit Organizations": "813000", "Nonprofit Organization Management": "813000",
+    "Religious Institutions": "813000", "Civic and Social Organizations": "813400",
+    "Philanthropic Fundraising Services": "813200", "Consumer Services": "812000",
+    "Higher Education": "6110P1", "Education": "6110P0", "Education Administration Programs": "6110P0",
+    "Primary and Secondary Education": "61110P", "E-Learning Providers": "6110P2", "E-Learning": "6110P2",
+    "Professional Training and Coaching": "6110P2",
+    "Government Administration": "9992-3", "Public Policy Offices": "9992-3", "Law Enforcement": "9992-3",
+    "Armed Forces": "910000",
+    "Defense and Space Manufacturing": "336400", "Defense & Space": "336400",
+    "Aviation and Aerospace Component Manufacturing": "336400", "Motor Vehicle Manufacturing": "336100",
+    "Automotive": "336100", "Industrial Machinery Manufacturing": "333000", "Machinery Manufacturing": "333000",
+    "Appliances, Electrical, and Electronics Manufacturing": "335000",
+    "Food and Beverage Manufacturing": "311000", "Food Production": "311000", "Printing Services": "323000",
+    "Packaging and Containers Manufacturing": "322200", "Manufacturing": "31-330",
+    "Airlines and Aviation": "481000", "Airlines/Aviation": "481000", "Truck Transportation": "484000",
+    "Transportation, Logistics, Supply Chain and Storage": "48-490", "Logistics and Supply Chain": "488500",
+    "Freight and Package Transportation": "492000", "Warehousing and Storage": "493000",
+    "Retail": "44-450", "Retail Apparel and Fashion": "458000", "Retail Groceries": "445000",
+    "Wholesale": "420000", "Wholesale Building Materials": "423000",
+    "Restaurants": "722500", "Food and Beverage Services": "722000", "Hospitality": "721000",
+    "Hotels and Motels": "721100",
+    "Construction": "230000", "Building Construction": "236000", "Oil and Gas": "211000",
+    "Oil & Energy": "211000", "Mining": "212000", "Utilities": "221000",
+    "Renewable Energy Power Generation": "221110", "Electric Power Generation": "221110",
+    "Farming": "111000",
+    "Entertainment Providers": "710000", "Entertainment": "710000", "Spectator Sports": "711200",
+    "Museums, Historical Sites, and Zoos": "712000", "Gambling Facilities and Casinos": "713200",
+    "Media Production": "512100", "Movies, Videos, and Sound": "512000",
+    "Broadcast Media Production and Distribution": "516120", "Online Audio and Video Media": "516210",
+    "Book and Periodical Publishing": "5136-9", "Newspaper Publishing": "513110",
+    # Older LinkedIn labels, and ones whose nearest term is another industry
+    "Consumer Goods": "31-330", "Consumer Electronics": "334000", "Apparel & Fashion": "315000",
+    "Apparel Manufacturing": "315000", "Fashion": "315000", "Luxury Goods & Jewelry": "339910",
+    "Retail Luxury Goods and Jewelry": "458300", "Cosmetics": "325000", "Personal Care Product Manufacturing": "325000",
+    "Sporting Goods": "339900", "Sporting Goods Manufacturing": "339900", "Business Supplies & Equipment": "339900",
+    "Food & Beverages": "311000", "Beverage Manufacturing": "312100", "Wine & Spirits": "312100",
+    "Dairy": "311500", "Furniture": "337000", "Textiles": "313-40", "Paper & Forest Products": "322000",
+    "Building Materials": "327000", "Glass, Ceramics & Concrete": "327000", "Mining & Metals": "212000",
+    "Electrical/Electronic Manufacturing": "335000", "Mechanical or Industrial Engineering": "333000",
+    "Industrial Automation": "333000", "Machinery": "333000", "Shipbuilding": "336600",
+    "Renewables & Environment": "221110", "Import & Export": "420000", "Supermarkets": "4450A1",
+    "Retail Office Equipment": "459000", "Maritime": "483000", "Package/Freight Delivery": "492000",
+    "Transportation/Trucking/Railroad": "48-490", "Warehousing": "493000",
+    "Leisure, Travel & Tourism": "561500", "Recreational Facilities & Services": "713900",
+    "Recreational Facilities": "713900", "Sports": "711200", "Performing Arts": "711100", "Fine Art": "711500",
+    "Writing & Editing": "711500", "Music": "512200", "Motion Pictures & Film": "512100", "Animation": "512100",
+    "Computer Games": "513200", "Publishing": "5136-9", "Newspapers": "513110", "Online Media": "519000",
+    "Libraries": "519000", "Museums & Institutions": "712000", "Photography": "541920", "Graphic Design": "541400",
+    "Market Research": "541900", "Nanotechnology": "541700", "Government Relations": "541800",
+    "Alternative Dispute Resolution": "541100", "Commercial Real Estate": "531000",
+    "Real Estate Agents and Brokers": "531000", "Alternative Medicine": "621000", "Education Management": "6110P0",
+    "Philanthropy": "813200", "Fund-Raising": "813200", "Political Organization": "813000",
+    "Military": "910000", "International Affairs": "910000", "Judiciary": "9992-3", "Legislative Office": "9992-3",
+    "Executive Office": "9992-3", "Public Safety": "9992-3", "Ranching": "112000", "Fishery": "114000",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_label(labels):
+    """Lower-case label without punctuation: 'Oil & Energy' -> 'oil and energy'."""
+    labels = pd.Series(labels).astype("string").str.lower().str.replace("&", " and ", regex=False)
+    labels = labels.str.replace(r"\(.*?\)", " ", regex=True).str.replace(r"[^\w\s]", " ", regex=True)
+    labels = labels.str.replace(r"\s+", " ", regex=True).str.strip()
+    return labels.mask(labels == "")
+
+
+# ---- Compiling the workbook ----
+def _naics_prefixes(spec):
+    """'31-33' -> ['31', '32', '33']; '48, 492, 493' -> ['48', '492', '493']; '–' -> []."""
+    prefixes = []
+    for part in str(spec).split(","):
+        bounds = re.findall(r"\d+", part)
+        if len(bounds) == 2 and len(bounds[0]) == len(bounds[1]):
+            prefixes += [str(code).zfill(len(bounds[0])) for code in range(int(bounds[0]), int(bounds[1]) + 1)]
+        else:
+            prefixes += bounds[:1]
+    return prefixes
+
+
+def read_sectors(path=INDUSTRY_XLSX):
+    """Major sectors of Table 2.1 in table order and {NAICS prefix: sector position}.
+
+    Aggregate rows (totals, 'Goods-producing', ...) are left out: a row is a
+    sector when its prefixes do not include another row's.
+    """
+    table = pd.read_excel(path, sheet_name="Table 2.1", header=1, usecols=[0, 1], dtype=str)
+    table.columns = ["SECTOR", "NAICS"]
+    table = table[table["NAICS"].notna()]
+    table["SECTOR"] = table["SECTOR"].str.strip()
+    codes = {row.SECTOR: set(_naics_prefixes(row.NAICS)) for row in table.itertuples()}
+    for sector, prefixes in _GOVERNMENT_PREFIXES.items():
+        if sector not in codes:
+            raise ValueError(f"{path}: Table 2.1 has no '{sector}' row")
+        codes[sector] = set(prefixes)
+    sectors = [name for name, prefixes in codes.items()
+               if prefixes and not any(other < prefixes for other in codes.values() if other)]
+    prefix_sectors = {prefix: position for position, name in enumerate(sectors) for prefix in codes[name]}
+    return sectors, prefix_sectors
+
+
+def read_industries(path=INDUSTRY_XLSX):
+    """(NEM title, NEM code) of every industry row of Table 2.11."""
+    table = pd.read_excel(path, sheet_name="Table 2.11", header=1, usecols=[0, 1, 2], dtype=str)
+    table.columns = ["TITLE", "CODE", "TYPE"]
+    table = table[table["TYPE"].isin(["Summary", "Line item"])]
+    return pd.DataFrame({"TITLE": table["TITLE"].str.strip().to_numpy(), "CODE": table["CODE"].str.strip().to_numpy()})
+
+
+def code_sectors(codes, prefix_sectors, public_sector):
+    """Sector position of each NEM code (longest NAICS prefix of its leading digits; -1 when none)."""
+    codes = pd.Series(codes, dtype=object).astype(str)
+    digits = codes.str.extract(r"^(\d+)", expand=False).fillna("")
+    positions = np.full(len(codes), -1, dtype=np.int64)
+    for length in range(max(map(len, prefix_sectors)), 1, -1):
+        open_codes = positions < 0
+        found = digits.str[:length].map(prefix_sectors).to_numpy(dtype=np.float64)
+        hit = open_codes & ~np.isnan(found) & (digits.str.len() >= length).to_numpy()
+        positions[hit] = found[hit].astype(np.int64)
+    public = codes.str.contains(_PUBLIC_CODE_RE, regex=True).to_numpy()
+    positions[public & (positions >= 0)] = public_sector
+    return positions
+
+
+def compile_taxonomy(path=INDUSTRY_XLSX):
+    """Term table of the taxonomy: normalized TERM -> SECTOR (categorical, in Table 2.1 order), with
+    the NEM CODE and SOURCE ('alias', 'sector' or 'industry') it comes from. First term wins."""
+    sectors, prefix_sectors = read_sectors(path)
+    industries = read_industries(path)
+    public_sector = sectors.index("State and local government")
+
+    aliases = pd.DataFrame({"TITLE": list(_LINKEDIN_ALIASES), "CODE": list(_LINKEDIN_ALIASES.values())})
+    unknown = ~aliases["CODE"].isin(industries["CODE"])
+    if unknown.any():
+        logger.warning("Industry aliases with codes missing from %s: %s", path,
+                       aliases.loc[unknown, "TITLE"].tolist())
+        aliases = aliases[~unknown]
+    terms = pd.concat([
+        aliases.assign(SOURCE="alias"),
+        pd.DataFrame({"TITLE": sectors, "CODE": "", "SOURCE": "sector"}),
+        industries.assign(SOURCE="industry"),
+    ], ignore_index=True)
+    positions = code_sectors(terms["CODE"], prefix_sectors, public_sector)
+    is_sector = (terms["SOURCE"] == "sector").to_numpy()
+    positions[is_sector] = np.arange(is_sector.sum())
+    terms["TERM"] = normalize_label(terms["TITLE"])
+    terms = terms[(positions >= 0) & terms["TERM"].notna().to_numpy()]
+    terms["SECTOR"] = pd.Categorical.from_codes(positions[positions >= 0], categories=sectors + [UNCLASSIFIED])
+    terms = terms.drop_duplicates("TERM").reset_index(drop=True)
+    return terms[["TERM", "SECTOR", "CODE", "SOURCE"]]
+
+
+def _source_stamp(path):
+    """Changes whenever the workbook or the aliases do."""
+    stat = os.stat(path)
+    aliases = hashlib.sha1(json.dumps(_LINKEDIN_ALIASES, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{stat.st_mtime_ns}:{stat.st_size}:{aliases}"
+
+
+def load_taxonomy(path=INDUSTRY_XLSX, cache_path=INDUSTRY_TAXONOMY_CACHE):
+    """The compiled term table, from its Arrow cache when that was compiled from the current workbook."""
+    stamp = _source_stamp(path)
+    if os.path.exists(cache_path):
+        table = pa.ipc.open_file(pa.memory_map(cache_path, "r")).read_all()
+        if (table.schema.metadata or {}).get(b"source") == stamp.encode():
+            return table.to_pandas()
+    terms = compile_taxonomy(path)
+    table = pa.Table.from_pandas(terms, preserve_index=False).replace_schema_metadata({"source": stamp})
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+    logger.info("Compiled %d industry terms into %d sectors from %s", len(terms),
+                len(terms["SECTOR"].cat.categories) - 1, path)
+    return terms
+
+
+# ---- Matching labels ----
+class SectorLookup:
+    """Maps industry labels to sector codes (positions in `sectors`; the last one is UNCLASSIFIED).
+
+    A label is matched exactly (normalized) to a term, else by its first
+    comma-separated segment that matches a term exactly (postings may list
+    several industries), else to its nearest term by character-trigram TF-IDF
+    cosine when at least `threshold`.
+    """
+
+    def __init__(self, terms, threshold=INDUSTRY_MATCH_THRESHOLD):
+        self.sectors = pd.Index(terms["SECTOR"].cat.categories)
+        self.unclassified = len(self.sectors) - 1
+        self.terms = pd.Series(terms["SECTOR"].cat.codes.to_numpy(dtype=np.int8), index=terms["TERM"].to_numpy())
+        self.threshold = threshold
+
+    def classify(self, labels):
+        """(sector code, match method) of each label."""
+        labels = pd.Series(np.asarray(labels, dtype=object))
+        codes = np.full(len(labels), self.unclassified, dtype=np.int8)
+        methods = np.full(len(labels), UNMATCHED, dtype=np.int8)
+        normalized = normalize_label(labels)
+
+        found = normalized.map(self.terms).to_numpy(dtype=np.float64)
+        hit = ~np.isnan(found)
+        codes[hit], methods[hit] = found[hit], EXACT
+
+        # First segment with an exact term
+        open_labels = np.flatnonzero(~hit & labels.notna().to_numpy())
+        segments = labels.iloc[open_labels].astype(str).str.split(",").explode()
+        segments = normalize_label(segments).map(self.terms).dropna()
+        segments = segments[~segments.index.duplicated()]
+        codes[segments.index.to_numpy()], methods[segments.index.to_numpy()] = segments.to_numpy(), SEGMENT
+
+        # Nearest term of the rest
+        open_labels = np.flatnonzero((methods == UNMATCHED) & normalized.notna().to_numpy())
+        if len(open_labels):
+            best, scores = self._nearest(normalized.to_numpy(dtype=object)[open_labels])
+            hit = scores >= self.threshold
+            codes[open_labels[hit]], methods[open_labels[hit]] = self.terms.to_numpy()[best[hit]], FUZZY
+        return codes, methods
+
+    def _nearest(self, names):
+        """Best term position of each normalized name and its cosine (smoothed idf over the terms)."""
+        matrix = trigram_matrix(np.concatenate([self.terms.index.to_numpy(dtype=object), names])).astype(np.float32)
+        n_terms = len(self.terms)
+        doc_freq = np.bincount(matrix[:n_terms].indices, minlength=matrix.shape[1])
+        matrix.data *= (np.log((1 + n_terms) / (1 + doc_freq)) + 1).astype(np.float32)[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        matrix.data /= np.repeat(np.maximum(norms, 1e-12), np.diff(matrix.indptr))
+        scores = (matrix[n_terms:] @ matrix[:n_terms].T).toarray()
+        best = scores.argmax(axis=1)
+        return best, scores[np.arange(len(names)), best]
+
+    def codes(self, values):
+        """Sector code and match method of every value, classifying each distinct label once."""
+        label_codes, labels = pd.factorize(pd.Series(values).astype(object))
+        codes, methods = self.classify(labels)
+        rows = np.append(codes, self.unclassified).astype(np.int8)[label_codes]  # -1 (missing) -> UNCLASSIFIED
+        row_methods = np.append(methods, UNMATCHED).astype(np.int8)[label_codes]
+        return rows, row_methods, pd.DataFrame({"label": labels, "sector": self.sectors[codes], "method": methods})
+
+
+class IndustrySectors:
+    """Sector code of every posting (`job_codes`, by ROW_ID, from INDUSTRIES) and of every company
+    (`company_codes`, by company dimension key, from INDUSTRY; companies without one take the most
+    common sector of their postings), with the method each label was matched by (`job_methods`,
+    `company_methods`). `labels` lists each distinct label with its sector and method."""
+
+    def __init__(self, sectors, job_codes, company_codes, labels, job_methods, company_methods):
+        self.sectors = sectors
+        self.job_codes = job_codes
+        self.company_codes = company_codes
+        self.labels = labels
+        self.job_methods = job_methods
+        self.company_methods = company_methods
+
+    @property
+    def nbytes(self):
+        return int(self.job_codes.nbytes + self.company_codes.nbytes + self.job_methods.nbytes
+                   + self.company_methods.nbytes + self.labels.memory_usage(deep=True).sum())
+
+    def stats(self):
+        """Labels and rows of each column mapped by each method, with their shares."""
+        rows = []
+        for column, labels in self.labels.groupby("column", sort=False):
+            counts = labels.groupby("method")["rows"].agg(["size", "sum"]).reindex(range(len(MATCH_METHODS)),
+                                                                                   fill_value=0)
+            rows.append(pd.DataFrame({
+                "column": column, "method": MATCH_METHODS, "labels": counts["size"].to_numpy(),
+                "rows": counts["sum"].to_numpy(),
+                "rows_%": (100 * counts["sum"] / max(counts["sum"].sum(), 1)).round(2).to_numpy(),
+            }))
+        return pd.concat(rows, ignore_index=True)
+
+    def company_counts(self, companies):
+        """COMPANIES_INFO companies per sector."""
+        counts = np.bincount(self.company_codes[:companies.n_companies], minlength=len(self.sectors))
+        return pd.Series(counts, index=self.sectors)
+
+    def job_sectors(self, df):
+        """Sector code of each posting of `df` (indexed by ROW_ID)."""
+        return self.job_codes[df.index.to_numpy()]
+
+    def employer_sectors(self, df, companies):
+        """Sector code of the company of each posting of `df` (UNCLASSIFIED without one)."""
+        keys = companies.keys[df.index.to_numpy()]
+        return np.where(keys >= 0, self.company_codes[np.maximum(keys, 0)], len(self.sectors) - 1).astype(np.int8)
+
+    def fuzzy_matched(self, df, companies=None, by="job"):
+        """Whether the sector of each posting of `df` (see rollup) comes from a fuzzy label match."""
+        if by == "job":
+            return self.job_methods[df.index.to_numpy()] == FUZZY
+        keys = companies.keys[df.index.to_numpy()]
+        return (keys >= 0) & (self.company_methods[np.maximum(keys, 0)] == FUZZY)
+
+
+def build_industry_sectors(job_industries, companies, lookup=None):
+    """Sectors of the postings' INDUSTRIES (by ROW_ID) and of the company dimension's INDUSTRY."""
+    lookup = lookup if lookup is not None else SectorLookup(load_taxonomy())
+    job_codes, job_methods, job_labels = lookup.codes(job_industries)
+    industry = companies.table["INDUSTRY"] if "INDUSTRY" in companies.table.columns else \
+        pd.Series(pd.NA, index=companies.table.index, dtype=object)
+    company_codes, company_methods, company_labels = lookup.codes(industry)
+
+    # Companies without a classified INDUSTRY: the sector most of their postings are in
+    n_sectors = len(lookup.sectors)
+    posted = companies.keys >= 0
+    pairs = np.bincount(companies.keys[posted].astype(np.int64) * n_sectors + job_codes[posted],
+                        minlength=len(companies) * n_sectors).reshape(len(companies), n_sectors)
+    pairs[:, lookup.unclassified] = 0
+    fallback = (company_codes == lookup.unclassified) & (pairs.max(axis=1) > 0)
+    company_codes[fallback] = pairs[fallback].argmax(axis=1)
+
+    labels = []
+    for column, values, label_table in [("INDUSTRIES", job_industries, job_labels),
+                                        ("INDUSTRY", industry, company_labels)]:
+        counts = pd.Series(np.asarray(values, dtype=object)).value_counts()
+        labels.append(label_table.assign(column=column, rows=counts.reindex(label_table["label"]).to_numpy()))
+    return IndustrySectors(lookup.sectors, job_codes, company_codes, pd.concat(labels, ignore_index=True),
+                           job_methods, company_methods)
+
+
+# ---- Sector rollups ----
+def rollup(df, sectors, companies=None, by="job"):
+    """Per-sector metrics of the postings in `df`, by the posting's own sector (`by="job"`) or its
+    company's (`by="employer"`): JOBS, AVG_SALARY and SALARIED postings, the FUZZY_SHARE of postings
+    whose sector comes from a fuzzy label match, and with the company dimension the postings at each
+    company RISK_LEVEL and the distinct HIRING_COMPANIES.
+    One grouped pass over integer sector codes (agg_planner); sectors without postings are left out."""
+    codes = sectors.job_sectors(df) if by == "job" else sectors.employer_sectors(df, companies)
+    fuzzy = sectors.fuzzy_matched(df, companies, by)
+    plan = AggPlan().key("SECTOR", codes=lambda frame: (codes, sectors.sectors)).size("JOBS", "SECTOR")
+    plan.where("FUZZY_MATCHED", lambda frame: fuzzy).size("FUZZY_MATCHED", "SECTOR", where="FUZZY_MATCHED")
+    if "AVG_SALARY" in df.columns:
+        plan.mean("AVG_SALARY", "SECTOR", "AVG_SALARY").count("SALARIED", "SECTOR", "AVG_SALARY")
+    if companies is not None:
+        keys = companies.keys[df.index.to_numpy()]
+        level_codes, levels = pd.factorize(companies.table["RISK_LEVEL"], sort=True)
+        levels = list(levels) + [NOT_IN_DATABASE[0]] * (NOT_IN_DATABASE[0] not in levels)
+        risk = np.where(keys >= 0, level_codes[np.maximum(keys, 0)], levels.index(NOT_IN_DATABASE[0]))
+        for i, level in enumerate(levels):
+            plan.where(level, lambda frame, i=i: risk == i).size(level, "SECTOR", where=level)
+    table = plan.run(df)["SECTOR"]
+    table["FUZZY_SHARE"] = table.pop("FUZZY_MATCHED") / table["JOBS"]
+    if companies is not None:
+        # Distinct (sector, company) pairs, counted per sector
+        named = keys >= 0
+        pairs = np.unique(codes[named].astype(np.int64) * len(companies) + keys[named])
+        hiring = np.bincount(pairs // len(companies), minlength=len(sectors.sectors))
+        table["HIRING_COMPANIES"] = hiring[sectors.sectors.get_indexer(table.index)]
+    return table
+
+
+def fuzzy_shares(table):
+    """SECTOR, JOBS and FUZZY_% (percent of JOBS) of a reset-index rollup, largest sectors first."""
+    shares = table[["SECTOR", "JOBS"]].assign(**{"FUZZY_%": 100 * table["FUZZY_SHARE"]})
+    return shares.sort_values("JOBS", ascending=False, kind="stable")
+
+
+# ---- Compile the cache and show how labels map ----
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--compile", action="store_true", help="recompile the cached taxonomy")
+    parser.add_argument("--xlsx", default=INDUSTRY_XLSX)
+    parser.add_argument("--cache", default=INDUSTRY_TAXONOMY_CACHE)
+    parser.add_argument("labels", nargs="*", help="industry labels to classify")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.compile and os.path.exists(args.cache):
+        os.remove(args.cache)
+    start = time.perf_counter()
+    terms = load_taxonomy(args.xlsx, args.cache)
+    print(f"{len(terms)} terms loaded in {time.perf_counter() - start:.3f}s ({args.cache})")
+    print(terms.groupby("SECTOR", observed=False).size().rename("terms").to_string())
+    if args.labels:
+        lookup = SectorLookup(terms)
+        codes, methods = lookup.classify(args.labels)
+        for label, code, method in zip(args.labels, codes, methods):
+            print(f"{label} -> {lookup.sectors[code]} ({MATCH_METHODS[method]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,38 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
+import numpy as np
+import sketches
+import precompute
+from agg_planner import AggPlan
 
-# Cache processed job data to avoid recomputation
-@st.cache_data
-def process_data(df, state_df, city_df):
-    """Preprocess job data and aggregate metrics for faster loading."""
+# Processed job data is cached per filter signature (see precompute.py); the
+# function itself is pure so it can also run in the background.
+def process_data(df, state_df, city_df, totals=None):
+    """Preprocess job data and aggregate metrics for faster loading.
+
+    `totals` (incremental.DerivedAggregates) answers step 1 when `df` is the unfiltered data.
+    """
 
     # --------------------------------
     # ✅ Step 1: Aggregate job data
     # --------------------------------
-    # Replace empty strings and 'nan' strings with actual NaN values
-    df['STATE'].replace(['', 'nan', 'None', 'NA', 'N/A'], None, inplace=True)
-    df['LOCATION'].replace(['', 'nan', 'None', 'NA', 'N/A'], None, inplace=True)
-    # STATE-LEVEL Aggregation
-    # STATE-LEVEL Aggregation (Sorted by JOB_COUNT)
-    state_agg = df.groupby("STATE").agg(
-        JOB_COUNT=("JOB_ID", "count"),
-        AVG_SALARY=("AVG_SALARY", "mean")
-    ).reset_index().sort_values(by="JOB_COUNT", ascending=False)
-    state_agg = state_agg.dropna(subset=["STATE"])
-
-
-    # CITY-LEVEL Aggregation (Sorted by JOB_COUNT)
-    city_agg = df.groupby("LOCATION").agg(
-        JOB_COUNT=("JOB_ID", "count")
-    ).reset_index().sort_values(by="JOB_COUNT", ascending=False)
-    city_agg = city_agg.dropna(subset=['LOCATION'])
+    if totals is not None:
+        state_agg = totals.state_agg().sort_values(by="JOB_COUNT", ascending=False)
+        city_agg = totals.city_agg().sort_values(by="JOB_COUNT", ascending=False)
+    else:
+        # State and city metrics in one grouped pass; empty strings and 'nan' strings count as missing
+        missing = ['', 'nan', 'None', 'NA', 'N/A']
+        results = (AggPlan().key("STATE", "STATE", missing=missing).key("LOCATION", "LOCATION", missing=missing)
+                   .count("JOB_COUNT", "STATE", "JOB_ID").mean("AVG_SALARY", "STATE", "AVG_SALARY")
+                   .count("CITY_JOB_COUNT", "LOCATION", "JOB_ID")
+                   .run(df))
+        # STATE-LEVEL Aggregation (Sorted by JOB_COUNT)
+        state_agg = results["STATE"].reset_index().sort_values(by="JOB_COUNT", ascending=False, kind="stable")
+
+        # CITY-LEVEL Aggregation (Sorted by JOB_COUNT)
+        city_agg = results["LOCATION"].rename(columns={"CITY_JOB_COUNT": "JOB_COUNT"}).reset_index() \
+            .sort_values(by="JOB_COUNT", ascending=False, kind="stable")
 
     # --------------------------------
     # ✅ Step 2: Join State Data (AFTER Aggregation)
@@ -59,15 +65,14 @@ def process_data(df, state_df, city_df):
 
     return state_agg, city_agg
 
-def main(df, state_df, city_df):
-    st.header("Job Density Map")
-
-    # Process Data (cached)
-    state_agg, city_agg = process_data(df, state_df, city_df)
-
-    # --- Map Section ---
-    map_type = st.selectbox("Select Map Type", ["State-Level", "City-Level"])
-    zoom_level = 4 if df['STATE'].nunique() == 1 else 3
+# --- Map Section ---
+# A fragment: changing the map type reruns only this section, on the already-aggregated data
+@st.fragment
+def map_section(state_agg, city_agg, zoom_level, focus=None):
+    """`focus`: (latitude, longitude, zoom) of the "near city" filter, shown at city level by default."""
+    map_type = st.selectbox("Select Map Type", ["State-Level", "City-Level"], index=1 if focus else 0)
+    center = {"lat": focus[0], "lon": focus[1]} if focus else None
+    zoom_level = focus[2] if focus else zoom_level
 
     if map_type == "State-Level":
         if state_agg.empty:
@@ -82,6 +87,7 @@ def main(df, state_df, city_df):
                 hover_name="STATE",
                 title="Job Density by State",
                 zoom=zoom_level,
+                center=center,
                 opacity=0.7,
                 size_max=35
             )
@@ -101,14 +107,37 @@ def main(df, state_df, city_df):
                 hover_name="LOCATION",
                 title="Job Density by City",
                 zoom=zoom_level,
+                center=center,
                 opacity=0.7,
                 size_max=20
             )
             fig_map.update_layout(mapbox_style="carto-positron", showlegend=False)
             st.plotly_chart(fig_map, use_container_width=True)
 
+def main(df, state_df, city_df, salary_cube=None, filters=None, filter_key=None, totals=None, city_index=None):
+    st.header("Job Density Map")
+
+    # Process Data (cached per filter signature, possibly already computed in the background)
+    state_agg, city_agg = precompute.page_aggregates("Job Map", filter_key,
+                                                     lambda: process_data(df, state_df, city_df, totals))
+
+    # --- Near-city filter: centre the map on the city, zoomed to the radius ---
+    focus = None
+    near_city = (filters or {}).get("near_city", "All")
+    if near_city != "All" and city_index is not None:
+        miles = filters["radius_miles"]
+        lat, lon = city_index.location(near_city)
+        focus = (lat, lon, float(np.clip(11 - np.log2(miles / 2.5), 3, 10)))
+        nearby = city_index.cities_within(near_city, miles).rename_axis("LOCATION").reset_index()
+        nearby = nearby.merge(city_agg[["LOCATION", "JOB_COUNT"]], on="LOCATION", how="left")
+        nearby["JOB_COUNT"] = nearby["JOB_COUNT"].fillna(0).astype(int)
+        st.markdown(f"**{len(df):,} postings within {miles} miles of {near_city}** ({len(nearby)} cities)")
+        st.dataframe(nearby.round({"MILES": 1}), hide_index=True, use_container_width=True)
+
+    # --- Map Section ---
+    map_section(state_agg, city_agg, zoom_level=4 if df['STATE'].nunique() == 1 else 3, focus=focus)
+
     st.markdown("### Top Locations Analysis")
-    group_key = "STATE" if map_type == "State-Level" else "LOCATION"
 
     # ------------------------
     # Chart 1: Top by Job Counts (Filtered)
@@ -179,3 +208,40 @@ def main(df, state_df, city_df):
     with col2:
         st.plotly_chart(fig3, use_container_width=True)
         st.plotly_chart(fig4, use_container_width=True)
+
+    # ------------------------
+    # Salary Percentiles and Distinct Employers by State (merged sketches)
+    # ------------------------
+    st.markdown("### Salary Percentiles and Distinct Employers by State")
+    state_sketch = sketches.salary_summary(salary_cube, df, filters, by="STATE")
+    top_states = state_sketch.sort_values("JOBS", ascending=False).head(20).reset_index()
+    if top_states.empty:
+        st.warning("No data available for state-level salary percentiles.")
+    else:
+        fig5 = px.bar(top_states.dropna(subset=["P50"]), x=["P50", "P90"], y="STATE", orientation='h',
+                      barmode="group",
+                      title="Median and 90th Percentile Salary by State",
+                      color_discrete_sequence=px.colors.qualitative.Plotly)
+        fig5.update_yaxes(categoryorder="total ascending")
+        fig5.update_layout(
+        height=max(200, len(top_states) * 30),
+        xaxis_title="Salary",
+        yaxis_title="State",
+        legend_title="Percentile"
+    )
+
+        fig6 = px.bar(top_states, x="DISTINCT_COMPANIES", y="STATE", orientation='h',
+                      title="Distinct Employers by State",
+                      color_discrete_sequence=["lightblue"])
+        fig6.update_yaxes(categoryorder="total ascending")
+        fig6.update_layout(
+        height=max(200, len(top_states) * 30),
+        xaxis_title="Distinct employers (approx.)",
+        yaxis_title="State"
+    )
+
+        col3, col4 = st.columns(2)
+        with col3:
+            st.plotly_chart(fig5, use_container_width=True)
+        with col4:
+            st.plotly_chart(fig6, use_container_width=True)
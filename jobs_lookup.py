@@ -3,6 +3,12 @@ import pandas as pd
 import re
 import difflib
 import math
+import time
+import numpy as np
+import os
+from export import EXPORT_FORMATS, EXPORT_MAX_ROWS, export_filtered
+from entity_resolution import company_ids as resolve_company_ids
+from similar_jobs import SIMILAR_TOP_K
 
 # Helper function to parse entries like '1,712 University of Washington'
 def parse_entry(entry):
@@ -14,43 +20,12 @@ def parse_entry(entry):
         return name.strip(), num
     return None, 0
 
-# Risk calculation function with explanations
-# def calculate_risk(company_name, company_info):
-#     row = company_info[company_info["COMPANY_NAME"] == company_name]
-    
-#     # If company is not in database
-#     if row.empty:
-#         return "Not in Database", "Company information is not available in our records."
-
-#     website = row["WEBSITE"].iloc[0] if "WEBSITE" in row.columns else ""
-#     members = row["MEMBERS"].iloc[0] if "MEMBERS" in row.columns else 0
-#     verified = row["VERIFIED_PAGE"].iloc[0] if "VERIFIED_PAGE" in row.columns else False
-#     posts = row["POSTS"].iloc[0] if "POSTS" in row.columns else 0
-    
-#     no_website = pd.isna(website) or website.strip() == ""
-#     not_verified = (not verified) or (str(verified).lower() == "no")
-
-#     if no_website and members < 10 and not_verified and posts < 2:
-#         return "Potential Scam", "Company has no website, few members, is not verified, and has minimal activity."
-#     if (not no_website) and (members < 10) and not_verified and (not website.lower().endswith((".com", ".gov"))):
-#         return "High", "Company is not verified, has a small online presence, and an untrusted website."
-    
-#     return "Low", "Company is verified, has an established online presence, and seems legitimate."
-def calculate_risk(company_name, company_info):
-    row = company_info[company_info["COMPANY_NAME"] == company_name]
-
-    if row.empty:
-        return "Not in Database", "Company information is not available in our records."
-
-    website = row["WEBSITE"].iloc[0] if "WEBSITE" in row.columns else ""
-    members = row["MEMBERS"].iloc[0] if "MEMBERS" in row.columns else 0
-    verified = row["VERIFIED_PAGE"].iloc[0] if "VERIFIED_PAGE" in row.columns else False
-    posts = row["POSTS"].iloc[0] if "POSTS" in row.columns else 0
-
+# Risk level and explanation from a company's attributes
+def risk_from_values(website, members, verified, posts):
     # Risk checks
     no_website = pd.isna(website) or website.strip() == ""
     few_members = members < 10
-    not_verified = (not verified) or (str(verified).lower() == "no")
+    not_verified = pd.isna(verified) or (not verified) or (str(verified).lower() == "no")
     low_activity = posts < 2
     untrusted_website = False
 
@@ -93,6 +68,21 @@ def calculate_risk(company_name, company_info):
 
     return risk_level, explanation
 
+# Risk level of every company by company_id, computed once (the first row of a company's duplicates wins)
+def build_risk_table(company_info):
+    companies = company_info.dropna(subset=["COMPANY_NAME"])
+    companies = companies.assign(COMPANY_ID=resolve_company_ids(companies)).drop_duplicates("COMPANY_ID", keep="first")
+    columns = {col: companies[col] if col in companies.columns else pd.Series(default, index=companies.index)
+               for col, default in [("WEBSITE", ""), ("MEMBERS", 0), ("VERIFIED_PAGE", False), ("POSTS", 0)]}
+    risks = [risk_from_values(*values) for values in zip(columns["WEBSITE"], columns["MEMBERS"],
+                                                         columns["VERIFIED_PAGE"], columns["POSTS"])]
+    return pd.DataFrame({
+        "COMPANY_ID": companies["COMPANY_ID"].to_numpy(),
+        "COMPANY_NAME": companies["COMPANY_NAME"].to_numpy(),
+        "RISK_LEVEL": [risk for risk, _ in risks],
+        "RISK_EXPLANATION": [explanation for _, explanation in risks],
+    })
+
 # Helper to make URL clickable.
 def make_clickable(val, link_text):
     return f'<a href="{val}" target="_blank">{link_text}</a>'
@@ -109,24 +99,43 @@ def risk_color_with_tooltip(risk, reason):
     color_style = colors.get(risk, "")
     return f'<td style="{color_style}" {tooltip_html}>{risk}</td>'
 
-def main(df, company_info):
-    st.header("Jobs Lookup")
-    
-    import math
+# Export of the filtered jobs, built on demand and kept per session until the filters change
+def export_section(df, jobs, companies):
+    with st.expander("⬇️ Export filtered jobs"):
+        n_rows = len(df)
+        st.write(f"{n_rows} jobs match the current filters"
+                 + (f"; exports are limited to the first {EXPORT_MAX_ROWS}." if n_rows > EXPORT_MAX_ROWS else "."))
+        fmt = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="export_format")
 
-    # Add company search box
+        if st.button("Prepare export", disabled=n_rows == 0):
+            with st.spinner("Writing export..."):
+                path, rows_written, truncated = export_filtered(jobs, df.index.to_numpy(), companies, fmt)
+            if truncated:
+                st.warning(f"Export truncated to {rows_written} rows by the size/row limit.")
+            extension, mime = EXPORT_FORMATS[fmt]
+            # The button is drawn only in the run that prepared the file, so its bytes are held by the
+            # media file manager until the next rerun instead of being re-read on every rerun
+            with open(path, "rb") as data:
+                st.download_button(f"Download {rows_written} jobs ({fmt})", data=data,
+                                   file_name=f"filtered_jobs.{extension}", mime=mime)
+            os.remove(path)
+
+# Company search box; a fragment, so typing in it reruns only this section
+@st.fragment
+def company_search(companies):
     search_query = st.text_input("🔍 Search for a company (partial name accepted):")
 
     if search_query:
         # Find top 3 closest matches using fuzzy matching
-        all_company_names = company_info["COMPANY_NAME"].dropna().unique().tolist()
+        all_company_names = companies.names().dropna().tolist()
         top_matches = difflib.get_close_matches(search_query, all_company_names, n=3, cutoff=0.3)
         
         if top_matches:
             st.subheader("Top 3 matching companies:")
             for name in top_matches:
-                row = company_info[company_info["COMPANY_NAME"] == name].iloc[0]
-                risk, explanation = calculate_risk(name, company_info)
+                # The company's dimension row: attributes and risk gathered by key
+                row = companies.lookup(name)
+                risk, explanation = row["RISK_LEVEL"], row["RISK_EXPLANATION"]
                 
                 # Safely format founded year (remove .0 if float)
                 founded_raw = row['FOUNDED']
@@ -150,18 +159,40 @@ def main(df, company_info):
         else:
             st.warning("No similar companies found.")
 
-    
-    st.subheader("Top 100 Jobs Overview")
-    
-    # Limit the data to at most 100 jobs to speed up processing.
-    df_sample = df.head(100).copy()
+# Job search and results table; a fragment, so searching reruns only this section on the filtered data
+@st.fragment
+def jobs_section(df, search_index, jobs, companies, similar_index=None):
+    # Full-text job search (combined with the global filters)
+    job_query = st.text_input("🔎 Search jobs by title, skill, industry or company:") if search_index is not None else ""
+
+    if job_query:
+        allowed = np.zeros(search_index.n_docs, dtype=bool)
+        allowed[df.index.to_numpy()] = True
+        start = time.perf_counter()
+        hits, total_hits = search_index.search(job_query, allowed=allowed, limit=100)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        st.subheader("Search Results")
+        st.caption(f"{total_hits} matching jobs ({elapsed_ms:.1f} ms), showing the top {len(hits)} by relevance.")
+        df_sample = df.loc[hits].copy()
+    else:
+        if jobs is not None:
+            export_section(df, jobs, companies)
+
+        st.subheader("Top 100 Jobs Overview")
+
+        # Limit the data to at most 100 jobs to speed up processing.
+        df_sample = df.head(100).copy()
 
     if df_sample.empty:
         st.warning("No job data available to display.")
         return  # Exit early
     
-    # Calculate Risk for each job and store explanations
-    df_sample["Risk"], df_sample["Risk_Explanation"] = zip(*df_sample["COMPANY_NAME"].apply(lambda x: calculate_risk(x, company_info)))
+    # Calculate Risk for each job and store explanations (by the company each posting was resolved to)
+    risk = companies.attributes(companies.keys[df_sample.index.to_numpy()], ["RISK_LEVEL", "RISK_EXPLANATION"])
+    df_sample["Risk"] = risk["RISK_LEVEL"].fillna("Not in Database").to_numpy()
+    df_sample["Risk_Explanation"] = risk["RISK_EXPLANATION"].fillna(
+        "Company information is not available in our records.").to_numpy()
     
     # Convert job_url and company_url to clickable links.
     df_sample["JOB_URL"] = df_sample["JOB_URL"].apply(lambda x: make_clickable(x, "JOB_URL") if pd.notna(x) else "")
@@ -201,3 +232,41 @@ def main(df, company_info):
     
     # Display table with fixed height scrolling
     st.markdown(f'<div style="height:600px; overflow-y: auto;">{table_html}</div>', unsafe_allow_html=True)
+
+    if similar_index is not None:
+        similar_jobs_section(df, df_sample.index, similar_index)
+
+# "Similar jobs": nearest postings (TF-IDF cosine) to one of the listed jobs, within the global filters
+def similar_jobs_section(df, listed_rows, similar_index):
+    st.subheader("Similar Jobs")
+    listed = df.loc[listed_rows, ["JOB_TITLE", "COMPANY_NAME", "LOCATION"]]
+    labels = {row: f"{title} — {company} ({location})"
+              for row, title, company, location in listed.itertuples(name=None)}
+    row = st.selectbox("Find postings similar to", list(labels), format_func=labels.get, key="similar_job_row")
+    col1, col2 = st.columns(2)
+    with col1:
+        same_title = st.checkbox("Same job title only", key="similar_same_title")
+    with col2:
+        k = st.slider("Number of results", 5, 50, SIMILAR_TOP_K, step=5, key="similar_top_k")
+
+    allowed = np.zeros(similar_index.n_rows, dtype=bool)
+    allowed[df.index.to_numpy()] = True
+    start = time.perf_counter()
+    rows, scores = similar_index.similar(row, k, allowed=allowed, same_title=same_title)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not len(rows):
+        st.info("No similar postings match the current filters.")
+        return
+    st.caption(f"Top {len(rows)} postings matching the current filters ({elapsed_ms:.1f} ms).")
+    results = df.loc[rows, ["JOB_TITLE", "COMPANY_NAME", "LOCATION", "POSTED_DATE", "AVG_SALARY",
+                            "SKILLS_MATCHED", "JOB_URL"]].assign(SIMILARITY=scores.round(3))
+    st.dataframe(results, hide_index=True, use_container_width=True,
+                 column_config={"JOB_URL": st.column_config.LinkColumn("JOB_URL", display_text="Open")})
+
+def main(df, companies, search_index=None, jobs=None, similar_index=None):
+    st.header("Jobs Lookup")
+
+    # Add company search box
+    company_search(companies)
+
+    jobs_section(df, search_index, jobs, companies, similar_index)
@@ -0,0 +1,175 @@
+"""Parsing of list-valued columns stored as stringified Python lists.
+
+JOB_FUNCTION_LIST, SKILLS_MATCHED and the COMPANIES_INFO profile columns
+(WHERE_THEY_STUDIED, WHAT_THEY_ARE_SKILLED_AT, ...) hold values like
+"['Excel', 'SQL']". Well-formed literals of plain quoted strings are split with
+a regular expression; anything else falls back to ast.literal_eval. Large
+columns are parsed in chunks on a process pool and come back as coded arrays
+(row offsets, item codes and a vocabulary) instead of pickled Python lists.
+
+    python list_parse.py --rows 1000000
+"""
+import os
+import re
+import ast
+import time
+import argparse
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Worker processes and rows per task; columns shorter than LIST_PARSE_MIN_PARALLEL_ROWS are
+# parsed in-process, where starting the pool would cost more than it saves
+LIST_PARSE_WORKERS = int(os.getenv("LIST_PARSE_WORKERS", str(os.cpu_count() or 1)))
+LIST_PARSE_CHUNK_ROWS = int(os.getenv("LIST_PARSE_CHUNK_ROWS", "50000"))
+LIST_PARSE_MIN_PARALLEL_ROWS = int(os.getenv("LIST_PARSE_MIN_PARALLEL_ROWS", "200000"))
+
+# A list of quoted strings without escapes, e.g. ['Excel', "Women's Health"]
+_ITEM = r"""(?:'[^'\\\n]*'|"[^"\\\n]*")"""
+_LIST_RE = re.compile(rf"\[\s*(?:{_ITEM}\s*(?:,\s*{_ITEM}\s*)*,?\s*)?\]")
+_ITEM_RE = re.compile(r"""'([^'\\\n]*)'|"([^"\\\n]*)\"""")
+_ENTRY_RE = re.compile(r'([\d,]+)\s+(.+)')
+
+
+# Parse a stringified Python list such as "['Excel', 'SQL']"
+def parse_list(value):
+    if not isinstance(value, str):
+        return []
+    if _LIST_RE.fullmatch(value.strip()):
+        return [single or double for single, double in _ITEM_RE.findall(value)]
+    try:
+        items = ast.literal_eval(value)
+    except Exception:
+        return []
+    return [str(item) for item in items] if isinstance(items, list) else []
+
+
+# Parse a profile entry like '1,712 University of Washington' into (name, count)
+def parse_entry(entry):
+    entry = entry.strip()
+    m = _ENTRY_RE.match(entry)
+    if m:
+        num_str, name = m.groups()
+        num = int(num_str.replace(",", ""))
+        return name.strip(), num
+    return None, 0
+
+
+class CodedLists:
+    """A parsed list column: row i holds vocab[codes[offsets[i]:offsets[i + 1]]].
+
+    For profile columns (`counted=True`) each item also carries the head count of
+    its "<count> <name>" entry in `counts`.
+    """
+
+    def __init__(self, offsets, codes, vocab, counts=None):
+        self.offsets = offsets
+        self.codes = codes
+        self.vocab = pd.Index(vocab, dtype=object)
+        self.counts = counts
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        arrays = [self.offsets, self.codes] + ([self.counts] if self.counts is not None else [])
+        return int(sum(array.nbytes for array in arrays) + self.vocab.memory_usage(deep=True))
+
+    def rows(self):
+        """Row number of every item."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    def items(self):
+        """The items of all rows, flattened in row order (like Series.explode)."""
+        return pd.Series(self.vocab.to_numpy()[self.codes], index=self.rows(), dtype=object)
+
+    def item_counts(self):
+        """Rows containing each item (an item repeated within a row counts once), most frequent first."""
+        pairs = np.unique(self.rows() * len(self.vocab) + self.codes) % max(len(self.vocab), 1)
+        counts = np.bincount(pairs, minlength=len(self.vocab))
+        return pd.Series(counts, index=self.vocab).loc[lambda c: c > 0].sort_values(ascending=False, kind="stable")
+
+    def totals(self):
+        """Summed entry counts per item, largest first (counted columns)."""
+        totals = np.bincount(self.codes, weights=self.counts, minlength=len(self.vocab)).astype(np.int64)
+        return pd.Series(totals, index=self.vocab).sort_values(ascending=False, kind="stable")
+
+
+def _parse_chunk(values, counted):
+    """(lengths, codes, chunk vocabulary, counts) of one chunk; codes index the chunk's own vocabulary."""
+    vocab, codes, lengths, counts = {}, [], [], []
+    for value in values:
+        items = parse_list(value)
+        if counted:
+            entries = [parse_entry(item) for item in items]
+            entries = [(name, count) for name, count in entries if name]
+            codes.extend(vocab.setdefault(name, len(vocab)) for name, _ in entries)
+            counts.extend(count for _, count in entries)
+            lengths.append(len(entries))
+        else:
+            codes.extend(vocab.setdefault(item, len(vocab)) for item in items)
+            lengths.append(len(items))
+    return (np.array(lengths, dtype=np.int64), np.array(codes, dtype=np.int32), list(vocab),
+            np.array(counts, dtype=np.int64) if counted else None)
+
+
+def parse_lists(values, counted=False, workers=None, chunk_rows=None):
+    """Parse a column of stringified lists into CodedLists, on a process pool when it is large.
+
+    The vocabulary is in order of first appearance, as pd.factorize would give.
+    """
+    values = np.asarray(pd.Series(values).astype(object), dtype=object)
+    chunk_rows = chunk_rows or LIST_PARSE_CHUNK_ROWS
+    workers = LIST_PARSE_WORKERS if workers is None else workers
+    chunks = [values[start:start + chunk_rows] for start in range(0, len(values), chunk_rows)]
+    if workers > 1 and len(chunks) > 1 and len(values) >= LIST_PARSE_MIN_PARALLEL_ROWS:
+        # spawn, not fork: the app process runs threads (Streamlit, the precompute pool)
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            parts = list(pool.map(_parse_chunk, chunks, itertools.repeat(counted)))
+    else:
+        parts = [_parse_chunk(chunk, counted) for chunk in chunks]
+
+    # Merge the chunk vocabularies and remap each chunk's codes onto the merged one
+    vocab, codes = {}, []
+    for _, chunk_codes, chunk_vocab, _ in parts:
+        remap = np.fromiter((vocab.setdefault(item, len(vocab)) for item in chunk_vocab),
+                            dtype=np.int32, count=len(chunk_vocab))
+        codes.append(remap[chunk_codes])
+    lengths = np.concatenate([part[0] for part in parts]) if parts else np.empty(0, dtype=np.int64)
+    counts = None
+    if counted:
+        counts = np.concatenate([part[3] for part in parts]) if parts else np.empty(0, dtype=np.int64)
+    return CodedLists(np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+                      np.concatenate(codes) if codes else np.empty(0, dtype=np.int32), list(vocab), counts)
+
+
+# ---- Benchmark against the single-process ast.literal_eval parse ----
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="synthetic SKILLS_MATCHED values")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import data_source
+    column = data_source.synthetic_tables(args.rows, args.seed)["jobs"]["SKILLS_MATCHED"]
+    start = time.perf_counter()
+    reference = [ast.literal_eval(value) if isinstance(value, str) else [] for value in column]
+    print(f"ast.literal_eval, 1 process: {time.perf_counter() - start:.2f}s")
+    for workers in sorted({1, LIST_PARSE_WORKERS}):
+        start = time.perf_counter()
+        coded = parse_lists(column, workers=workers)
+        print(f"parse_lists, {workers} process(es): {time.perf_counter() - start:.2f}s")
+    vocab = coded.vocab.to_numpy()
+    if any(list(vocab[coded.codes[coded.offsets[i]:coded.offsets[i + 1]]]) != items
+           for i, items in enumerate(reference)):
+        print("MISMATCH against ast.literal_eval")
+        raise SystemExit(1)
+    print("All rows match.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""Concurrent-session load test against the local data backend.
+
+Starts the dashboard (`streamlit run`) on synthetic local data, drives N
+simulated browser sessions over Streamlit's websocket protocol through filter
+submissions and page switches, and reports throughput, rerun latency
+percentiles, and the server's CPU and RSS over time. Sessions also open and
+close page sections (the lazily rendered charts behind each page's pills). The same --seed gives the
+same data and the same action sequences, so runs can be compared before and
+after a change.
+
+    python load_test.py --sessions 8 --actions 40 --rows 50000 --seed 1 --json results.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import numpy as np
+import pandas as pd
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGES = ["Overview", "Job Map", "Requirements", "Company Info", "Jobs Lookup"]
+# Share of each simulated action
+ACTIONS = {"switch_page": 0.4, "apply_filters": 0.3, "toggle_sections": 0.2, "reset_filters": 0.1}
+# Chance that a filter widget is changed on a filter submission
+FILTER_CHANGE_PROB = 0.3
+FILTER_SELECTBOXES = ["selected_state", "selected_workplace", "selected_seniority",
+                      "selected_job_title", "selected_job_func", "selected_salary"]
+FILTER_CHECKBOXES = ["collapse_duplicates"]
+# Chance that each section is open after a section toggle (st.pills, see sections.py)
+SECTION_OPEN_PROB = 0.5
+WIDGET_TYPES = {"selectbox", "radio", "date_input", "text_input", "button", "button_group", "checkbox"}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions")
+    parser.add_argument("--actions", type=int, default=30, help="actions per session after the first load")
+    parser.add_argument("--rows", type=int, default=50000, help="synthetic job postings")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the data and the action sequences")
+    parser.add_argument("--think", type=float, default=0.5, help="mean think time between actions (s)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="delay between session starts (s)")
+    parser.add_argument("--interval", type=float, default=1.0, help="CPU/RSS sampling interval (s)")
+    parser.add_argument("--timeout", type=float, default=300, help="per-rerun timeout (s)")
+    parser.add_argument("--port", type=int, default=0, help="server port (default: a free port)")
+    parser.add_argument("--json", help="also write the raw results to this file")
+    return parser.parse_args(argv)
+
+
+def server_environment(args):
+    """Environment pointing the app at synthetic local data (one snapshot per rows/seed, reused across runs)."""
+    env = dict(os.environ)
+    env.update({
+        "DATA_BACKEND": "local",
+        "AUTH_DISABLED": "1",
+        "LOCAL_DATA_ROWS": str(args.rows),
+        "LOCAL_DATA_SEED": str(args.seed),
+    })
+    env.setdefault("DATA_SNAPSHOT_DIR", os.path.join(
+        tempfile.gettempdir(), f"job_dashboard_loadtest_{args.rows}_{args.seed}"))
+    return env
+
+
+def start_server(args, log):
+    port = args.port
+    if not port:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(APP_DIR, "app.py"),
+         "--server.headless=true", f"--server.port={port}", "--server.address=127.0.0.1",
+         "--server.enableXsrfProtection=false", "--browser.gatherUsageStats=false"],
+        cwd=APP_DIR, env=server_environment(args), stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server, port
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("The dashboard server did not start (see the server log).")
+
+
+# ---- Server CPU and RSS from /proc ----
+def read_proc_usage(pid):
+    """(CPU seconds used, RSS in MB) of a process."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    rss_mb = 0.0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_mb = int(line.split()[1]) / 1024
+    return cpu_seconds, rss_mb
+
+
+class ResourceMonitor(threading.Thread):
+    """Samples a process's CPU utilisation (percent of one core) and RSS at a fixed interval."""
+
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        start = last_time = time.perf_counter()
+        last_cpu, _ = read_proc_usage(self.pid)
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            try:
+                cpu, rss_mb = read_proc_usage(self.pid)
+            except OSError:
+                break
+            self.samples.append({"t": round(now - start, 2),
+                                 "cpu_pct": round(100 * (cpu - last_cpu) / (now - last_time), 1),
+                                 "rss_mb": round(rss_mb, 1)})
+            last_time, last_cpu = now, cpu
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+# ---- Simulated browser session ----
+class Session:
+    """One browser tab: keeps its widget states and sends them with every rerun, as the frontend does."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.connection = None
+        self.page_script_hash = ""
+        self.widgets = {}   # widget id -> element proto
+        self.states = {}    # widget id -> WidgetState sent with each rerun
+        self.fragments = {}  # widget id -> id of the fragment it was drawn in
+        self.drawn = set()   # widget ids drawn by the last full rerun
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def _register(self, kind, element):
+        self.widgets[element.id] = element
+        if kind == "button" or (element.id in self.states and not element.set_value):
+            return
+        state = WidgetState(id=element.id)
+        if kind in ("selectbox", "radio"):
+            state.int_value = element.value if element.set_value else element.default
+        elif kind == "date_input":
+            state.string_array_value.data.extend(element.value if element.set_value else element.default)
+        elif kind == "text_input":
+            state.string_value = element.value if element.set_value else element.default
+        elif kind == "button_group":
+            state.int_array_value.data.extend(element.value if element.set_value else element.default)
+        elif kind == "checkbox":
+            state.bool_value = element.value if element.set_value else element.default
+        self.states[element.id] = state
+
+    def widget(self, key=None, label=None):
+        for widget_id, element in self.widgets.items():
+            if (key is not None and widget_id.endswith(f"-{key}")) or (label is not None and element.label == label):
+                return element
+        raise KeyError(key or label)
+
+    async def rerun(self, trigger=None, fragment_id=None):
+        """Send a rerun (optionally clicking the `trigger` button, or of one fragment only, as the
+        frontend does for widgets inside a fragment) and wait for the script to finish."""
+        message = BackMsg()
+        client_state = message.rerun_script
+        client_state.page_script_hash = self.page_script_hash
+        if fragment_id:
+            client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(self.states.values())
+        if trigger is not None:
+            client_state.widget_states.widgets.append(WidgetState(id=trigger.id, trigger_value=True))
+
+        start = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        error, drawn = None, set()
+        while True:
+            payload = await asyncio.wait_for(self.connection.read_message(), self.timeout)
+            if payload is None:
+                raise ConnectionError("The server closed the session.")
+            msg = ForwardMsg()
+            msg.ParseFromString(payload)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = msg.new_session.page_script_hash
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element_kind = msg.delta.new_element.WhichOneof("type")
+                if element_kind in WIDGET_TYPES:
+                    element = getattr(msg.delta.new_element, element_kind)
+                    self._register(element_kind, element)
+                    self.fragments[element.id] = msg.delta.fragment_id
+                    drawn.add(element.id)
+                elif element_kind == "exception" and error is None:
+                    error = msg.delta.new_element.exception.message
+            elif kind == "script_finished" and \
+                    msg.script_finished != ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                if not fragment_id:
+                    self.drawn = drawn
+                return time.perf_counter() - start, error
+
+
+def _plan_filters(session, rng):
+    for key in FILTER_SELECTBOXES:
+        if rng.random() < FILTER_CHANGE_PROB:
+            element = session.widget(key=key)
+            session.states[element.id].int_value = int(rng.integers(len(element.options)))
+    for key in FILTER_CHECKBOXES:
+        if rng.random() < FILTER_CHANGE_PROB:
+            state = session.states[session.widget(key=key).id]
+            state.bool_value = not state.bool_value
+    if rng.random() < FILTER_CHANGE_PROB:
+        element = session.widget(key="date_range")
+        low, high = pd.Timestamp(element.min.replace("/", "-")), pd.Timestamp(element.max.replace("/", "-"))
+        days = max((high - low).days, 1)
+        start = low + pd.Timedelta(days=int(rng.integers(0, days)))
+        end = min(start + pd.Timedelta(days=int(rng.integers(7, 120))), high)
+        state = session.states[element.id]
+        del state.string_array_value.data[:]
+        state.string_array_value.data.extend([start.strftime("%Y/%m/%d"), end.strftime("%Y/%m/%d")])
+    return session.widget(label="Apply Filters")
+
+
+def _plan_sections(session, page, rng):
+    """Open a random subset of the page's sections; the fragment to rerun (None: no sections drawn).
+
+    A fragment only exists while the last full run drew it (the server drops the rerun otherwise)."""
+    try:
+        element = session.widget(key=f"{page}_sections")
+    except KeyError:
+        return None
+    if element.id not in session.drawn:
+        return None
+    state = session.states[element.id]
+    del state.int_array_value.data[:]
+    state.int_array_value.data.extend(np.flatnonzero(rng.random(len(element.options)) < SECTION_OPEN_PROB).tolist())
+    return session.fragments.get(element.id) or None
+
+
+async def run_session(index, args, url, records):
+    rng = np.random.default_rng([args.seed, index + 1])
+    session = Session(url, args.timeout)
+    await session.connect()
+    action, page = "initial_load", "Overview"
+    try:
+        for step in range(args.actions + 1):
+            trigger = fragment_id = None
+            if step > 0:
+                await asyncio.sleep(rng.exponential(args.think) if args.think > 0 else 0)
+                action = str(rng.choice(list(ACTIONS), p=list(ACTIONS.values())))
+                if action == "switch_page":
+                    page = PAGES[rng.integers(len(PAGES))]
+                    navigation = session.widget(key="active_page")
+                    session.states[navigation.id].int_value = list(navigation.options).index(page)
+                elif action == "apply_filters":
+                    trigger = _plan_filters(session, rng)
+                elif action == "toggle_sections":
+                    fragment_id = _plan_sections(session, page, rng)
+                else:
+                    trigger = session.widget(label="Reset Filters")
+
+            start = time.perf_counter()
+            try:
+                latency, error = await session.rerun(trigger, fragment_id)
+            except Exception as exc:  # timeouts and dropped connections count as failed reruns
+                latency, error = time.perf_counter() - start, f"{type(exc).__name__}: {exc}"
+            records.append({"session": index, "step": step, "action": action, "page": page,
+                            "latency": latency, "error": error})
+    finally:
+        session.close()
+
+
+async def run_sessions(args, url, records):
+    tasks = []
+    for index in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(index, args, url, records)))
+        await asyncio.sleep(args.ramp)
+    await asyncio.gather(*tasks)
+
+
+# ---- Report ----
+def summarize(records, samples, wall_seconds):
+    df = pd.DataFrame(records)
+    ok = df[df["error"].isna()]
+
+    def percentiles(latency):
+        return {f"p{q}": round(float(np.percentile(latency, q)) * 1000, 1) if len(latency) else None
+                for q in (50, 95, 99)}
+
+    return {
+        "reruns": len(df),
+        "errors": int(df["error"].notna().sum()),
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_per_s": round(len(ok) / wall_seconds, 2) if wall_seconds else None,
+        "latency_ms": percentiles(ok["latency"]),
+        "by_action_ms": {action: {"n": len(group), **percentiles(group["latency"])}
+                         for action, group in ok.groupby("action")},
+        "by_page_ms": {page: {"n": len(group), **percentiles(group["latency"])}
+                       for page, group in ok[ok["action"] == "switch_page"].groupby("page")},
+        "peak_rss_mb": max((s["rss_mb"] for s in samples), default=None),
+        "mean_cpu_pct": round(float(np.mean([s["cpu_pct"] for s in samples])), 1) if samples else None,
+    }
+
+
+def print_report(args, summary, samples, records):
+    print(f"\nSessions: {args.sessions}  actions/session: {args.actions}  rows: {args.rows}  seed: {args.seed}")
+    print(f"Reruns: {summary['reruns']}  errors: {summary['errors']}  wall: {summary['wall_seconds']} s  "
+          f"throughput: {summary['throughput_per_s']} reruns/s")
+    latency = summary["latency_ms"]
+    print(f"Rerun latency (ms): p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}")
+    if summary["by_action_ms"]:
+        print("\nBy action (ms):")
+        print(pd.DataFrame(summary["by_action_ms"]).T.to_string())
+    if summary["by_page_ms"]:
+        print("\nPage switches by page (ms):")
+        print(pd.DataFrame(summary["by_page_ms"]).T.to_string())
+    if samples:
+        print(f"\nServer CPU / RSS over time (mean CPU {summary['mean_cpu_pct']}%, "
+              f"peak RSS {summary['peak_rss_mb']} MB):")
+        print(pd.DataFrame(samples).to_string(index=False))
+    errors = [r for r in records if r["error"]]
+    if errors:
+        print("\nFirst errors:")
+        for r in errors[:5]:
+            print(f"  session {r['session']} step {r['step']} ({r['action']}): {r['error']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_path = os.path.join(tempfile.gettempdir(), "job_dashboard_loadtest_server.log")
+    with open(log_path, "w") as log:
+        server, port = start_server(args, log)
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            # Build the snapshot and load-time structures once, outside the measured window
+            print(f"Server on port {port} (log: {log_path}); warming up...")
+            asyncio.run(run_session(-1, argparse.Namespace(**{**vars(args), "actions": 0}), url, []))
+
+            records = []
+            monitor = ResourceMonitor(server.pid, args.interval)
+            monitor.start()
+            start = time.perf_counter()
+            asyncio.run(run_sessions(args, url, records))
+            wall_seconds = time.perf_counter() - start
+            monitor.stop()
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    summary = summarize(records, monitor.samples, wall_seconds)
+    print_report(args, summary, monitor.samples, records)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "summary": summary, "samples": monitor.samples,
+                       "records": records}, f, indent=2, default=str)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import ast
+import session_memory
+import precompute
+import backends
+from agg_planner import AggPlan
+from list_parse import parse_lists
+import sections
+import industry_sectors
 
 # Helper function to create a pie chart with fixed, smaller dimensions.
-def create_pie_chart(series, title, key_suffix, width=300, height=300, rotation=0, margin_top=60, font_size=10):
-    counts = series.value_counts().head(10).reset_index()
-    counts.columns = [series.name, 'COUNT']
-    fig = px.pie(counts, values='COUNT', names=series.name, title=title)
+def create_pie_chart(counts, title, key_suffix, width=300, height=300, rotation=0, margin_top=60, font_size=10):
+    name = counts.index.name
+    counts = counts.reset_index()
+    counts.columns = [name, 'COUNT']
+    fig = px.pie(counts, values='COUNT', names=name, title=title)
     # Display label and percent outside with smaller font size.
     fig.update_traces(textposition='outside', textinfo='label+percent', textfont=dict(size=font_size))
     fig.update_layout(showlegend=False, width=width, height=height,
@@ -16,7 +23,43 @@ def create_pie_chart(series, title, key_suffix, width=300, height=300, rotation=
         fig.update_traces(rotation=rotation)
     return fig
 
-def main(df):
+# Overview metrics, computed in one grouped pass over the filtered rows (agg_planner)
+def overview_plan(columns):
+    # Grouped by day as timestamps, then shown as dates
+    plan = AggPlan().key("INTERVAL", codes=lambda df: pd.factorize(df['POSTED_DATE'].dt.normalize(), sort=True))
+    plan.size("JOB_COUNT", "INTERVAL").mean("AVG_SALARY", "INTERVAL", "AVG_SALARY")
+    for column in ['SENIORITY_LEVEL', 'WORKPLACE', 'EMPLOYMENT_TYPE']:
+        if column in columns:
+            plan.key(column, column).size(column, column)
+    return plan
+
+# Aggregate tables behind the charts (pure, so they can also be computed in the background)
+def aggregate(df, sample_rows=None, sectors=None, companies=None):
+    results = overview_plan(df.columns).run(df)
+    days = results["INTERVAL"]
+    dates = pd.DatetimeIndex(days.index).date
+    aggs = {
+        "job_count": pd.DataFrame({"INTERVAL": dates, "JOB_COUNT": days["JOB_COUNT"].to_numpy()}),
+        "salary_over_time": pd.DataFrame({"INTERVAL": dates, "AVG_SALARY": days["AVG_SALARY"].to_numpy()}),
+    }
+    for column in ['SENIORITY_LEVEL', 'WORKPLACE', 'EMPLOYMENT_TYPE']:
+        aggs[column] = results[column][column].rename("count").sort_values(ascending=False, kind="stable") \
+            .head(10) if column in df.columns else None
+
+    if 'JOB_FUNCTION_LIST' in df.columns:
+        # List-valued, so parsed over the date sample; in-process (workers=1): a per-filter aggregate,
+        # not a load-time transform
+        sampled_df = session_memory.date_sample(df, sample_rows)
+        exploded_job_funcs = parse_lists(sampled_df['JOB_FUNCTION_LIST'], workers=1).items()
+        aggs['JOB_FUNCTION'] = backends.get_backend().value_counts(exploded_job_funcs.rename("JOB_FUNCTION")).head(10)
+    else:
+        aggs['JOB_FUNCTION'] = None
+
+    # Exact over all rows: a bincount over the postings' precomputed sector codes
+    aggs['sectors'] = industry_sectors.rollup(df, sectors, companies) if sectors is not None else None
+    return aggs
+
+def main(df, filter_key=None, sectors=None, companies=None):
     st.header("Dataset Overview")
     
     # Ensure POSTED_DATE is datetime
@@ -34,137 +77,143 @@ def main(df):
     """, unsafe_allow_html=True)
 
     # -------------------------------
-    # Create 'INTERVAL' column using the full dataset (date only)
-    # -------------------------------
-    df['INTERVAL'] = df['POSTED_DATE'].dt.date
-    sampled_df = df.groupby('POSTED_DATE').apply(lambda x: x.sample(frac=0.1, random_state=42)).reset_index(drop=True)
-
-    # -------------------------------
-    # Line Graph: Job Postings by Date (Smoothed)
+    # Charts: aggregated and drawn only for the sections the user opens
     # -------------------------------
-    st.markdown("### Number of Job Postings Over Time")
-    job_count = df.groupby("INTERVAL").size().reset_index(name="JOB_COUNT")
-    job_count = job_count.sort_values("INTERVAL")
-    fig_job_count = px.line(job_count, x="INTERVAL", y="JOB_COUNT",
+    def aggs():
+        return precompute.page_aggregates("Overview", filter_key, lambda: aggregate(df, sectors=sectors,
+                                                                                   companies=companies),
+                                          fallback=lambda: aggregate(df, session_memory.FALLBACK_SAMPLE_ROWS,
+                                                                     sectors, companies))
+
+    sections.render("Overview", {
+        "Trends": (lambda: trend_figures(aggs()), show_trends),
+        "Salary Distribution": (lambda: salary_histogram(df), show_salary_distribution),
+        "Categorical Distributions": (lambda: category_figures(aggs()), show_categories),
+        "Industry Sectors": (lambda: sector_figures(aggs()), show_sectors),
+    }, filter_key)
+
+# -------------------------------
+# Line Graphs: Job Postings and Average Salary by Date (Smoothed)
+# -------------------------------
+def trend_figures(aggs):
+    fig_job_count = px.line(aggs["job_count"], x="INTERVAL", y="JOB_COUNT",
                             title="Job Postings by Date",
                             labels={"INTERVAL": "Date", "JOB_COUNT": "Number of Postings"},
                             line_shape="spline")
-    st.plotly_chart(fig_job_count, use_container_width=True, key="job_count_chart")
-
-    # -------------------------------
-    # Line Graph: Average Salary by Date (Smoothed)
-    # -------------------------------
-    st.markdown("### Average Salary Over Time")
-    # salary_data = df[(df['AVG_SALARY']>=20000) & (df['AVG_SALARY']<=500000)]
-    # salary_over_time = df.groupby("INTERVAL")['AVG_SALARY'].mean().reset_index(name="AVG_SALARY")
-    salary_over_time = sampled_df.groupby("INTERVAL")['AVG_SALARY'].mean().reset_index(name="AVG_SALARY")
-    salary_over_time = salary_over_time.sort_values("INTERVAL")
-    fig_salary_trend = px.line(salary_over_time, x="INTERVAL", y="AVG_SALARY",
+    fig_salary_trend = px.line(aggs["salary_over_time"], x="INTERVAL", y="AVG_SALARY",
                                title="Average Salary by Date",
                                labels={"INTERVAL": "Date", "AVG_SALARY": "Average Salary"},
                                line_shape="spline")
+    return fig_job_count, fig_salary_trend
+
+def show_trends(figures):
+    fig_job_count, fig_salary_trend = figures
+    st.markdown("### Number of Job Postings Over Time")
+    st.plotly_chart(fig_job_count, use_container_width=True, key="job_count_chart")
+    st.markdown("### Average Salary Over Time")
     st.plotly_chart(fig_salary_trend, use_container_width=True, key="salary_trend_chart")
 
-    # -------------------------------
-    # Histogram: Salary Distribution (0 - 500,000)
-    # -------------------------------
+# -------------------------------
+# Histogram: Salary Distribution (0 - 500,000)
+# -------------------------------
+def salary_histogram(df):
     # salary_data = df[(df['AVG_SALARY']>=20000) & (df['AVG_SALARY']<=500000)]
-    fig_salary_hist = px.histogram(df, x="AVG_SALARY", nbins=50,
-                                   title="Salary Distribution",
-                                   labels={"AVG_SALARY": "Salary"},
-                                   range_x=[20000,500000])
-
-    # -------------------------------
-    # Pie Charts for Categorical Data in a 3x2 Matrix
-    # -------------------------------
-    st.markdown("### Categorical Distributions")
-    
+    return px.histogram(df, x="AVG_SALARY", nbins=50,
+                        title="Salary Distribution",
+                        labels={"AVG_SALARY": "Salary"},
+                        range_x=[20000,500000])
+
+def show_salary_distribution(fig_salary_hist):
+    st.markdown("### Salary Distribution")
+    st.plotly_chart(fig_salary_hist, use_container_width=True, key="salary_hist_chart_matrix")
+
+# -------------------------------
+# Pie Charts for Categorical Data in a 2x2 Matrix
+# -------------------------------
+def category_figures(aggs):
     # Pie Chart: Seniority Level
-    if 'SENIORITY_LEVEL' in df.columns:
-        # fig_seniority = create_pie_chart(df['SENIORITY_LEVEL'], "Seniority Level Distribution", "pie_seniority")
-        fig_seniority = create_pie_chart(sampled_df['SENIORITY_LEVEL'], "Seniority Level Distribution", "pie_seniority")
-    else:
-        fig_seniority = None
+    fig_seniority = None if aggs['SENIORITY_LEVEL'] is None else \
+        create_pie_chart(aggs['SENIORITY_LEVEL'], "Seniority Level Distribution", "pie_seniority")
 
     # Pie Chart: Workplace
-    if 'WORKPLACE' in df.columns:
-        # fig_workplace = create_pie_chart(df['WORKPLACE'], "Workplace Distribution", "pie_workplace")
-        fig_workplace = create_pie_chart(sampled_df['WORKPLACE'], "Workplace Distribution", "pie_workplace")
-    else:
-        fig_workplace = None
+    fig_workplace = None if aggs['WORKPLACE'] is None else \
+        create_pie_chart(aggs['WORKPLACE'], "Workplace Distribution", "pie_workplace")
 
     # Pie Chart: Employment Type (rotate by 90° to avoid overlap)
-    if 'EMPLOYMENT_TYPE' in df.columns:
-        # fig_emp_type = create_pie_chart(df['EMPLOYMENT_TYPE'], "Employment Type Distribution", "pie_employment", rotation=90, margin_top=60, font_size=10)
-        fig_emp_type = create_pie_chart(sampled_df['EMPLOYMENT_TYPE'], "Employment Type Distribution", "pie_employment", rotation=90, margin_top=60, font_size=10)
-    else:
-        fig_emp_type = None
+    fig_emp_type = None if aggs['EMPLOYMENT_TYPE'] is None else \
+        create_pie_chart(aggs['EMPLOYMENT_TYPE'], "Employment Type Distribution", "pie_employment", rotation=90, margin_top=60, font_size=10)
 
     # Pie Chart: Job Function (from JOB_FUNCTION_LIST)
-    # if 'JOB_FUNCTION_LIST' in df.columns:
-    #     all_job_funcs = []
-    #     # for item in df['JOB_FUNCTION_LIST'].dropna():
-    #     for item in sampled_df['JOB_FUNCTION_LIST'].dropna():
-    #         try:
-    #             funcs = ast.literal_eval(item)
-    #             if isinstance(funcs, list):
-    #                 all_job_funcs.extend(funcs)
-    #         except Exception:
-    #             continue
-    #     if all_job_funcs:
-    #         job_func_series = pd.Series(all_job_funcs, name="JOB_FUNCTION")
-    #         fig_job_func = create_pie_chart(job_func_series, "Job Function Distribution", "pie_job_func")
-    #     else:
-    #         fig_job_func = None
-    # else:
-    #     fig_job_func = None
-
-    # Pie Chart: Job Function (from JOB_FUNCTION_LIST)
-    if 'JOB_FUNCTION_LIST' in sampled_df.columns:
-        exploded_job_funcs = (
-            sampled_df['JOB_FUNCTION_LIST']
-            .dropna()
-            .apply(lambda x: ast.literal_eval(x) if isinstance(x, str) else [])
-            .explode()
-            .dropna()
-        )
-
-        if not exploded_job_funcs.empty:
-            job_func_series = exploded_job_funcs.rename("JOB_FUNCTION")
-            fig_job_func = create_pie_chart(job_func_series, "Job Function Distribution", "pie_job_func")
-        else:
-            fig_job_func = None
+    if aggs['JOB_FUNCTION'] is not None and not aggs['JOB_FUNCTION'].empty:
+        fig_job_func = create_pie_chart(aggs['JOB_FUNCTION'], "Job Function Distribution", "pie_job_func")
     else:
         fig_job_func = None
+    return fig_seniority, fig_workplace, fig_emp_type, fig_job_func
 
-
-    # -------------------------------
-    # Arrange the 6 charts in a 3x2 matrix:
+def show_categories(figures):
+    fig_seniority, fig_workplace, fig_emp_type, fig_job_func = figures
+    st.markdown("### Categorical Distributions")
     row1_col1, row1_col2 = st.columns(2)
     row2_col1, row2_col2 = st.columns(2)
-    row3_col1, row3_col2 = st.columns(2)
 
     with row1_col1:
-        st.plotly_chart(fig_salary_hist, use_container_width=True, key="salary_hist_chart_matrix")
-    with row1_col2:
         if fig_seniority is not None:
             st.plotly_chart(fig_seniority, use_container_width=True, key="pie_seniority_chart")
         else:
             st.write("Seniority data not available.")
-    
-    with row2_col1:
+    with row1_col2:
         if fig_workplace is not None:
             st.plotly_chart(fig_workplace, use_container_width=True, key="pie_workplace_chart")
         else:
             st.write("Workplace data not available.")
-    with row2_col2:
+
+    with row2_col1:
         if fig_emp_type is not None:
             st.plotly_chart(fig_emp_type, use_container_width=True, key="pie_employment_chart")
         else:
             st.write("Employment type data not available.")
-    
-    with row3_col1:
+    with row2_col2:
         if fig_job_func is not None:
             st.plotly_chart(fig_job_func, use_container_width=True, key="pie_job_func_chart")
         else:
             st.write("Job function data not available.")
+
+# -------------------------------
+# Bar Charts: Job Postings and Average Salary by Industry Sector (BLS sectors of INDUSTRIES)
+# -------------------------------
+def sector_figures(aggs):
+    sectors = aggs['sectors']
+    if sectors is None or sectors.empty:
+        return None, None, None
+    sectors = sectors.reset_index()
+    fig_sector_jobs = px.bar(sectors, x="JOBS", y="SECTOR", orientation="h", title="Job Postings by Industry Sector",
+                             labels={"SECTOR": "Sector", "JOBS": "Number of Postings"})
+    fig_sector_jobs.update_yaxes(categoryorder="total ascending")
+    fig_sector_salary = None
+    if "AVG_SALARY" in sectors.columns:
+        salaried = sectors[sectors["SALARIED"] >= 10]
+        if not salaried.empty:
+            fig_sector_salary = px.bar(salaried, x="AVG_SALARY", y="SECTOR", orientation="h",
+                                       title="Average Salary by Industry Sector (sectors with 10+ salaried postings)",
+                                       labels={"SECTOR": "Sector", "AVG_SALARY": "Average Salary"})
+            fig_sector_salary.update_yaxes(categoryorder="total ascending")
+    return fig_sector_jobs, fig_sector_salary, industry_sectors.fuzzy_shares(sectors)
+
+def show_sectors(figures):
+    fig_sector_jobs, fig_sector_salary, fuzzy = figures
+    st.markdown("### Industry Sectors")
+    if fig_sector_jobs is None:
+        st.write("Industry sector data not available.")
+        return
+    col_left, col_right = st.columns(2)
+    with col_left:
+        st.plotly_chart(fig_sector_jobs, use_container_width=True, key="sector_jobs_chart")
+    with col_right:
+        if fig_sector_salary is not None:
+            st.plotly_chart(fig_sector_salary, use_container_width=True, key="sector_salary_chart")
+        else:
+            st.write("No industry sectors with 10 or more salaried postings.")
+    # How much of each sector rests on labels matched by name similarity only
+    st.caption("Share of each sector's postings whose INDUSTRIES label was fuzzy-matched to the taxonomy:")
+    st.dataframe(fuzzy, hide_index=True, use_container_width=True,
+                 column_config={"FUZZY_%": st.column_config.NumberColumn(format="%.1f%%")})
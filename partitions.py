@@ -0,0 +1,175 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Months (counted back from the newest posting) kept resident in every worker
+HOT_MONTHS = int(os.getenv("HOT_MONTHS", "2"))
+# Memory budget for older months loaded on demand (least-recently-used evicted first)
+PARTITION_MEMORY_BUDGET_MB = float(os.getenv("PARTITION_MEMORY_BUDGET_MB", "512"))
+
+UNDATED = "undated"
+
+
+def write_partitions(jobs, directory, write_table):
+    """Split the jobs table by posting month into one columnar file per month.
+
+    Rows are ordered newest first and numbered with a global ROW_ID, so every
+    month is a contiguous ROW_ID range and row ids stay stable across partitions.
+    Returns the jobs in ROW_ID order.
+    """
+    jobs = jobs.sort_values("POSTED_DATE", ascending=False, na_position="last", kind="stable")
+    jobs = jobs.reset_index(drop=True)
+    jobs.insert(0, "ROW_ID", np.arange(len(jobs), dtype=np.int64))
+    months = jobs["POSTED_DATE"].dt.strftime("%Y-%m").fillna(UNDATED)
+    os.makedirs(directory)
+    for month, part in jobs.groupby(months, sort=False):
+        write_table(part, os.path.join(directory, f"{month}.arrow"))
+    return jobs
+
+
+class PartitionStore:
+    """Month partitions of the jobs table: recent months resident, older ones mapped and loaded on demand.
+
+    Frames handed out are indexed by ROW_ID, the row's position in the full
+    (newest-first) jobs table, which is what the load-time indexes refer to.
+    """
+
+    def __init__(self, directory, read_table, hot_months=HOT_MONTHS, budget_mb=PARTITION_MEMORY_BUDGET_MB):
+        self.directory = directory
+        self.read_table = read_table
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self.cold = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+        # Partition metadata from the mapped files (no column data is copied)
+        meta = []
+        for name in os.listdir(directory):
+            if not name.endswith(".arrow"):
+                continue
+            source = pa.memory_map(os.path.join(directory, name), "r")
+            table = pa.ipc.open_file(source).read_all()
+            dates = pc.min_max(table.column("POSTED_DATE"))
+            meta.append({
+                "month": name[:-len(".arrow")],
+                "rows": table.num_rows,
+                "first_row": pc.min(table.column("ROW_ID")).as_py(),
+                "min_date": pd.Timestamp(dates["min"].as_py()) if dates["min"].is_valid else pd.NaT,
+                "max_date": pd.Timestamp(dates["max"].as_py()) if dates["max"].is_valid else pd.NaT,
+            })
+        self.meta = pd.DataFrame(meta).sort_values("first_row").reset_index(drop=True)
+        self.n_rows = int(self.meta["rows"].sum())
+        self.min_date = self.meta["min_date"].min()
+        self.max_date = self.meta["max_date"].max()
+
+        dated = self.meta[self.meta["month"] != UNDATED]["month"].sort_values()
+        self.hot_months = set(dated.tail(hot_months))
+        self.hot = {month: self._load(month) for month in self.hot_months}
+
+    def _load(self, month):
+        frame = self.read_table(os.path.join(self.directory, f"{month}.arrow"))
+        return frame.set_index("ROW_ID", drop=True)
+
+    def partition(self, month):
+        """Frame of one month, loading (and caching) it if it is not resident."""
+        if month in self.hot:
+            return self.hot[month]
+        with self.lock:
+            if month in self.cold:
+                self.cold.move_to_end(month)
+                return self.cold[month][0]
+            frame = self._load(month)
+            nbytes = int(frame.memory_usage(deep=True).sum())
+            self.loads += 1
+            while self.cold and sum(size for _, size in self.cold.values()) + nbytes > self.budget:
+                self.cold.popitem(last=False)
+                self.evictions += 1
+            if nbytes <= self.budget:
+                self.cold[month] = (frame, nbytes)
+            return frame
+
+    def _peek(self, month):
+        """Frame of one month without touching the on-demand cache (cold months missing from it are read
+        from the mapped file and not kept)."""
+        if month in self.hot:
+            return self.hot[month]
+        with self.lock:
+            if month in self.cold:
+                return self.cold[month][0]
+        return self._load(month)
+
+    def months_between(self, start_date, end_date):
+        start_date, end_date = pd.to_datetime(start_date), pd.to_datetime(end_date)
+        overlap = (self.meta["max_date"] >= start_date) & (self.meta["min_date"] <= end_date)
+        return self.meta.loc[overlap, "month"].tolist()
+
+    def select(self, start_date, end_date, filter_fn=None):
+        """Rows of the months overlapping [start_date, end_date], passed month by month through `filter_fn`.
+
+        A range covering every month (the default, all-dates view) bypasses the
+        on-demand cache: caching each older month in turn would evict the others
+        and reload them all on every rerun once they exceed the budget.
+        """
+        months = self.months_between(start_date, end_date)
+        read = self._peek if len(months) == len(self.meta) else self.partition
+        parts = []
+        for month in months:
+            part = read(month)
+            parts.append(filter_fn(part) if filter_fn is not None else part)
+        if not parts:
+            return self.partition(self.meta["month"].iloc[0]).iloc[0:0]
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def scan(self, columns=None):
+        """Every row (ordered by ROW_ID) for load-time builders; cold months are not cached."""
+        parts = []
+        for month in self.meta["month"]:
+            frame = self._peek(month)
+            parts.append(frame if columns is None else frame[columns])
+        return pd.concat(parts)
+
+    def take_rows(self, rows, columns=None):
+        """Rows by ROW_ID, in the given order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        owner = np.searchsorted(self.meta["first_row"].to_numpy(), rows, side="right") - 1
+        parts = []
+        for i in np.unique(owner):
+            frame = self.partition(self.meta["month"].iloc[i])
+            parts.append(frame.loc[rows[owner == i]] if columns is None else frame.loc[rows[owner == i], columns])
+        if not parts:
+            return self.partition(self.meta["month"].iloc[0]).iloc[0:0]
+        return pd.concat(parts).loc[rows]
+
+    def drop_cold(self):
+        """Release every on-demand month (they are reloaded from the mapped files when needed)."""
+        with self.lock:
+            dropped = len(self.cold)
+            self.cold.clear()
+            self.evictions += dropped
+        return dropped
+
+    @property
+    def nbytes(self):
+        with self.lock:
+            cold = sum(size for _, size in self.cold.values())
+        return sum(int(f.memory_usage(deep=True).sum()) for f in self.hot.values()) + cold
+
+    def stats(self):
+        mb = 1024 * 1024
+        with self.lock:
+            cold = {month: size for month, (_, size) in self.cold.items()}
+        return {
+            "partitions": len(self.meta),
+            "hot_months": sorted(self.hot_months),
+            "hot_mb": sum(int(f.memory_usage(deep=True).sum()) for f in self.hot.values()) / mb,
+            "cold_loaded": sorted(cold),
+            "cold_mb": sum(cold.values()) / mb,
+            "budget_mb": self.budget / mb,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+import streamlit as st
+import session_memory
+
+# Background workers shared by all sessions, and the cap on queued speculative tasks
+PRECOMPUTE_WORKERS = int(os.getenv("PRECOMPUTE_WORKERS", "2"))
+PRECOMPUTE_MAX_PENDING = int(os.getenv("PRECOMPUTE_MAX_PENDING", "16"))
+# Page aggregates kept process-wide, shared by sessions with the same filters (LRU)
+PRECOMPUTE_CACHE_ENTRIES = int(os.getenv("PRECOMPUTE_CACHE_ENTRIES", "64"))
+
+_STATE_KEY = "_precompute"
+
+
+@st.cache_resource
+def _pool():
+    return {
+        "executor": ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="precompute"),
+        "lock": threading.Lock(),
+        "pending": [0],
+        "results": OrderedDict(),
+        "hits": [0],
+    }
+
+
+def _shared_get(pool, key):
+    with pool["lock"]:
+        if key in pool["results"]:
+            pool["results"].move_to_end(key)
+            pool["hits"][0] += 1
+            return pool["results"][key]
+    return None
+
+
+def _shared_put(pool, key, value):
+    with pool["lock"]:
+        pool["results"][key] = value
+        pool["results"].move_to_end(key)
+        while len(pool["results"]) > PRECOMPUTE_CACHE_ENTRIES:
+            pool["results"].popitem(last=False)
+
+
+def _run(key, compute, cancelled, pool):
+    # Filters changed again before this task started: skip the work
+    if cancelled.is_set():
+        raise CancelledError()
+    value = _shared_get(pool, key)
+    if value is None:
+        value = compute()
+        _shared_put(pool, key, value)
+    return value
+
+
+def _release(pool):
+    with pool["lock"]:
+        pool["pending"][0] -= 1
+
+
+def schedule(signature, tasks):
+    """Start computing other pages' aggregates for `signature` in the background.
+
+    `tasks` maps page name -> zero-argument function. Tasks of a previous
+    signature are cancelled; speculation is skipped while the pool is saturated.
+    Must be called from the script thread (it uses session state).
+    """
+    run = st.session_state.get(_STATE_KEY)
+    if run is None or run["signature"] != signature:
+        if run is not None:
+            run["cancelled"].set()
+            for future in run["futures"].values():
+                future.cancel()
+        run = {"signature": signature, "cancelled": threading.Event(), "futures": {}}
+        st.session_state[_STATE_KEY] = run
+
+    pool = _pool()
+    for page, compute in tasks.items():
+        if page in run["futures"]:
+            continue
+        with pool["lock"]:
+            if (page, signature) in pool["results"]:
+                continue
+            if pool["pending"][0] >= PRECOMPUTE_MAX_PENDING:
+                break
+            pool["pending"][0] += 1
+        future = pool["executor"].submit(_run, (page, signature), compute, run["cancelled"], pool)
+        # Runs once the task finishes or is cancelled before starting (then _run never runs)
+        future.add_done_callback(lambda _, pool=pool: _release(pool))
+        run["futures"][page] = future
+
+
+def result(page, signature, compute):
+    """The aggregates of `page` for `signature`: shared, speculative (waiting if still running) or computed now."""
+    pool = _pool()
+    value = _shared_get(pool, (page, signature))
+    if value is not None:
+        return value
+    run = st.session_state.get(_STATE_KEY)
+    if run is not None and run["signature"] == signature:
+        future = run["futures"].pop(page, None)
+        if future is not None and not future.cancel():
+            try:
+                return future.result()
+            except Exception:
+                pass
+    value = compute()
+    _shared_put(pool, (page, signature), value)
+    return value
+
+
+def page_aggregates(page, signature, compute, fallback=None):
+    """A page's aggregate tables: claimed from speculation or computed, then retained per session.
+
+    Over the session memory cap `fallback` (e.g. a bounded-sample version) is
+    used instead and nothing is retained.
+    """
+    if signature is None:
+        return compute()
+    if session_memory.over_cap():
+        return (fallback or compute)()
+    return session_memory.cached(f"{page}.aggregates", signature, lambda: result(page, signature, compute))
+
+
+def stats():
+    pool = _pool()
+    with pool["lock"]:
+        results = list(pool["results"].values())
+        stats = {"pending": pool["pending"][0], "cached": len(results), "hits": pool["hits"][0]}
+    stats["nbytes"] = sum(session_memory.deep_sizeof(value) for value in results)
+    return stats
+
+
+def clear():
+    """Drop the shared aggregates (sessions keep the ones they already claimed)."""
+    pool = _pool()
+    with pool["lock"]:
+        pool["results"].clear()
@@ -1,11 +1,87 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import ast
+import session_memory
+import precompute
+import backends
+from list_parse import parse_lists
 
-def main(df):
+# Aggregate tables behind the charts (pure, so they can also be computed in the background)
+def aggregate(df, skill_matrix=None, sample_rows=None, totals=None):
+    sampled_df = session_memory.date_sample(df, sample_rows)
+    aggs = {"degree_counts": None, "skill_freq": None, "skills_counts": None, "exp_counts": None}
+    backend = backends.get_backend()
+
+    if 'DEGREE' in sampled_df.columns:
+        # Drop true NaN + remove blanks and 'nan' strings
+        valid_degrees = (
+            sampled_df['DEGREE']
+            .dropna()  # remove true NaNs
+            .astype(str)
+            .str.strip()
+        )
+        # Filter out empty strings and 'nan' string (case-insensitive)
+        valid_degrees = valid_degrees[valid_degrees.str.lower() != 'nan']
+        valid_degrees = valid_degrees[valid_degrees != '']
+
+        # Count top 10
+        degree_counts = (
+            backend.value_counts(valid_degrees)
+            .head(10)
+            .sort_values(ascending=True)
+            .reset_index()
+        )
+        degree_counts.columns = ['degree', 'count']
+        aggs["degree_counts"] = degree_counts
+
+    if totals is not None:
+        # Unfiltered: the incrementally maintained skill counts
+        aggs["skill_freq"] = totals.counts("skills")
+        skills_counts = aggs["skill_freq"].head(10).sort_values(ascending=True)
+    elif skill_matrix is not None:
+        # Exact counts over the full filtered set from the sparse job x skill matrix
+        aggs["skill_freq"] = skill_matrix.frequencies(df.index.to_numpy())
+        skills_counts = aggs["skill_freq"].head(10).sort_values(ascending=True)
+    elif 'SKILLS_MATCHED' in sampled_df.columns:
+        # Parsed in-process: this runs per filter change, possibly on several sessions' threads at once
+        all_skills = parse_lists(sampled_df['SKILLS_MATCHED'], workers=1).items()
+        # Select top 10 highest, then sort in ascending order.
+        skills_counts = all_skills.value_counts().head(10).sort_values(ascending=True)
+    else:
+        skills_counts = None
+    if skills_counts is not None:
+        skills_counts = skills_counts.reset_index()
+        skills_counts.columns = ['skill', 'count']
+        aggs["skills_counts"] = skills_counts
+
+    if 'MIN_YEARS_OF_EXPERIENCE' in sampled_df.columns:
+        # Filter for values between 0 and 20 and convert to integers
+        df_exp = sampled_df[(sampled_df['MIN_YEARS_OF_EXPERIENCE'] >= 0) & (sampled_df['MIN_YEARS_OF_EXPERIENCE'] <= 20)]
+        exp_counts = backend.value_counts(df_exp['MIN_YEARS_OF_EXPERIENCE'].astype(int)).reset_index()
+        exp_counts.columns = ['years', 'count']
+        aggs["exp_counts"] = exp_counts.sort_values(by="years")
+    return aggs
+
+# Skills co-occurring with one skill; a fragment, so choosing another skill reruns only this chart
+@st.fragment
+def co_occurrence_chart(skill_matrix, skill_freq, rows):
+    selected_skill = st.selectbox("Skills that co-occur with", options=skill_freq.index[:200].tolist(),
+                                  key="co_occurrence_skill")
+    co_counts, n_with_skill = skill_matrix.co_occurring(selected_skill, rows)
+    co_counts = co_counts.head(15).sort_values(ascending=True).reset_index()
+    co_counts.columns = ['skill', 'count']
+    co_counts['share'] = co_counts['count'] / max(n_with_skill, 1)
+    fig_co = px.bar(co_counts, x='count', y='skill',
+                    orientation='h',
+                    title=f'Skills Co-occurring with {selected_skill} ({n_with_skill} jobs)',
+                    labels={'skill': 'Skill', 'count': 'Jobs'},
+                    hover_data={'share': ':.1%'})
+    st.plotly_chart(fig_co, use_container_width=True)
+
+def main(df, skill_matrix=None, filter_key=None, totals=None):
     st.header("Requirements Overview (Based on Job Description)")
-    sampled_df = df.groupby('POSTED_DATE').apply(lambda x: x.sample(frac=0.1, random_state=42)).reset_index(drop=True)
+    aggs = precompute.page_aggregates(
+        "Requirements", filter_key, lambda: aggregate(df, skill_matrix, totals=totals),
+        fallback=lambda: aggregate(df, skill_matrix, session_memory.FALLBACK_SAMPLE_ROWS, totals=totals))
     
     # -------------------------------
     # Top 10 Degrees and Top 10 Skills Side by Side (Horizontal Bars)
@@ -30,28 +106,8 @@ def main(df):
 
     with col1:
         st.markdown("### Top 10 Degrees")
-        if 'DEGREE' in sampled_df.columns:
-            # Drop true NaN + remove blanks and 'nan' strings
-            valid_degrees = (
-                sampled_df['DEGREE']
-                .dropna()  # remove true NaNs
-                .astype(str)
-                .str.strip()
-            )
-            # Filter out empty strings and 'nan' string (case-insensitive)
-            valid_degrees = valid_degrees[valid_degrees.str.lower() != 'nan']
-            valid_degrees = valid_degrees[valid_degrees != '']
-
-            # Count top 10
-            degree_counts = (
-                valid_degrees
-                .value_counts()
-                .head(10)
-                .sort_values(ascending=True)
-                .reset_index()
-            )
-            degree_counts.columns = ['degree', 'count']
-
+        if aggs["degree_counts"] is not None:
+            degree_counts = aggs["degree_counts"]
             if not degree_counts.empty:
                 # Create horizontal bar chart.
                 fig_degree = px.bar(
@@ -70,25 +126,11 @@ def main(df):
             
     with col2:
         st.markdown("### Top 10 Skills Frequency")
-        if 'SKILLS_MATCHED' in sampled_df.columns:
-            all_skills = []
-            for item in sampled_df['SKILLS_MATCHED'].dropna():
-                try:
-                    # Convert string representation of list to an actual list.
-                    skills = ast.literal_eval(item)
-                    if isinstance(skills, list):
-                        all_skills.extend(skills)
-                except Exception:
-                    continue
-            
-            if all_skills:
-                skills_series = pd.Series(all_skills)
-                # Select top 10 highest, then sort in ascending order.
-                skills_counts = skills_series.value_counts().head(10).sort_values(ascending=True)
-                skills_counts = skills_counts.reset_index()
-                skills_counts.columns = ['skill', 'count']
+        if aggs["skills_counts"] is not None:
+            skills_counts = aggs["skills_counts"]
+            if not skills_counts.empty:
                 # Create horizontal bar chart.
-                fig_skills = px.bar(skills_counts, x='count', y='skill', 
+                fig_skills = px.bar(skills_counts, x='count', y='skill',
                                     orientation='h',
                                     title='Skills Frequency',
                                     labels={'skill': 'Skill', 'count': 'Count'})
@@ -102,18 +144,34 @@ def main(df):
     # Minimum Years of Experience Chart (0-20) as Vertical Bars
     # -------------------------------
     st.markdown("### Minimum Years of Experience Distribution (0-20)")
-    if 'MIN_YEARS_OF_EXPERIENCE' in sampled_df.columns:
-        # Filter for values between 0 and 20.
-        # Filter for values between 0 and 20 and convert to integers
-        df_exp = sampled_df[(sampled_df['MIN_YEARS_OF_EXPERIENCE'] >= 0) & (sampled_df['MIN_YEARS_OF_EXPERIENCE'] <= 20)].copy()
-        df_exp['years'] = df_exp['MIN_YEARS_OF_EXPERIENCE'].astype(int)  # or use .round().astype(int) if you prefer
-
-        exp_counts = df_exp['years'].value_counts().reset_index()
-        exp_counts.columns = ['years', 'count']
-        exp_counts = exp_counts.sort_values(by="years")
+    if aggs["exp_counts"] is not None:
+        exp_counts = aggs["exp_counts"]
         fig_exp = px.bar(exp_counts, x='years', y='count', 
                         title='Minimum Years of Experience Distribution (0-20)',
                         labels={'years': 'Years of Experience', 'count': 'Count'})
         st.plotly_chart(fig_exp, use_container_width=True)
     else:
         st.write("Column 'min_years_of_experience' not found in the data.")
+
+    # -------------------------------
+    # Skill Co-occurrence (sparse matrix products over the full filtered set)
+    # -------------------------------
+    if skill_matrix is not None:
+        rows = df.index.to_numpy()
+        skill_freq = aggs["skill_freq"]
+
+        if not skill_freq.empty:
+            st.markdown("### Skill Co-occurrence")
+            col3, col4 = st.columns(2)
+
+            with col3:
+                co_occurrence_chart(skill_matrix, skill_freq, rows)
+
+            with col4:
+                top_skills = skill_freq.index[:15].tolist()
+                co_matrix = skill_matrix.co_occurrence(top_skills, rows)
+                fig_heatmap = px.imshow(co_matrix, text_auto=True,
+                                        title='Co-occurrence of Top 15 Skills',
+                                        labels={'x': 'Skill', 'y': 'Skill', 'color': 'Jobs'},
+                                        color_continuous_scale='Blues')
+                st.plotly_chart(fig_heatmap, use_container_width=True)
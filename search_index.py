@@ -0,0 +1,166 @@
+import re
+import itertools
+import numpy as np
+import pandas as pd
+
+# Columns that feed the full-text index (concatenated per posting)
+SEARCH_FIELDS = ["JOB_TITLE", "SKILLS_MATCHED", "INDUSTRIES", "COMPANY_NAME"]
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Width codes for the delta-encoded postings
+_WIDTHS = [np.dtype(np.uint8), np.dtype(np.uint16), np.dtype(np.uint32)]
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndex:
+    """Inverted index over job postings with compressed postings and BM25 ranking.
+
+    Document ids are row positions in the frame the index was built from; built
+    from a PartitionStore scan (ordered by ROW_ID), they are the postings'
+    ROW_IDs, the index labels of the partition frames.
+    """
+
+    def __init__(self, term_ids, doc_freq, first_doc, width_code, byte_offset,
+                 posting_offset, buffer, term_freq, doc_len):
+        self.term_ids = term_ids
+        self.doc_freq = doc_freq
+        self.first_doc = first_doc
+        self.width_code = width_code
+        self.byte_offset = byte_offset
+        self.posting_offset = posting_offset
+        self.buffer = buffer
+        self.term_freq = term_freq
+        self.doc_len = doc_len
+        self.n_docs = len(doc_len)
+        self.avg_doc_len = float(doc_len.mean()) if self.n_docs else 0.0
+
+    @property
+    def nbytes(self):
+        return (len(self.buffer) + self.term_freq.nbytes + self.doc_len.nbytes + self.doc_freq.nbytes
+                + self.first_doc.nbytes + self.width_code.nbytes + self.byte_offset.nbytes
+                + self.posting_offset.nbytes)
+
+    def postings(self, term_id):
+        """Decode the (doc ids, term frequencies) of one term."""
+        count = int(self.doc_freq[term_id])
+        docs = np.empty(count, dtype=np.int64)
+        docs[0] = self.first_doc[term_id]
+        if count > 1:
+            gaps = np.frombuffer(self.buffer, dtype=_WIDTHS[self.width_code[term_id]],
+                                 count=count - 1, offset=int(self.byte_offset[term_id]))
+            np.cumsum(gaps, dtype=np.int64, out=docs[1:])
+            docs[1:] += docs[0]
+        start = self.posting_offset[term_id]
+        return docs, self.term_freq[start:start + count]
+
+    def search(self, query, allowed=None, limit=100, match_all=True):
+        """Return (doc ids ranked by BM25, total number of matches).
+
+        `allowed` is an optional boolean mask over documents (e.g. the rows
+        surviving the global filters).
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        ids = [self.term_ids.get(t) for t in terms]
+        if match_all and any(i is None for i in ids):
+            return np.empty(0, dtype=np.int64), 0
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return np.empty(0, dtype=np.int64), 0
+
+        # Rarest term first so the candidate set shrinks as fast as possible
+        ids.sort(key=lambda i: self.doc_freq[i])
+        decoded = [self.postings(i) for i in ids]
+
+        if match_all:
+            candidates = decoded[0][0]
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            for docs, _ in decoded[1:]:
+                if candidates.size == 0:
+                    break
+                pos = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+                candidates = candidates[docs[pos] == candidates]
+        else:
+            candidates = np.unique(np.concatenate([docs for docs, _ in decoded]))
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+
+        if candidates.size == 0:
+            return candidates, 0
+
+        # BM25 score accumulated term by term over the candidate set
+        scores = np.zeros(candidates.size, dtype=np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[candidates] / max(self.avg_doc_len, 1e-9))
+        for term_id, (docs, tf) in zip(ids, decoded):
+            df_t = self.doc_freq[term_id]
+            idf = np.log(1 + (self.n_docs - df_t + 0.5) / (df_t + 0.5))
+            pos = np.minimum(np.searchsorted(docs, candidates), len(docs) - 1)
+            hit = docs[pos] == candidates
+            f = np.where(hit, tf[pos], 0).astype(np.float64)
+            scores += idf * f * (BM25_K1 + 1) / (f + norm)
+
+        total = int(candidates.size)
+        if total > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(total)
+        order = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[order], total
+
+
+def build_search_index(df, fields=SEARCH_FIELDS):
+    """Tokenize the search fields once and build the inverted index."""
+    n_docs = len(df)
+    fields = [f for f in fields if f in df.columns]
+    text = pd.Series([""] * n_docs, index=df.index)
+    for field in fields:
+        text = text + " " + df[field].fillna("").astype(str)
+    tokens = text.str.lower().str.findall(TOKEN_RE)
+
+    lengths = tokens.str.len().to_numpy()
+    doc_len = np.minimum(lengths, 0xFFFF).astype(np.uint16)
+    doc_ids = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+    term_codes, vocab = pd.factorize(pd.Series(list(itertools.chain.from_iterable(tokens)), dtype=object))
+    n_terms = len(vocab)
+
+    # Sort by (term, doc) and collapse repeats into term frequencies
+    stride = max(n_docs, 1)
+    key, tf = np.unique(term_codes.astype(np.int64) * stride + doc_ids, return_counts=True)
+    post_terms = key // stride
+    post_docs = key % stride
+    posting_offset = np.searchsorted(post_terms, np.arange(n_terms + 1))
+    doc_freq = np.diff(posting_offset).astype(np.uint32)
+
+    # Delta-encode each posting list with the narrowest width that fits its gaps
+    width_code = np.zeros(n_terms, dtype=np.uint8)
+    byte_offset = np.zeros(n_terms, dtype=np.int64)
+    chunks = []
+    size = 0
+    for term_id in np.flatnonzero(doc_freq > 1):
+        gaps = np.diff(post_docs[posting_offset[term_id]:posting_offset[term_id + 1]])
+        code = 0 if gaps.max() <= 0xFF else 1 if gaps.max() <= 0xFFFF else 2
+        encoded = gaps.astype(_WIDTHS[code]).tobytes()
+        width_code[term_id] = code
+        byte_offset[term_id] = size
+        chunks.append(encoded)
+        size += len(encoded)
+
+    return SearchIndex(
+        term_ids={term: i for i, term in enumerate(vocab)},
+        doc_freq=doc_freq,
+        first_doc=post_docs[posting_offset[:-1]].astype(np.uint32),
+        width_code=width_code,
+        byte_offset=byte_offset,
+        posting_offset=posting_offset[:-1].astype(np.int64),
+        buffer=b"".join(chunks),
+        term_freq=np.minimum(tf, 255).astype(np.uint8),
+        doc_len=doc_len,
+    )
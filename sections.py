@@ -0,0 +1,32 @@
+import streamlit as st
+import session_memory
+
+
+def memoized(page, section, signature, build):
+    """A section's figures for `signature`, built on first use and kept for the session."""
+    if signature is None:
+        return build()
+    return session_memory.cached(f"{page}.{section}", signature, build)
+
+
+# A fragment: opening or closing a section reruns only the sections, not the filters or the tiles above.
+# Sections are chosen with pills rather than st.tabs / st.expander, whose bodies run whether open or not.
+@st.fragment
+def render(page, sections, signature=None):
+    """Lazily rendered page sections.
+
+    `sections` maps name -> (build, show) in page order: `build()` aggregates and
+    constructs the figures (only once a section is opened, memoized per filter
+    signature) and `show(result)` draws them.
+    """
+    state_key = f"_{page}_open_sections"
+    opened = st.pills("Sections", list(sections), selection_mode="multi",
+                      default=[name for name in st.session_state.get(state_key, []) if name in sections],
+                      key=f"{page}_sections")
+    # Kept outside the widget's own state, which is dropped while another page is shown
+    st.session_state[state_key] = opened
+    if not opened:
+        st.caption("Select a section above to load its charts.")
+    for name, (build, show) in sections.items():
+        if name in opened:
+            show(memoized(page, name, signature, build))
@@ -0,0 +1,138 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+
+# Per-session budget for retained derivations (a filtered copy + cached intermediates)
+SESSION_MEMORY_CAP_MB = float(os.getenv("SESSION_MEMORY_CAP_MB", "256"))
+# Row count of the fallback sample used once a session is over its budget
+FALLBACK_SAMPLE_ROWS = int(os.getenv("FALLBACK_SAMPLE_ROWS", "20000"))
+# Show the session memory panel without the ?debug=1 query parameter
+DEBUG_SURFACE = os.getenv("DEBUG_SURFACE", "0") == "1"
+
+_STATE_KEY = "_session_memory"
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate retained bytes of frames, arrays and plain containers."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if sp.issparse(obj):
+        return int(sum(getattr(obj, attr).nbytes for attr in ("data", "indices", "indptr") if hasattr(obj, attr)))
+    if hasattr(obj, "nbytes") and isinstance(obj.nbytes, int):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, _seen) + deep_sizeof(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    return size
+
+
+def _state():
+    if _STATE_KEY not in st.session_state:
+        st.session_state[_STATE_KEY] = {"tracked": {}, "entries": OrderedDict(), "evictions": 0}
+    return st.session_state[_STATE_KEY]
+
+
+def _cap_bytes():
+    return int(SESSION_MEMORY_CAP_MB * 1024 * 1024)
+
+
+def track(name, obj):
+    """Record the size of an object the session holds for this run (e.g. filtered_df); None stops
+    tracking `name` (for objects shared with other sessions rather than owned by this one)."""
+    if obj is None:
+        _state()["tracked"].pop(name, None)
+    else:
+        _state()["tracked"][name] = deep_sizeof(obj)
+
+
+def usage():
+    state = _state()
+    tracked = sum(state["tracked"].values())
+    cached_bytes = sum(entry["nbytes"] for entry in state["entries"].values())
+    return {"tracked": tracked, "cached": cached_bytes, "total": tracked + cached_bytes,
+            "cap": _cap_bytes(), "evictions": state["evictions"]}
+
+
+def over_cap():
+    """True when the tracked per-run objects alone exceed the session budget."""
+    return sum(_state()["tracked"].values()) > _cap_bytes()
+
+
+def cached(name, signature, builder):
+    """Return a per-session derivation for `signature`, building it if needed.
+
+    Entries are evicted least-recently-used first to keep the session under its
+    cap; a derivation that cannot fit is returned without being retained.
+    """
+    entries = _state()["entries"]
+    entry = entries.get(name)
+    if entry is not None and entry["signature"] == signature:
+        entries.move_to_end(name)
+        entry["last_used"] = time.time()
+        return entry["value"]
+
+    entries.pop(name, None)
+    value = builder()
+    nbytes = deep_sizeof(value)
+    budget = _cap_bytes() - sum(_state()["tracked"].values())
+    while entries and sum(e["nbytes"] for e in entries.values()) + nbytes > budget:
+        entries.popitem(last=False)
+        _state()["evictions"] += 1
+    if nbytes <= budget:
+        entries[name] = {"signature": signature, "value": value, "nbytes": nbytes, "last_used": time.time()}
+    return value
+
+
+def clear():
+    state = _state()
+    state["entries"].clear()
+    state["tracked"].clear()
+
+
+# 10% sample per posting date used by the page charts, or a bounded sample of `max_rows`
+def date_sample(df, max_rows=None):
+    if max_rows is not None:
+        return df.sample(n=min(len(df), max_rows), random_state=42)
+    # Rows ordered by (date, random key) and the first round(10%) of each date kept, in one vectorized pass
+    # instead of a sample per date group
+    days, _ = pd.factorize(df['POSTED_DATE'], sort=True)
+    order = np.lexsort((np.random.default_rng(42).random(len(df)), days))
+    order = order[days[order] >= 0]
+    sizes = np.bincount(days[order], minlength=days.max(initial=-1) + 1)
+    rank = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return df.iloc[order[rank < np.repeat(np.round(sizes * 0.1), sizes)]].reset_index(drop=True)
+
+
+def render_debug():
+    """Sidebar panel with this session's memory figures (?debug=1 or DEBUG_SURFACE=1)."""
+    if not (DEBUG_SURFACE or st.query_params.get("debug") == "1"):
+        return
+    mb = 1024 * 1024
+    stats = usage()
+    with st.sidebar.expander("🧠 Session memory"):
+        st.metric("Session total", f"{stats['total'] / mb:.1f} MB", f"cap {stats['cap'] / mb:.0f} MB",
+                  delta_color="off")
+        if over_cap():
+            st.warning("Over the session cap: pages use the sampled path.")
+        rows = [{"object": name, "kind": "tracked", "MB": round(nbytes / mb, 2)}
+                for name, nbytes in _state()["tracked"].items()]
+        rows += [{"object": name, "kind": "cached", "MB": round(entry["nbytes"] / mb, 2)}
+                 for name, entry in _state()["entries"].items()]
+        st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        st.caption(f"Evictions: {stats['evictions']}")
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import fcntl
+import tempfile
+import pandas as pd
+import pyarrow as pa
+from partitions import PartitionStore, write_partitions
+import incremental
+
+# Location and lifetime of the shared snapshot (one per host, used by every worker)
+SNAPSHOT_DIR = os.getenv("DATA_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "job_dashboard_snapshot"))
+SNAPSHOT_TTL = int(os.getenv("DATA_SNAPSHOT_TTL", "86400"))  # seconds before a refresh
+
+STAMP_FILE = "VERSION.json"
+LOCK_FILE = ".refresh.lock"
+
+# Tables stored as one file per posting month (see partitions.py)
+PARTITIONED_TABLES = {"jobs"}
+
+# String columns stay in the Arrow buffers of the mapped file instead of being copied into Python objects
+_STRING_TYPES = {pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}
+
+
+def read_stamp():
+    """Return the published {"version", "created"} stamp, or None if there is no snapshot."""
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, STAMP_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(stamp):
+    return stamp is not None and time.time() - stamp["created"] < SNAPSHOT_TTL
+
+
+def _write_table(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # large_string is what pandas' Arrow-backed strings use, so reading back needs no cast
+    table = table.cast(pa.schema([
+        field.with_type(pa.large_string()) if pa.types.is_string(field.type) or pa.types.is_null(field.type)
+        else field for field in table.schema
+    ]))
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def publish_snapshot(tables):
+    """Write a dict of DataFrames as a new snapshot version and make it current."""
+    version = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    tmp_dir = os.path.join(SNAPSHOT_DIR, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    for name, df in tables.items():
+        if name in PARTITIONED_TABLES:
+            df = write_partitions(df, os.path.join(tmp_dir, name), _write_table)
+        else:
+            _write_table(df, os.path.join(tmp_dir, f"{name}.arrow"))
+        if name == "jobs":
+            # Derived aggregates, updated from the current snapshot with only the changed postings
+            previous = read_stamp()
+            previous_dir = os.path.join(SNAPSHOT_DIR, previous["version"]) if previous is not None else None
+            incremental.publish(df, tmp_dir, previous_dir if previous_dir and os.path.isdir(previous_dir) else None,
+                                read_arrow)
+    os.replace(tmp_dir, os.path.join(SNAPSHOT_DIR, version))
+
+    stamp_tmp = os.path.join(SNAPSHOT_DIR, f".{STAMP_FILE}.{version}")
+    with open(stamp_tmp, "w") as f:
+        json.dump({"version": version, "created": time.time(), "tables": sorted(tables)}, f)
+    os.replace(stamp_tmp, os.path.join(SNAPSHOT_DIR, STAMP_FILE))
+
+    # Keep the previous version for workers that have not switched yet; mapped files
+    # of older versions stay valid for their readers even after being unlinked.
+    versions = sorted(d for d in os.listdir(SNAPSHOT_DIR) if not d.startswith(".") and d != STAMP_FILE)
+    for old in versions[:-2]:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, old), ignore_errors=True)
+    return version
+
+
+def ensure_snapshot(fetch):
+    """Return the current snapshot version, refreshing it with `fetch()` when stale.
+
+    Only one worker refreshes at a time. While a refresh is running, other
+    workers keep serving the previous version; they only wait when no snapshot
+    exists yet.
+    """
+    stamp = read_stamp()
+    if _is_fresh(stamp):
+        return stamp["version"]
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    with open(os.path.join(SNAPSHOT_DIR, LOCK_FILE), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (fcntl.LOCK_NB if stamp is not None else 0))
+        except BlockingIOError:
+            return stamp["version"]
+        try:
+            # Another worker may have published while we were waiting for the lock
+            stamp = read_stamp()
+            if _is_fresh(stamp):
+                return stamp["version"]
+            return publish_snapshot(fetch())
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_arrow(path):
+    """Memory-map an Arrow IPC file as a read-only DataFrame."""
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    # One block per column: consolidating numeric columns into 2-D blocks would copy them out of the map
+    return table.to_pandas(split_blocks=True, self_destruct=False, types_mapper=_STRING_TYPES.get)
+
+
+def open_table(version, name):
+    """Memory-map one table of a snapshot version."""
+    return read_arrow(os.path.join(SNAPSHOT_DIR, version, f"{name}.arrow"))
+
+
+def open_snapshot(version):
+    """Memory-map every table of a snapshot version (partitioned tables as a PartitionStore)
+    and load its derived aggregates."""
+    tables = {}
+    for entry in os.listdir(os.path.join(SNAPSHOT_DIR, version)):
+        if entry in PARTITIONED_TABLES:
+            tables[entry] = PartitionStore(os.path.join(SNAPSHOT_DIR, version, entry), read_arrow)
+        elif entry == incremental.DERIVED_FILE:
+            tables["derived"] = incremental.load(os.path.join(SNAPSHOT_DIR, version))
+        elif entry.endswith(".arrow"):
+            tables[entry[:-len(".arrow")]] = open_table(version, entry[:-len(".arrow")])
+    return tables
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from search_index import TOKEN_RE
+from list_parse import parse_lists
+
+# Columns embedded per posting, and the one used to block queries to the same title
+SIMILAR_COLUMNS = ["JOB_TITLE", "SKILLS_MATCHED", "DEGREE", "JOB_FUNCTION_LIST", "PRIMARY_TITLE"]
+SIMILAR_TOP_K = 10
+
+
+def _field_codes(rows, items, prefix):
+    """(row ids, feature names) of one field, each name tagged with its field."""
+    return np.asarray(rows, dtype=np.int64), prefix + pd.Series(np.asarray(items, dtype=object), dtype=object)
+
+
+class SimilarityIndex:
+    """L2-normalized TF-IDF vectors of the postings (rows are ROW_IDs).
+
+    Features are the JOB_TITLE words, each matched skill, the degree and each
+    job function. Cosine similarity to a posting is a sparse dot product over
+    the columns of its own features only (CSC), so a query touches the postings
+    sharing at least one feature rather than the whole matrix.
+    """
+
+    def __init__(self, matrix, vocab, title_codes):
+        self.matrix = matrix.tocsr()
+        self.csc = self.matrix.tocsc()
+        self.vocab = pd.Index(vocab)
+        self.title_codes = title_codes
+        self.n_rows = self.matrix.shape[0]
+        # Rows grouped by PRIMARY_TITLE (CSR layout) for same-title queries; rows without a title are left out
+        titled = np.flatnonzero(title_codes >= 0)
+        self.title_rows = titled[np.argsort(title_codes[titled], kind="stable")]
+        self.title_offsets = np.concatenate([[0], np.cumsum(np.bincount(title_codes[titled],
+                                                                        minlength=title_codes.max(initial=-1) + 1))])
+
+    @property
+    def nbytes(self):
+        return int(sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in (self.matrix, self.csc))
+                   + self.title_codes.nbytes + self.title_rows.nbytes + self.title_offsets.nbytes)
+
+    def features(self, row):
+        """The weighted features of one posting, largest first."""
+        start, stop = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        weights = pd.Series(self.matrix.data[start:stop], index=self.vocab[self.matrix.indices[start:stop]])
+        return weights.sort_values(ascending=False)
+
+    def similar(self, row, k=SIMILAR_TOP_K, allowed=None, same_title=False):
+        """(ROW_IDs, cosine similarities) of the `k` postings most like `row`, most similar first.
+
+        `allowed` is an optional boolean mask over rows (the global filters);
+        `same_title` scores only the postings with the same PRIMARY_TITLE (none
+        for a posting without one).
+        """
+        start, stop = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        terms, weights = self.matrix.indices[start:stop], self.matrix.data[start:stop]
+        if same_title:
+            title = self.title_codes[row]
+            rows = self.title_rows[self.title_offsets[title]:self.title_offsets[title + 1]] if title >= 0 else \
+                np.empty(0, dtype=np.int64)
+            query = np.zeros(self.matrix.shape[1], dtype=np.float32)
+            query[terms] = weights
+            scores = self.matrix[rows] @ query if len(rows) else np.zeros(0, dtype=np.float32)
+        else:
+            rows = np.arange(self.n_rows)
+            scores = self.csc[:, terms] @ weights if len(terms) else np.zeros(self.n_rows, dtype=np.float32)
+        keep = (scores > 0) & (rows != row)
+        if allowed is not None:
+            keep &= allowed[rows]
+        candidates = np.flatnonzero(keep)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.lexsort((rows[candidates], -scores[candidates]))  # ties: earlier (newer) postings first
+        return rows[candidates[order]], scores[candidates[order]]
+
+
+def build_similarity_index(df):
+    """TF-IDF (binary term frequency, smoothed idf) over the posting features, rows L2-normalized."""
+    df = df.reset_index(drop=True)
+    n_rows = len(df)
+    words = df["JOB_TITLE"].astype(object).fillna("").str.lower().str.findall(TOKEN_RE).explode().dropna()
+    skills = parse_lists(df["SKILLS_MATCHED"])
+    functions = parse_lists(df["JOB_FUNCTION_LIST"])
+    degree = df["DEGREE"].astype(object)
+    degree = degree[degree.notna()].astype(str).str.strip()
+    degree = degree[(degree != "") & (degree.str.lower() != "nan")]
+    fields = [
+        _field_codes(words.index.to_numpy(dtype=np.int64), words.to_numpy(), "title:"),
+        _field_codes(skills.rows(), skills.vocab.to_numpy()[skills.codes], "skill:"),
+        _field_codes(degree.index.to_numpy(dtype=np.int64), degree.to_numpy(), "degree:"),
+        _field_codes(functions.rows(), functions.vocab.to_numpy()[functions.codes], "function:"),
+    ]
+    rows = np.concatenate([field_rows for field_rows, _ in fields])
+    codes, vocab = pd.factorize(pd.concat([names for _, names in fields], ignore_index=True))
+
+    matrix = sp.csr_matrix((np.ones(len(codes), dtype=np.float32), (rows, codes)),
+                           shape=(n_rows, max(len(vocab), 1)))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    doc_freq = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = (np.log((1 + n_rows) / (1 + doc_freq)) + 1).astype(np.float32)
+    matrix.data *= idf[matrix.indices]
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()).astype(np.float32)
+    matrix.data /= np.repeat(np.maximum(norms, 1e-12), np.diff(matrix.indptr))
+    title_codes = pd.factorize(df["PRIMARY_TITLE"])[0].astype(np.int32)
+    return SimilarityIndex(matrix, vocab, title_codes)
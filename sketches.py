@@ -0,0 +1,193 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# ---- Salary quantiles: log-bucketed relative-error sketch (DDSketch) ----
+# Buckets grow geometrically, so any quantile is within SALARY_ALPHA relative error
+# and two sketches merge by adding their bucket counts.
+SALARY_ALPHA = 0.01
+SALARY_MIN = 1_000
+SALARY_MAX = 5_000_000
+_GAMMA = (1 + SALARY_ALPHA) / (1 - SALARY_ALPHA)
+_LOG_GAMMA = np.log(_GAMMA)
+_BIN_OFFSET = int(np.floor(np.log(SALARY_MIN) / _LOG_GAMMA))
+N_SALARY_BINS = int(np.ceil(np.log(SALARY_MAX) / _LOG_GAMMA)) - _BIN_OFFSET + 1
+# Bucket i holds [gamma**(i + offset), gamma**(i + offset + 1)); its midpoint in relative terms
+_BIN_VALUES = 2 * _GAMMA ** (np.arange(N_SALARY_BINS) + _BIN_OFFSET + 1) / (_GAMMA + 1)
+
+QUANTILES = {"P25": 0.25, "P50": 0.5, "P75": 0.75, "P90": 0.9}
+
+# ---- Distinct companies: HyperLogLog with 2**HLL_P registers ----
+HLL_P = 10
+HLL_M = 1 << HLL_P
+_HLL_ALPHA = 0.7213 / (1 + 1.079 / HLL_M)
+
+# Filter dimensions the cube is partitioned on (filter key -> column)
+CUBE_DIMS = {"state": "STATE", "workplace": "WORKPLACE", "seniority": "SENIORITY_LEVEL", "job_title": "PRIMARY_TITLE"}
+# Columns needed to build the cube
+CUBE_COLUMNS = ["POSTED_DATE", *CUBE_DIMS.values(), "AVG_SALARY", "COMPANY_NAME"]
+
+
+def salary_bins(values):
+    """Bucket index of each salary (NaN -> -1)."""
+    values = np.asarray(values, dtype=np.float64)
+    bins = np.full(len(values), -1, dtype=np.int32)
+    valid = ~np.isnan(values)
+    clipped = np.clip(values[valid], SALARY_MIN, SALARY_MAX)
+    bins[valid] = np.floor(np.log(clipped) / _LOG_GAMMA).astype(np.int32) - _BIN_OFFSET
+    return bins
+
+
+def hll_registers(values):
+    """(register index, rank) of each value's 64-bit hash."""
+    hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+    index = (hashes >> np.uint64(64 - HLL_P)).astype(np.int32)
+    rest = (hashes << np.uint64(HLL_P)) | np.uint64(1 << (HLL_P - 1))
+    # Rank = position of the leftmost 1-bit in the remaining bits
+    _, exponent = np.frexp(rest.astype(np.float64))
+    rank = (65 - exponent).clip(1, 64 - HLL_P + 1).astype(np.uint8)
+    return index, rank
+
+
+def quantiles_from_counts(counts):
+    """Quantile estimates (rows = sketches) from a dense bucket-count matrix."""
+    counts = np.atleast_2d(counts)
+    totals = counts.sum(axis=1)
+    cumulative = np.cumsum(counts, axis=1)
+    result = {}
+    for name, q in QUANTILES.items():
+        rank = np.floor(q * np.maximum(totals - 1, 0))
+        idx = (cumulative <= rank[:, None]).sum(axis=1).clip(max=N_SALARY_BINS - 1)
+        result[name] = np.where(totals > 0, _BIN_VALUES[idx], np.nan)
+    result["SALARY_POSTINGS"] = totals
+    return result
+
+
+def hll_estimate(registers):
+    """Cardinality estimates (rows = sketches) from a dense register matrix."""
+    registers = np.atleast_2d(registers).astype(np.float64)
+    estimate = _HLL_ALPHA * HLL_M * HLL_M / np.power(2.0, -registers).sum(axis=1)
+    zeros = (registers == 0).sum(axis=1)
+    small = (estimate <= 2.5 * HLL_M) & (zeros > 0)
+    estimate[small] = HLL_M * np.log(HLL_M / zeros[small])
+    return np.round(estimate)
+
+
+def _summarize(groups, salary_counts, registers, jobs):
+    stats = pd.DataFrame(quantiles_from_counts(salary_counts), index=groups)
+    stats["DISTINCT_COMPANIES"] = hll_estimate(registers).astype(np.int64)
+    stats["JOBS"] = jobs
+    return stats
+
+
+class SalarySketchCube:
+    """Per-cell salary and distinct-company sketches over (day, state, workplace, seniority, title).
+
+    Any filter on those dimensions is answered by merging the sketches of the
+    matching cells instead of rescanning the postings.
+    """
+
+    def __init__(self, cells, salary_counts, registers):
+        self.cells = cells
+        self.salary_counts = salary_counts.tocsr()
+        self.registers = registers.tocsr()
+
+    @property
+    def nbytes(self):
+        return int(self.cells.memory_usage(deep=True).sum()
+                   + sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+                         for m in (self.salary_counts, self.registers)))
+
+    @staticmethod
+    def covers(filters):
+        """Whether the cube can answer this filter combination on its own."""
+        return (filters["job_func"] == "All" and filters["salary"] == "All"
+                and not filters.get("collapse_duplicates", False) and filters.get("near_city", "All") == "All")
+
+    def _cell_mask(self, filters):
+        days = self.cells["DAY"]
+        mask = (days >= pd.to_datetime(filters["start_date"])) & (days <= pd.to_datetime(filters["end_date"]))
+        for key, column in CUBE_DIMS.items():
+            if filters[key] != "All":
+                mask &= self.cells[column] == filters[key]
+        return mask.to_numpy()
+
+    def query(self, filters, by=None):
+        """Salary quantiles, posting counts and distinct companies, overall or per `by` column."""
+        cell_ids = np.flatnonzero(self._cell_mask(filters))
+        if by is None:
+            salary = np.asarray(self.salary_counts[cell_ids].sum(axis=0))
+            registers = self.registers[cell_ids].max(axis=0).toarray() if len(cell_ids) else np.zeros((1, HLL_M))
+            return _summarize(["All"], salary, registers, [int(self.cells["JOBS"].to_numpy()[cell_ids].sum())])
+
+        group_codes, groups = pd.factorize(self.cells[by].to_numpy(dtype=object)[cell_ids])
+        cell_ids, group_codes = cell_ids[group_codes >= 0], group_codes[group_codes >= 0]
+        indicator = sp.csr_matrix((np.ones(len(cell_ids)), (group_codes, np.arange(len(cell_ids)))),
+                                  shape=(len(groups), len(cell_ids)))
+        salary = (indicator @ self.salary_counts[cell_ids]).toarray()
+        sub_registers = self.registers[cell_ids]
+        registers = np.vstack([sub_registers[group_codes == g].max(axis=0).toarray() for g in range(len(groups))]) \
+            if len(groups) else np.zeros((0, HLL_M))
+        jobs = np.bincount(group_codes, weights=self.cells["JOBS"].to_numpy()[cell_ids], minlength=len(groups))
+        return _summarize(pd.Index(groups, name=by), salary, registers, jobs.astype(np.int64))
+
+
+def build_salary_cube(df):
+    """Build the sketch cube once at load."""
+    day = df["POSTED_DATE"].dt.normalize().rename("DAY")
+    keys = pd.concat([day] + [df[column] for column in CUBE_DIMS.values()], axis=1)
+    cell_of_row = keys.groupby(list(keys.columns), dropna=False, sort=False).ngroup().to_numpy()
+    first_row = np.unique(cell_of_row, return_index=True)[1]
+    cells = keys.iloc[first_row].reset_index(drop=True)
+    cells["JOBS"] = np.bincount(cell_of_row, minlength=len(cells))
+    n_cells = len(cells)
+
+    bins = salary_bins(df["AVG_SALARY"].to_numpy(dtype=np.float64, na_value=np.nan))
+    has_salary = bins >= 0
+    salary_counts = sp.csr_matrix(
+        (np.ones(has_salary.sum(), dtype=np.int32), (cell_of_row[has_salary], bins[has_salary])),
+        shape=(n_cells, N_SALARY_BINS),
+    )
+    salary_counts.sum_duplicates()
+
+    registers = _max_registers(cell_of_row, df["COMPANY_NAME"], n_cells)
+    return SalarySketchCube(cells, salary_counts, registers)
+
+
+def _max_registers(groups, companies, n_groups):
+    """Sparse (group x register) HLL matrix keeping the max rank per register."""
+    valid = companies.notna().to_numpy()
+    index, rank = hll_registers(companies.to_numpy(dtype=object)[valid])
+    key = groups[valid].astype(np.int64) * HLL_M + index
+    order = np.lexsort((rank, key))
+    key, rank = key[order], rank[order]
+    last = np.append(key[1:] != key[:-1], True)[:len(key)]  # highest rank is last within each key
+    key, rank = key[last], rank[last]
+    return sp.csr_matrix((rank, (key // HLL_M, key % HLL_M)), shape=(n_groups, HLL_M), dtype=np.uint8)
+
+
+def sketch_rows(df, by=None):
+    """Same summary as SalarySketchCube.query, computed directly from (filtered) rows."""
+    if by is None:
+        group_codes, groups = np.zeros(len(df), dtype=np.int64), pd.Index(["All"])
+    else:
+        group_codes, groups = pd.factorize(df[by].to_numpy(dtype=object))
+        groups = pd.Index(groups, name=by)
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    valid_group = group_codes >= 0
+    n_groups = len(groups)
+
+    bins = salary_bins(df["AVG_SALARY"].to_numpy(dtype=np.float64, na_value=np.nan))
+    keep = (bins >= 0) & valid_group
+    salary = np.bincount(group_codes[keep] * N_SALARY_BINS + bins[keep],
+                         minlength=n_groups * N_SALARY_BINS).reshape(n_groups, N_SALARY_BINS)
+    registers = _max_registers(group_codes[valid_group], df["COMPANY_NAME"][valid_group], n_groups).toarray()
+    jobs = np.bincount(group_codes[valid_group], minlength=n_groups)
+    return _summarize(groups, salary, registers, jobs)
+
+
+def salary_summary(cube, df, filters, by=None):
+    """Answer from the cube when it covers the filters, otherwise from the filtered rows."""
+    if cube is not None and filters is not None and cube.covers(filters):
+        return cube.query(filters, by)
+    return sketch_rows(df, by)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from list_parse import parse_lists
+
+
+class ListMatrix:
+    """Sparse rows x vocabulary indicator matrix for a list-valued column.
+
+    Row i is the i-th row of the frame the matrix was built from; built from a
+    PartitionStore scan (ordered by ROW_ID), row i is the posting with ROW_ID i,
+    the index label of the partition frames.
+    """
+
+    def __init__(self, matrix, vocab):
+        self.matrix = matrix.tocsr()
+        self.csc = self.matrix.tocsc()
+        self.vocab = pd.Index(vocab)
+
+    @property
+    def nbytes(self):
+        return sum(m.data.nbytes + m.indices.nbytes + m.indptr.nbytes for m in (self.matrix, self.csc))
+
+    def _rows(self, rows):
+        return self.matrix if rows is None else self.matrix[rows]
+
+    def frequencies(self, rows=None):
+        """Exact item counts over the given rows, most frequent first."""
+        counts = np.asarray(self._rows(rows).sum(axis=0)).ravel()
+        freq = pd.Series(counts, index=self.vocab, name="count")
+        return freq[freq > 0].sort_values(ascending=False)
+
+    def rows_with(self, item, rows=None):
+        """Row ids (sorted) containing `item`, optionally restricted to `rows`."""
+        if item not in self.vocab:
+            return np.empty(0, dtype=np.int64)
+        j = self.vocab.get_loc(item)
+        hits = self.csc.indices[self.csc.indptr[j]:self.csc.indptr[j + 1]]
+        if rows is not None:
+            hits = np.intersect1d(hits, rows, assume_unique=True)
+        return np.sort(hits)
+
+    def co_occurring(self, item, rows=None):
+        """Counts of the other items appearing on rows that contain `item`."""
+        hits = self.rows_with(item, rows)
+        freq = self.frequencies(hits) if len(hits) else pd.Series(dtype=np.int64, name="count")
+        return freq.drop(item, errors="ignore"), len(hits)
+
+    def co_occurrence(self, items, rows=None):
+        """Square co-occurrence counts between `items` (diagonal = item counts)."""
+        cols = self.vocab.get_indexer(items)
+        sub = self._rows(rows)[:, cols]
+        counts = (sub.T @ sub).toarray()
+        return pd.DataFrame(counts, index=items, columns=items)
+
+
+def build_list_matrix(series):
+    """Materialize a column of stringified lists as a sparse indicator matrix."""
+    coded = parse_lists(series)
+    matrix = sp.csr_matrix(
+        (np.ones(len(coded.codes), dtype=np.int32), coded.codes, coded.offsets),
+        shape=(len(coded), len(coded.vocab)),
+    )
+    # Repeated items within one list count once
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return ListMatrix(matrix, coded.vocab)
@@ -0,0 +1,120 @@
+"""Load-time structures built from a snapshot version.
+
+One builder per structure, shared by the dashboard (app.py wraps each in its own
+st.cache_resource loader) and the headless API (api.py builds the ones it needs
+through `build`), so both serve the same numbers.
+"""
+import shared_data
+import dedup
+import geo
+import entity_resolution
+from search_index import SEARCH_FIELDS, build_search_index
+from skill_matrix import build_list_matrix
+from similar_jobs import SIMILAR_COLUMNS, build_similarity_index
+from company_dim import build_company_dimension
+from industry_sectors import build_industry_sectors
+from sketches import CUBE_COLUMNS, build_salary_cube
+
+
+def open_tables(version):
+    """The snapshot's tables (jobs as a PartitionStore) and the filter options."""
+    tables = shared_data.open_snapshot(version)
+    # Filter options from the incrementally maintained counts (the published count tables for older snapshots)
+    derived = tables.get("derived")
+    if derived is not None:
+        job_titles, job_functions = derived.options("titles"), derived.options("job_functions")
+    else:
+        job_titles = tables["job_titles"]["PRIMARY_TITLE"].tolist()
+        job_functions = tables["job_functions"]["JOB_FUNCTION"].tolist()
+    return {"jobs": tables["jobs"], "companies": tables["companies"], "states": tables["states"],
+            "cities": tables["cities"], "job_titles": job_titles, "job_functions": job_functions,
+            "derived": derived}
+
+
+# Full-text index over the postings
+def search_index(jobs):
+    return build_search_index(jobs.scan(SEARCH_FIELDS))
+
+
+# L2-normalized TF-IDF vectors of the postings for "similar jobs"
+def similarity_index(jobs):
+    return build_similarity_index(jobs.scan(SIMILAR_COLUMNS))
+
+
+# Sparse jobs x skills matrix for exact skill frequencies and co-occurrence
+def skill_matrix(jobs):
+    return build_list_matrix(jobs.scan(["SKILLS_MATCHED"])["SKILLS_MATCHED"])
+
+
+# Near-duplicate clusters (MinHash/LSH over title, company, location and skills), indexed by ROW_ID
+def dup_clusters(jobs, skill_matrix):
+    return dedup.build_dup_clusters(jobs.scan(dedup.DEDUP_COLUMNS), skill_matrix)
+
+
+# Spatial index over the city coordinates for the "near city, within N miles" filter
+def city_index(jobs, cities):
+    return geo.build_city_index(jobs.scan(["LOCATION"])["LOCATION"], cities)
+
+
+# Postings linked to COMPANIES_INFO (normalized URL, then name, then blocked fuzzy name), indexed by ROW_ID
+def company_resolution(jobs, companies):
+    return entity_resolution.resolve_companies(jobs.scan(["COMPANY_NAME", "COMPANY_URL"]), companies)
+
+
+# Per-company risk levels, computed once instead of per lookup
+def risk_table(companies):
+    import jobs_lookup
+    return jobs_lookup.build_risk_table(companies)
+
+
+# Company dimension: integer key per company (attributes and risk level gathered once) and per posting
+def company_dimension(jobs, company_resolution, companies, risk_table):
+    return build_company_dimension(jobs.scan(["COMPANY_NAME"])["COMPANY_NAME"], company_resolution,
+                                   companies, risk_table)
+
+
+# BLS industry sector of every posting (INDUSTRIES) and company (INDUSTRY), from the industry.xlsx taxonomy
+def industry_sectors(jobs, company_dim):
+    return build_industry_sectors(jobs.scan(["INDUSTRIES"])["INDUSTRIES"], company_dim)
+
+
+# Employee-profile head counts per school, skill, ... (the profile list columns parsed once)
+def company_profiles(companies):
+    import company_info
+    return company_info.profile_totals(companies)
+
+
+# Mergeable salary-quantile and distinct-company sketches per (day, state, workplace, seniority, title)
+def salary_cube(jobs):
+    return build_salary_cube(jobs.scan(CUBE_COLUMNS))
+
+
+# Every structure with the tables or structures it is built from, in build order
+BUILDERS = {
+    "search_index": (search_index, ["jobs"]),
+    "similarity_index": (similarity_index, ["jobs"]),
+    "skill_matrix": (skill_matrix, ["jobs"]),
+    "dup_clusters": (dup_clusters, ["jobs", "skill_matrix"]),
+    "city_index": (city_index, ["jobs", "cities"]),
+    "company_resolution": (company_resolution, ["jobs", "companies"]),
+    "risk_table": (risk_table, ["companies"]),
+    "company_dim": (company_dimension, ["jobs", "company_resolution", "companies", "risk_table"]),
+    "industry_sectors": (industry_sectors, ["jobs", "company_dim"]),
+    "company_profiles": (company_profiles, ["companies"]),
+    "salary_cube": (salary_cube, ["jobs"]),
+}
+
+
+def build(version, names):
+    """The snapshot's tables plus the named structures and the ones they are built from."""
+    data = open_tables(version)
+
+    def get(name):
+        if name not in data:
+            builder, inputs = BUILDERS[name]
+            data[name] = builder(*[get(source) for source in inputs])
+        return data[name]
+
+    for name in names:
+        get(name)
+    return data
@@ -0,0 +1,31 @@
+import importlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+import admin
+import auth
+
+
+def test_function_caches_count_entries_and_list_cache_data_functions(tmp_path):
+    @st.cache_resource(max_entries=1)
+    def load_numbers():
+        return np.arange(1000)
+
+    users = tmp_path / "users.csv"
+    pd.DataFrame({"username": ["alice"], "password_hash": ["x"]}).to_csv(users, index=False)
+    auth._read_user_credentials.clear()
+    auth.load_user_credentials(str(users))
+
+    table = admin.function_caches({"load_numbers": (load_numbers, load_numbers())}).set_index("function")
+    assert table.loc["load_numbers", "entries"] == 1
+    assert table.loc["load_numbers", "MB"] == round(8000 / admin.MB, 2)
+    assert table.loc["auth._read_user_credentials", "kind"] == "st.cache_data"
+    assert table.loc["auth._read_user_credentials", "entries"] == 1
+    assert table.loc["auth._read_user_credentials", "MB"] >= 0
+
+
+def test_no_admin_users_by_default(monkeypatch):
+    monkeypatch.delenv("ADMIN_USERS", raising=False)
+    reloaded = importlib.reload(admin)
+    assert reloaded.ADMIN_USERS == set()
+    assert not reloaded.is_admin("admin")
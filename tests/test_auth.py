@@ -0,0 +1,24 @@
+import auth
+
+
+def test_failed_attempt_log_is_bounded(monkeypatch):
+    auth._auth_state.clear()
+    monkeypatch.setattr(auth, "MAX_TRACKED_USERNAMES", 3)
+    for name in ["alice", "guess1", "guess2", "guess3"]:
+        auth._record_attempt(name, False)
+    auth._record_attempt("guess2", False)
+    auth._record_attempt("guess4", False)
+
+    failures = auth._auth_state()["failures"]
+    assert list(failures) == ["guess3", "guess2", "guess4"]
+    assert len(failures["guess2"]) == 2
+
+
+def test_lockout_after_repeated_failures():
+    auth._auth_state.clear()
+    for _ in range(auth.MAX_FAILED_ATTEMPTS):
+        assert auth.lockout_remaining("alice") == 0
+        auth._record_attempt("alice", False)
+    assert auth.lockout_remaining("alice") > 0
+    auth._record_attempt("alice", True)
+    assert auth.lockout_remaining("alice") == 0
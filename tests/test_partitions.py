@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import shared_data
+from partitions import PartitionStore, write_partitions
+
+
+def _store(tmp_path, budget_mb):
+    dates = pd.date_range("2024-01-01", "2024-06-30", freq="D")
+    jobs = pd.DataFrame({"POSTED_DATE": np.repeat(dates, 20), "JOB_TITLE": "Engineer"})
+    write_partitions(jobs, str(tmp_path / "jobs"), shared_data._write_table)
+    return PartitionStore(str(tmp_path / "jobs"), shared_data.read_arrow, hot_months=2, budget_mb=budget_mb)
+
+
+def test_full_range_select_does_not_churn_the_cold_cache(tmp_path):
+    # Room for about one older month, so caching each in turn would evict the rest
+    store = _store(tmp_path, budget_mb=0.03)
+    store.select("2024-03-01", "2024-03-31")
+    assert store.stats()["cold_loaded"] == ["2024-03"]
+
+    for _ in range(3):
+        df = store.select(store.min_date, store.max_date)
+        assert len(df) == store.n_rows and df.index.is_monotonic_increasing
+    stats = store.stats()
+    assert stats["cold_loaded"] == ["2024-03"]
+    assert (stats["loads"], stats["evictions"]) == (1, 0)
+
+
+def test_narrow_ranges_evict_least_recently_used_months(tmp_path):
+    store = _store(tmp_path, budget_mb=0.03)
+    store.select("2024-01-01", "2024-01-31")
+    store.select("2024-02-01", "2024-02-28")
+    stats = store.stats()
+    assert stats["cold_loaded"] == ["2024-02"]
+    assert (stats["loads"], stats["evictions"]) == (2, 1)
@@ -0,0 +1,32 @@
+import threading
+import streamlit as st
+import precompute
+
+
+def _blocked(release):
+    def compute():
+        release.wait(10)
+        return "busy"
+    return compute
+
+
+def test_cancelled_tasks_release_their_pending_slot():
+    precompute._pool.clear()
+    st.session_state.clear()
+    release = threading.Event()
+    # Two tasks occupy the workers, the rest stay queued
+    tasks = {f"page{i}": _blocked(release) for i in range(precompute.PRECOMPUTE_WORKERS + 3)}
+    precompute.schedule("first", tasks)
+    queued = list(st.session_state[precompute._STATE_KEY]["futures"].values())
+    assert precompute.stats()["pending"] == len(tasks)
+
+    # A signature change cancels the queued tasks; result() cancels the one it claims
+    precompute.schedule("second", {"later": lambda: "later", "claimed": lambda: "claimed"})
+    assert precompute.result("claimed", "second", lambda: "claimed now") in ("claimed", "claimed now")
+    release.set()
+    for future in queued + list(st.session_state[precompute._STATE_KEY]["futures"].values()):
+        try:
+            future.result(10)
+        except Exception:
+            pass
+    assert precompute.stats()["pending"] == 0
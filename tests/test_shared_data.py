@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shared_data
+
+
+def test_read_arrow_maps_numeric_columns_without_copying(tmp_path, monkeypatch):
+    path = str(tmp_path / "table.arrow")
+    shared_data._write_table(pd.DataFrame({"ints": np.arange(1000, dtype=np.int64), "floats": np.linspace(0, 1, 1000),
+                                           "names": ["x"] * 1000}), path)
+    maps = []
+    memory_map = pa.memory_map
+    monkeypatch.setattr(pa, "memory_map", lambda *args: maps.append(memory_map(*args)) or maps[-1])
+    df = shared_data.read_arrow(path)
+
+    mapped = maps[0]
+    mapped.seek(0)
+    file_bytes = np.frombuffer(mapped.read_buffer(mapped.size()), dtype=np.uint8)
+    for column in ["ints", "floats"]:
+        assert np.shares_memory(df[column].to_numpy(), file_bytes)
+    assert df["names"].dtype == pd.StringDtype("pyarrow")
+    assert df["ints"].tolist() == list(range(1000))
@@ -0,0 +1,20 @@
+import structures
+
+
+def test_build_adds_the_structures_a_requested_one_is_built_from(monkeypatch):
+    built = []
+
+    def builder(name):
+        return lambda *inputs: built.append((name, inputs)) or name.upper()
+
+    monkeypatch.setattr(structures, "open_tables", lambda version: {"jobs": "jobs", "companies": "companies"})
+    monkeypatch.setattr(structures, "BUILDERS", {
+        "resolution": (builder("resolution"), ["jobs", "companies"]),
+        "dim": (builder("dim"), ["jobs", "resolution"]),
+        "sectors": (builder("sectors"), ["jobs", "dim"]),
+        "unused": (builder("unused"), ["jobs"]),
+    })
+    data = structures.build("v1", ["sectors", "dim"])
+    assert built == [("resolution", ("jobs", "companies")), ("dim", ("jobs", "RESOLUTION")),
+                     ("sectors", ("jobs", "DIM"))]
+    assert data["sectors"] == "SECTORS" and "unused" not in data